@@ -0,0 +1,104 @@
+"""
+Index of the frame timestamps (presentation timestamps) of a video. Needed to give every label a frame number and
+to seek exactly to frames, also for videos with a variable frame rate. The timestamps are read by ffprobe (only
+demuxed, nothing is decoded) and cached inside the folder "frames" (next to "data"). No Qt in here.
+"""
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+# For Documentation
+from typing import Optional
+
+FRAME_FOLDER = "frames"  # Cached frame indexes, one .npz per video
+TOLERANCE = 0.0005  # Times are shown with three decimals, so a time may be up to half a millisecond before its frame
+
+
+class FrameIndex:
+    """
+    Sorted presentation timestamps (seconds) of all frames of a video. Frame numbers start with 0. All lookups are
+    binary searches, O(log n).
+    """
+
+    def __init__(self, timestamps: np.ndarray):
+        self.timestamps = timestamps
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def frame_at(self, seconds: float) -> int:
+        """
+        Number of the frame shown at this time (the last frame starting before or at the time).
+        """
+        frame = int(np.searchsorted(self.timestamps, seconds + TOLERANCE, side="right")) - 1
+        return min(max(frame, 0), len(self.timestamps) - 1)
+
+    def frames_at(self, seconds: np.ndarray) -> np.ndarray:
+        """
+        frame_at() for a whole array of times.
+        """
+        frames = np.searchsorted(self.timestamps, np.asarray(seconds) + TOLERANCE, side="right") - 1
+        return np.clip(frames, 0, len(self.timestamps) - 1)
+
+    def time_of(self, frame: int) -> float:
+        """
+        Presentation timestamp of a frame. Frame numbers outside the video are clipped.
+        """
+        return float(self.timestamps[min(max(frame, 0), len(self.timestamps) - 1)])
+
+    def snap(self, seconds: float) -> float:
+        """
+        Timestamp of the frame shown at this time, to seek exactly to the start of the frame.
+        """
+        return self.time_of(self.frame_at(seconds))
+
+
+def read_timestamps(video_path: str) -> Optional[np.ndarray]:
+    """
+    Reading the timestamps of all video packets with ffprobe. The packets are in decoding order, so they are
+    sorted afterwards. None if ffprobe is not installed or can't read the video.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    try:
+        output = subprocess.run([ffprobe, "-v", "error", "-select_streams", "v:0",
+                                 "-show_entries", "packet=pts_time", "-of", "csv=p=0", video_path],
+                                capture_output=True, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    timestamps = []
+    for line in output.splitlines():
+        try:
+            timestamps.append(float(line.strip().rstrip(b",")))
+        except ValueError:
+            continue  # "N/A"
+    if not timestamps:
+        return None
+    return np.unique(np.array(timestamps, dtype=np.float64))
+
+
+def load_frame_index(video_path: str, cache_path: str) -> Optional[FrameIndex]:
+    """
+    Frame index of a video. Taken from the cache, if the video did not change since (same size and mtime),
+    otherwise read with ffprobe and written into the cache. None if there is no index.
+    """
+    stat = os.stat(video_path)
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                if int(cached["size"]) == stat.st_size and float(cached["mtime"]) == stat.st_mtime:
+                    return FrameIndex(cached["timestamps"])
+        except (OSError, ValueError, KeyError):
+            pass  # Broken cache, read again
+    timestamps = read_timestamps(video_path)
+    if timestamps is None:
+        return None
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, timestamps=timestamps, size=stat.st_size, mtime=stat.st_mtime)
+    os.replace(tmp_path, cache_path)
+    return FrameIndex(timestamps)
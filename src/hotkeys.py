@@ -0,0 +1,84 @@
+"""
+Hotkeys of the three .json files (label_shortcuts.json, settings.json and commands_mpv.json) for the hotkey overview
+of video_labeler.py. Duplicated hotkeys (inside one file or between the files) are marked, they should be avoided.
+The overview is cached by a hash of the files, so it is only built again if a file changed. No Qt in here.
+"""
+import json
+import hashlib
+from collections import namedtuple
+
+# For Documentation
+from typing import List, Tuple
+
+HOTKEY_FILES = ("label_shortcuts.json", "settings.json", "commands_mpv.json")
+HOTKEY_COLUMNS = ["Hotkey", "Value", "ActType", "File"]
+DUPLICATED = "Duplicated key"
+
+Hotkey = namedtuple("Hotkey", ["hotkey", "value", "act_type", "file", "duplicated"])
+
+
+def check_for_duplicates(ordered_pairs: List[Tuple[str, object]]) -> dict:
+    """
+    Finding duplicates within a dictionary (object_pairs_hook of json.load). The value of a duplicated key is
+    replaced by DUPLICATED.
+    """
+    d = {}
+    for k, v in ordered_pairs:
+        if k in d:
+            d[k] = DUPLICATED
+        else:
+            d[k] = v
+    return d
+
+
+def config_hash(files: Tuple[str, ...] = HOTKEY_FILES) -> str:
+    """
+    Hash of the content of the files. A missing file counts as empty.
+    """
+    digest = hashlib.sha1()
+    for path in files:
+        try:
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        except OSError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _load_file(json_file: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Helper to read (hotkey, value, act type, file) of every hotkey of a file. Only the "()" values of settings.json
+    are hotkeys, the other settings are skipped.
+    """
+    with open(json_file, 'r') as file:
+        json_data = json.load(file, object_pairs_hook=check_for_duplicates)
+    if json_file == "label_shortcuts.json":
+        return [(key, value, act_type, json_file) for act_type in json_data
+                for key, value in json_data[act_type].items()]
+    if json_file == "settings.json":
+        return [(key, value, "", json_file) for key, value in json_data.items()
+                if value == DUPLICATED or value[-2:] == "()"]
+    return [(key, value if isinstance(value, str) else " ".join(value), "", json_file)
+            for key, value in json_data.items()]
+
+
+def load_hotkeys(files: Tuple[str, ...] = HOTKEY_FILES) -> List[Hotkey]:
+    """
+    All the hotkeys of the files. A hotkey used more than once (also between the files) is duplicated, its value is
+    DUPLICATED. The hotkeys are compared like Qt does (case insensitive).
+    """
+    rows = []
+    for json_file in files:
+        try:
+            rows.extend(_load_file(json_file))
+        except (OSError, ValueError):
+            continue
+    counts = {}
+    for key, _value, _act_type, _file in rows:
+        counts[key.upper()] = counts.get(key.upper(), 0) + 1
+    hotkeys = []
+    for key, value, act_type, json_file in rows:
+        duplicated = counts[key.upper()] > 1 or value == DUPLICATED
+        hotkeys.append(Hotkey(key, DUPLICATED if duplicated else value, act_type, json_file, duplicated))
+    return hotkeys
@@ -0,0 +1,439 @@
+"""
+Command line tool for the label files within "data", without the GUI (no Qt, no mpv). Every label file is processed
+within a process pool, .csv files are streamed chunk by chunk:
+
+- validate   checking every label file (header, times, types, frames, open time_windows, journals)
+- merge      all label files as one dataset (.csv or .npz, see the extension of --output)
+- convert    converting all label files to .csv or .npz (like saving within the app)
+- stats      number of labels and duration of the time_windows per label
+- export     per-frame training targets of every video (see label_export.py), written as shards into --output
+
+python label_batch.py validate
+python label_batch.py merge --output dataset.npz
+python label_batch.py convert --to npz
+python label_batch.py stats --json
+python label_batch.py export --output targets --shard-frames 1000000
+
+Unsaved changes (journals) are included. convert changes the label files, so the app should not be running.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from label_store import LabelStore, LabelJournal, CSV_HEADER, LABEL_FORMATS, parse_time, parse_frame, \
+    label_file_name, iter_label_file, npz_bytes, replace_file
+from label_export import SHARD_FRAMES, EXPORT_FORMATS, ShardWriter, label_classes, sort_classes, frame_timestamps, \
+    paint_targets
+from video_library import VideoLibrary
+
+# For Documentation
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ACT_TYPES = ("time_window", "point_activity")
+MAX_MESSAGES = 20  # Errors and warnings shown per file
+
+_export = {}  # Settings of "export" within the worker processes, see _init_export()
+
+
+def label_files(data_folder: str = "data") -> List[Tuple[str, Optional[str]]]:
+    """
+    (base path, label file) of every label file within the folder, sorted. If there are both formats of a file
+    (the app crashed while converting), the newer one is taken. The label file is None, if there is only a journal
+    (labels of a video, that were never saved).
+    """
+    files = {}
+    for entry in os.scandir(data_folder):
+        base_path, extension = os.path.splitext(entry.path)
+        if not entry.is_file() or extension[1:] not in LABEL_FORMATS + ("journal",):
+            continue
+        if extension == ".journal":
+            files.setdefault(base_path, None)
+        elif files.get(base_path) is None or entry.stat().st_mtime > os.stat(files[base_path]).st_mtime:
+            files[base_path] = entry.path
+    return sorted(files.items())
+
+
+def iter_labels(base_path: str, path: Optional[str], chunk_size: int = 50000) -> Iterator[LabelStore]:
+    """
+    The labels of a file chunk by chunk. With a journal (unsaved changes), the whole file is loaded and the
+    journal is replayed on top.
+    """
+    journal = LabelJournal(base_path)
+    if path is None or os.path.exists(journal.path):
+        label_format = os.path.splitext(path)[1][1:] if path is not None else LABEL_FORMATS[0]
+        yield journal.load(label_format)[0]
+        return
+    yield from iter_label_file(path, chunk_size)
+
+
+def _validate_row(row_data: List[str], line: int, video: str, errors: List[str], warnings: List[str]):
+    """
+    Helper to check one row of a .csv file (texts).
+    """
+    if len(row_data) not in (5, len(CSV_HEADER)):
+        errors.append(f"line {line}: {len(row_data)} columns")
+        return
+    row_data = row_data + [""] * (len(CSV_HEADER) - len(row_data))
+    stime, etime = parse_time(row_data[0]), parse_time(row_data[1])
+    sframe, eframe = parse_frame(row_data[5]), parse_frame(row_data[6])
+    if stime != stime:  # NaN
+        errors.append(f"line {line}: start time {row_data[0]!r}")
+    if row_data[2] not in ACT_TYPES:
+        errors.append(f"line {line}: type {row_data[2]!r}")
+    if not row_data[3]:
+        errors.append(f"line {line}: no label")
+    if etime != etime:
+        if row_data[2] == "time_window":
+            warnings.append(f"line {line}: time_window {row_data[3]!r} not closed")
+        else:
+            errors.append(f"line {line}: end time {row_data[1]!r}")
+    elif stime > etime:
+        errors.append(f"line {line}: end time before start time")
+    elif row_data[2] == "point_activity" and stime != etime:
+        warnings.append(f"line {line}: point_activity with duration")
+    if (row_data[5] and sframe < 0) or (row_data[6] and eframe < 0):
+        errors.append(f"line {line}: frame {row_data[5]!r} / {row_data[6]!r}")
+    elif sframe >= 0 and eframe >= 0 and sframe > eframe:
+        errors.append(f"line {line}: end frame before start frame")
+    if row_data[4] != video and label_file_name(row_data[4]) != video:
+        warnings.append(f"line {line}: video {row_data[4]!r} belongs to another label file")
+
+
+def _validate_store(store: LabelStore, video: str, errors: List[str], warnings: List[str]):
+    """
+    Helper to check a whole store at once (.npz files and files with journal).
+    """
+    types = np.array(store.types.values + [""], dtype=object)[store.type_codes]
+    known = np.isin(types, ACT_TYPES)
+    open_windows = np.isnan(store.etime)
+    checks = [(errors, np.isnan(store.stime), "start time missing"),
+              (errors, ~known, "unknown type"),
+              (errors, open_windows & (types != "time_window"), "end time missing"),
+              (warnings, open_windows & (types == "time_window"), "time_window not closed"),
+              (errors, store.stime > store.etime, "end time before start time"),
+              (warnings, (types == "point_activity") & (store.stime != store.etime) & ~open_windows,
+               "point_activity with duration"),
+              (errors, (store.sframe >= 0) & (store.eframe >= 0) & (store.sframe > store.eframe),
+               "end frame before start frame")]
+    for messages, mask, text in checks:
+        rows = np.flatnonzero(mask)
+        for row in rows[:MAX_MESSAGES].tolist():
+            messages.append(f"row {row + 1}: {text}")
+    vids = [vid for vid in store.vids.values if vid != video and label_file_name(vid) != video]
+    for vid in vids[:MAX_MESSAGES]:
+        warnings.append(f"video {vid!r} belongs to another label file")
+
+
+def validate_file(entry: Tuple[str, Optional[str]]) -> Tuple[str, int, List[str], List[str]]:
+    """
+    Checking one label file. Returns the file, the number of rows, the errors and the warnings. Runs within a
+    worker process.
+    """
+    base_path, path = entry
+    video = os.path.basename(base_path)
+    errors, warnings, rows = [], [], 0
+    if os.path.exists(base_path + ".journal"):
+        warnings.append("unsaved changes inside the journal (included)")
+    try:
+        if path is not None and path.endswith(".csv") and not os.path.exists(base_path + ".journal"):
+            with open(path, "r", newline="") as file:
+                csvreader = csv.reader(file, delimiter=";")
+                header = next(csvreader, None)
+                if header not in (CSV_HEADER, CSV_HEADER[:5]):
+                    errors.append(f"header {header}")
+                for row_data in csvreader:
+                    if row_data:
+                        rows += 1
+                        _validate_row(row_data, csvreader.line_num, video, errors, warnings)
+        else:
+            for store in iter_labels(base_path, path):
+                rows += len(store)
+                _validate_store(store, video, errors, warnings)
+    except (OSError, ValueError, KeyError, UnicodeDecodeError, csv.Error) as error:
+        errors.append(f"not readable: {error}")
+    return path or base_path + ".journal", rows, errors, warnings
+
+
+def load_file(entry: Tuple[str, Optional[str]]) -> LabelStore:
+    """
+    All labels of one label file (with its journal) as one store. Runs within a worker process.
+    """
+    store = LabelStore(capacity=0)
+    for chunk in iter_labels(*entry):
+        store.extend(chunk)
+    return store
+
+
+def convert_file(entry: Tuple[str, Optional[str]], label_format: str) -> Tuple[str, Optional[str], int]:
+    """
+    Converting one label file to label_format and compacting its journal (like saving within the app). Files
+    already in the format without journal are not touched. Returns the old file, the new file (None if not
+    changed) and the number of rows. Runs within a worker process.
+    """
+    base_path, path = entry
+    journal = LabelJournal(base_path)
+    if path is not None and path.endswith("." + label_format) and not os.path.exists(journal.path):
+        return path, None, -1
+    store, _replayed, offset = journal.load(label_format)
+    journal.compact(store, offset, label_format)
+    return path or journal.path, journal.label_path(label_format), len(store)
+
+
+def file_stats(entry: Tuple[str, Optional[str]]) -> Dict[str, dict]:
+    """
+    Number of labels per label and type and the duration (seconds) of the closed time_windows per label of one
+    label file. Counted with NumPy, chunk by chunk. Runs within a worker process.
+    """
+    stats = {"labels": {}, "types": {}, "duration": {}, "videos": set(), "open": 0, "rows": 0}
+    for store in iter_labels(*entry):
+        if not len(store):
+            continue
+        stats["rows"] += len(store)
+        stats["videos"].update(store.vids.values[code] for code in np.unique(store.vid_codes).tolist())
+        windows = (np.array(store.types.values, dtype=object)[store.type_codes] == "time_window")
+        closed = windows & ~np.isnan(store.etime)
+        stats["open"] += int(np.count_nonzero(windows & ~closed))
+        counts = np.bincount(store.label_codes, minlength=len(store.labels))
+        durations = np.bincount(store.label_codes[closed], weights=(store.etime - store.stime)[closed],
+                                minlength=len(store.labels))
+        for code in np.flatnonzero(counts).tolist():
+            label = store.labels.values[code]
+            stats["labels"][label] = stats["labels"].get(label, 0) + int(counts[code])
+            stats["duration"][label] = stats["duration"].get(label, 0.0) + float(durations[code])
+        for code, count in enumerate(np.bincount(store.type_codes, minlength=len(store.types)).tolist()):
+            if count:
+                act_type = store.types.values[code]
+                stats["types"][act_type] = stats["types"].get(act_type, 0) + count
+    return stats
+
+
+def file_classes(entry: Tuple[str, Optional[str]]) -> set:
+    """
+    (act type, label) of all valid labels of one label file. Runs within a worker process.
+    """
+    classes = set()
+    for store in iter_labels(*entry):
+        classes |= label_classes(store)
+    return {(act_type, label) for act_type, label in classes if act_type in ACT_TYPES and label}
+
+
+def _init_export(columns: Dict[Tuple[str, str], int], videos: Dict[str, tuple], fps: Optional[float],
+                 video_folder: str, frame_folder: str):
+    _export.update(columns=columns, videos=videos, fps=fps, video_folder=video_folder, frame_folder=frame_folder)
+
+
+def export_file(entry: Tuple[str, Optional[str]]) -> List[tuple]:
+    """
+    Per-frame targets of every video of one label file: (video, targets, timestamps, source, skipped labels).
+    Without frame index, the fps of the playlist cache (or --fps) is taken, the duration of a video not within
+    the cache is up to its last label. targets is None, if there are no frames. Runs within a worker process.
+    """
+    store = load_file(entry)
+    results = []
+    for code in np.unique(store.vid_codes).tolist():
+        video = store.vids.values[code]
+        rows = np.flatnonzero(store.vid_codes == code)
+        fps, duration = _export["videos"].get(video, (None, None))
+        fps = fps or _export["fps"]
+        if fps and not duration:
+            duration = float(np.nanmax(np.concatenate([store.stime[rows], store.etime[rows]]))) + 1 / fps
+        timestamps, source = frame_timestamps(video, fps, duration, _export["video_folder"], _export["frame_folder"])
+        if timestamps is None or not len(timestamps):
+            results.append((video, None, None, "", len(rows)))
+            continue
+        targets, skipped = paint_targets(store, rows, timestamps, _export["columns"])
+        results.append((video, targets, timestamps, source, skipped))
+    return results
+
+
+def _pool(jobs: int, initializer=None, initargs: tuple = ()) -> multiprocessing.Pool:
+    return multiprocessing.Pool(processes=jobs or None, initializer=initializer, initargs=initargs)
+
+
+def validate(entries: List[tuple], jobs: int) -> int:
+    failed, total = 0, 0
+    with _pool(jobs) as pool:
+        for path, rows, errors, warnings in pool.imap(validate_file, entries, chunksize=8):
+            total += rows
+            failed += bool(errors)
+            if errors or warnings:
+                print(f"{path}: {rows} rows, {len(errors)} errors, {len(warnings)} warnings")
+                for text in errors[:MAX_MESSAGES]:
+                    print(f"  ERROR   {text}")
+                for text in warnings[:MAX_MESSAGES]:
+                    print(f"  WARNING {text}")
+                hidden = max(len(errors) - MAX_MESSAGES, 0) + max(len(warnings) - MAX_MESSAGES, 0)
+                if hidden:
+                    print(f"  ... {hidden} more")
+    print(f"{len(entries)} files, {total} rows, {failed} files with errors")
+    return 1 if failed else 0
+
+
+def merge(entries: List[tuple], jobs: int, output: str) -> int:
+    """
+    Writing all labels into one file. A .csv is written file by file, a .npz needs all labels in memory.
+    """
+    rows = 0
+    tmp_path = output + ".tmp"
+    with _pool(jobs) as pool:
+        stores = pool.imap(load_file, entries, chunksize=8)  # In the order of the files
+        if output.endswith(".npz"):
+            merged = LabelStore()
+            for store in stores:
+                merged.extend(store)
+            replace_file(output, npz_bytes(merged))
+            rows = len(merged)
+        else:
+            with open(tmp_path, "w", newline="") as file:
+                csvwriter = csv.writer(file, delimiter=";")
+                csvwriter.writerow(CSV_HEADER)
+                for store in stores:
+                    csvwriter.writerows(store.rows_text(list(range(len(store)))))
+                    rows += len(store)
+            os.replace(tmp_path, output)
+    print(f"{len(entries)} files, {rows} rows -> {output}")
+    return 0
+
+
+def convert(entries: List[tuple], jobs: int, label_format: str) -> int:
+    converted = 0
+    with _pool(jobs) as pool:
+        results = pool.starmap(convert_file, [(entry, label_format) for entry in entries], chunksize=8)
+    for path, new_path, rows in results:
+        if new_path is not None:
+            converted += 1
+            print(f"{path} -> {new_path} ({rows} rows)")
+    print(f"{converted} of {len(entries)} files converted to {label_format}")
+    return 0
+
+
+def stats(entries: List[tuple], jobs: int, as_json: bool) -> int:
+    total = {"labels": {}, "types": {}, "duration": {}, "videos": set(), "open": 0, "rows": 0}
+    with _pool(jobs) as pool:
+        for part in pool.imap_unordered(file_stats, entries, chunksize=8):
+            for key in ("labels", "types", "duration"):
+                for name, value in part[key].items():
+                    total[key][name] = total[key].get(name, 0) + value
+            total["videos"] |= part["videos"]
+            total["open"] += part["open"]
+            total["rows"] += part["rows"]
+    summary = {"files": len(entries), "videos": len(total["videos"]), "labels": total["rows"],
+               "open_time_windows": total["open"], "types": total["types"],
+               "per_label": {label: {"count": count, "duration": round(total["duration"][label], 3)}
+                             for label, count in sorted(total["labels"].items(), key=lambda item: -item[1])}}
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{summary['files']} files, {summary['videos']} videos, {summary['labels']} labels, "
+          f"{summary['open_time_windows']} open time_windows")
+    for act_type, count in sorted(total["types"].items()):
+        print(f"{act_type:<20}{count:>12}")
+    print(f"{'LABEL':<30}{'COUNT':>12}{'DURATION (s)':>16}")
+    for label, values in summary["per_label"].items():
+        print(f"{label:<30}{values['count']:>12}{values['duration']:>16.3f}")
+    return 0
+
+
+def export(entries: List[tuple], jobs: int, data_folder: str, output: str, shard_frames: int, file_format: str,
+           compress: bool, fps: Optional[float], classes_path: Optional[str]) -> int:
+    """
+    Writing the per-frame targets of all videos into shards. The classes (columns) are collected from all label
+    files first, unless they are given by --classes (the index.json of an earlier export or a list of
+    [type, label]), to get the same columns for more than one export. The files are processed in batches, so only
+    a few videos and one shard are in memory.
+    """
+    if classes_path is not None:
+        with open(classes_path, "r") as file:
+            classes = json.load(file)
+        if isinstance(classes, dict):
+            classes = classes["classes"]
+        classes = [(item["type"], item["label"]) if isinstance(item, dict) else tuple(item) for item in classes]
+    else:
+        with _pool(jobs) as pool:
+            classes = sort_classes(set().union(*pool.imap_unordered(file_classes, entries, chunksize=8)))
+    project_folder = os.path.dirname(os.path.abspath(data_folder))
+    cache_path = os.path.join(data_folder, "video_library.sqlite")
+    videos = {}
+    if os.path.exists(cache_path):  # fps and duration of the playlist, nothing is probed
+        videos = {info.name: (info.fps, info.duration)
+                  for info in VideoLibrary(os.path.join(project_folder, "videos"), data_folder, cache_path).cached()}
+    initargs = ({label_class: column for column, label_class in enumerate(classes)}, videos, fps,
+                os.path.join(project_folder, "videos"), os.path.join(project_folder, "frames"))
+
+    writer = ShardWriter(output, shard_frames, file_format, compress)
+    records, missing, skipped = [], [], 0
+    batch = max(jobs or os.cpu_count() or 1, 1) * 4
+    with _pool(jobs, _init_export, initargs) as pool:
+        for start in range(0, len(entries), batch):
+            for results in pool.imap(export_file, entries[start:start + batch]):
+                for video, targets, timestamps, source, skipped_labels in results:
+                    skipped += skipped_labels
+                    if targets is None:
+                        missing.append(video)
+                        continue
+                    records.append({"name": video, "frames": len(targets), "source": source,
+                                    "labels": int(np.count_nonzero(targets.any(axis=0))),
+                                    "shards": writer.add(len(records), targets, timestamps)})
+    writer.write_index(classes, records)
+    frames = sum(record["frames"] for record in records)
+    print(f"{len(records)} videos, {frames} frames, {len(classes)} classes, {len(writer.shards)} shards -> {output}")
+    if skipped:
+        print(f"{skipped} labels skipped (open time_windows, unknown types, classes not within --classes)")
+    for video in missing[:MAX_MESSAGES]:
+        print(f"  WARNING no frame index and no fps: {video!r} skipped (see --fps)")
+    if len(missing) > MAX_MESSAGES:
+        print(f"  ... {len(missing) - MAX_MESSAGES} more")
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Label files within \"data\" without the GUI.")
+    parser.add_argument("--data", default="data", help="folder of the label files (default: data)")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: number of CPUs)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("validate", help="check all label files")
+    merge_parser = commands.add_parser("merge", help="all label files as one dataset")
+    merge_parser.add_argument("--output", default="dataset.csv", help=".csv or .npz (default: dataset.csv)")
+    convert_parser = commands.add_parser("convert", help="convert all label files")
+    convert_parser.add_argument("--to", choices=LABEL_FORMATS, required=True)
+    stats_parser = commands.add_parser("stats", help="labels and durations per label")
+    stats_parser.add_argument("--json", action="store_true", help="print as json")
+    export_parser = commands.add_parser("export", help="per-frame training targets of every video")
+    export_parser.add_argument("--output", default="targets", help="folder of the shards (default: targets)")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default=EXPORT_FORMATS[0],
+                               help="one .npz per shard or one .npy per array (default: npz)")
+    export_parser.add_argument("--compress", action="store_true", help="compressed .npz")
+    export_parser.add_argument("--shard-frames", type=int, default=SHARD_FRAMES,
+                               help=f"frames per shard (default: {SHARD_FRAMES})")
+    export_parser.add_argument("--fps", type=float, help="fps of videos without frame index and playlist cache")
+    export_parser.add_argument("--classes", help="columns of an earlier export (index.json)")
+    args = parser.parse_args(argv)
+
+    entries = label_files(args.data)
+    if args.command == "validate":
+        return validate(entries, args.jobs)
+    if args.command == "merge":
+        if os.path.abspath(os.path.dirname(args.output) or ".") == os.path.abspath(args.data):
+            parser.error("--output can't be within the folder of the label files")
+        return merge(entries, args.jobs, args.output)
+    if args.command == "convert":
+        return convert(entries, args.jobs, args.to)
+    if args.command == "export":
+        if os.path.abspath(args.output).startswith(os.path.join(os.path.abspath(args.data), "")) or \
+                os.path.abspath(args.output) == os.path.abspath(args.data):
+            parser.error("--output can't be within the folder of the label files")
+        if args.shard_frames < 1:
+            parser.error("--shard-frames must be at least 1")
+        return export(entries, args.jobs, args.data, args.output, args.shard_frames, args.format, args.compress,
+                      args.fps, args.classes)
+    return stats(entries, args.jobs, args.json)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Per-frame training targets of the labels (for machine learning). Every video becomes a dense matrix with one row per
+frame and one column per class (act type and label): time_windows are set on all their frames (multi-hot),
+point_activities only on their frame (impulse). The frames are taken from the frame index of the video (exact
+timestamps, see frame_index.py), otherwise from the fps of the playlist cache. The matrices are written video by
+video into shards of a fixed number of frames, so the memory stays bounded also for very large datasets. No Qt in
+here, see "export" of label_batch.py.
+"""
+import os
+import math
+import json
+
+import numpy as np
+
+from frame_index import FrameIndex, FRAME_FOLDER, load_frame_index
+from label_store import LabelStore, label_file_name
+
+# For Documentation
+from typing import Dict, List, Optional, Set, Tuple
+
+SHARD_FRAMES = 1000000  # Frames (rows) per shard
+EXPORT_FORMATS = ("npz", "npy")
+ARRAYS = ("targets", "video", "frame", "time")  # Arrays of a shard
+
+
+def label_classes(store: LabelStore) -> Set[Tuple[str, str]]:
+    """
+    (act type, label) of all labels of a store.
+    """
+    combined = np.unique(store.type_codes.astype(np.int64) * len(store.labels) + store.label_codes)
+    return {(store.types.values[code // len(store.labels)], store.labels.values[code % len(store.labels)])
+            for code in combined.tolist()}
+
+
+def sort_classes(classes: Set[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Order of the columns: time_windows first, then point_activities, by label.
+    """
+    return sorted(classes, key=lambda item: (item[0] != "time_window", item[0], item[1]))
+
+
+def frame_timestamps(video_name: str, fps: Optional[float] = None, duration: Optional[float] = None,
+                     video_folder: str = "videos", frame_folder: str = FRAME_FOLDER) -> Tuple[Optional[np.ndarray],
+                                                                                             str]:
+    """
+    Timestamps of the frames of a video and where they come from ("frames" or "fps"). The frame index is taken
+    from the cache (read by ffprobe, if the video is there and the cache is outdated). Without frame index, the
+    frames follow fps and duration. None if neither is known.
+    """
+    cache_path = os.path.join(frame_folder, label_file_name(video_name) + ".npz")
+    video_path = os.path.join(video_folder, video_name)
+    if os.path.exists(video_path):
+        try:
+            frame_index = load_frame_index(video_path, cache_path)
+        except OSError:
+            frame_index = None
+        if frame_index is not None:
+            return frame_index.timestamps, "frames"
+    elif os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                return cached["timestamps"], "frames"
+        except (OSError, ValueError, KeyError):
+            pass
+    if fps and duration:
+        return np.arange(int(math.ceil(duration * fps)), dtype=np.float64) / fps, "fps"
+    return None, ""
+
+
+def paint_targets(store: LabelStore, rows: np.ndarray, timestamps: np.ndarray,
+                  columns: Dict[Tuple[str, str], int]) -> Tuple[np.ndarray, int]:
+    """
+    Dense (frames, classes) uint8 matrix of the labels in rows. The frame of a label is its SFrame/EFrame, if
+    known, otherwise the frame shown at its time. time_windows are painted as ranges within a difference array
+    (+1 at the start, -1 behind the end, cumulative sum), point_activities set one frame. Nothing is looped per
+    label. Returns the matrix and the number of skipped labels (open time_windows, classes not in columns).
+    """
+    frame_count, class_count = len(timestamps), len(columns)
+    lookup = np.full(max(len(store.types) * len(store.labels), 1), -1, dtype=np.int64)
+    for (act_type, label), column in columns.items():
+        type_code, label_code = store.types.codes.get(act_type), store.labels.codes.get(label)
+        if type_code is not None and label_code is not None:
+            lookup[type_code * len(store.labels) + label_code] = column
+    column_of = lookup[store.type_codes[rows].astype(np.int64) * len(store.labels) + store.label_codes[rows]]
+
+    frame_index = FrameIndex(timestamps)
+    stime, etime = store.stime[rows], store.etime[rows]
+    sframe, eframe = store.sframe[rows], store.eframe[rows]
+    start = np.clip(np.where(sframe >= 0, sframe, frame_index.frames_at(stime)), 0, frame_count - 1)
+    end = np.clip(np.where(eframe >= 0, eframe, frame_index.frames_at(np.nan_to_num(etime))), 0, frame_count - 1)
+    type_codes = store.type_codes[rows]
+    windows = (type_codes == store.types.codes.get("time_window", -1)) & ~np.isnan(etime) & (column_of >= 0)
+    points = (type_codes == store.types.codes.get("point_activity", -1)) & (column_of >= 0)
+
+    # A reversed time_window (bad times or frames) is painted from its earlier to its later frame, otherwise its -1
+    # would come before its +1 and hide frames of other time_windows of the same class
+    first, last = np.minimum(start[windows], end[windows]), np.maximum(start[windows], end[windows])
+    size = (frame_count + 1) * class_count
+    changes = np.bincount(first * class_count + column_of[windows], minlength=size) - \
+        np.bincount((last + 1) * class_count + column_of[windows], minlength=size)
+    targets = (np.cumsum(changes.reshape(frame_count + 1, class_count)[:frame_count], axis=0) > 0).astype(np.uint8)
+    targets[start[points], column_of[points]] = 1
+    return targets, int(len(rows) - np.count_nonzero(windows | points))
+
+
+class ShardWriter:
+    """
+    Writing the targets of the videos one after another into shards of shard_frames rows: shard_00000.npz (or one
+    .npy per array with "npy", memory-mappable) with the arrays "targets" (frames, classes), "video" (number of the
+    video within index.json), "frame" (frame number within the video) and "time" (timestamp of the frame). Only one
+    shard is kept in memory. A video can be split over two or more shards.
+    """
+
+    def __init__(self, folder: str, shard_frames: int = SHARD_FRAMES, file_format: str = "npz",
+                 compress: bool = False):
+        self.folder = folder
+        self.shard_frames = shard_frames
+        self.file_format = file_format
+        self.compress = compress
+        self.shards = []  # Names of the written shards
+        self.files = set()  # Written files (without folder)
+        self._parts = []  # Arrays of the shard, that is not written yet
+        self._rows = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def add(self, video_number: int, targets: np.ndarray, timestamps: np.ndarray) -> List[List[int]]:
+        """
+        Adding the targets of a video. Returns where the frames are: [shard, first row, rows] for every shard.
+        """
+        locations, offset = [], 0
+        while offset < len(targets):
+            count = min(self.shard_frames - self._rows, len(targets) - offset)
+            part = slice(offset, offset + count)
+            self._parts.append((targets[part], np.full(count, video_number, dtype=np.int32),
+                                np.arange(offset, offset + count, dtype=np.int64), timestamps[part]))
+            locations.append([len(self.shards), self._rows, count])
+            self._rows += count
+            offset += count
+            if self._rows == self.shard_frames:
+                self.flush()
+        return locations
+
+    def flush(self):
+        """
+        Writing the shard, that is not written yet (also if it is not full).
+        """
+        if not self._parts:
+            return
+        arrays = {name: np.concatenate([part[number] for part in self._parts])
+                  for number, name in enumerate(ARRAYS)}
+        name = f"shard_{len(self.shards):05d}"
+        if self.file_format == "npy":
+            for array_name, array in arrays.items():
+                path = os.path.join(self.folder, f"{name}.{array_name}.npy")
+                np.save(path + ".tmp.npy", array)
+                os.replace(path + ".tmp.npy", path)
+                self.files.add(os.path.basename(path))
+        else:
+            path = os.path.join(self.folder, name + ".npz")
+            with open(path + ".tmp", "wb") as file:
+                (np.savez_compressed if self.compress else np.savez)(file, **arrays)
+            os.replace(path + ".tmp", path)
+            self.files.add(os.path.basename(path))
+        self.shards.append(name)
+        self._parts, self._rows = [], 0
+
+    def write_index(self, classes: List[Tuple[str, str]], videos: List[dict]):
+        """
+        Writing index.json: the classes (columns of "targets"), the videos (number is the position) with their
+        frames, the source of the timestamps and their locations within the shards. Shards of an earlier export
+        into the same folder are removed.
+        """
+        self.flush()
+        index = {"format": self.file_format, "shard_frames": self.shard_frames, "arrays": list(ARRAYS),
+                 "classes": [{"type": act_type, "label": label} for act_type, label in classes],
+                 "shards": self.shards, "videos": videos}
+        with open(os.path.join(self.folder, "index.json"), "w") as file:
+            json.dump(index, file, indent=1)
+        for entry in os.scandir(self.folder):
+            if entry.name.startswith("shard_") and entry.name not in self.files:
+                os.remove(entry.path)
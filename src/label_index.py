@@ -0,0 +1,337 @@
+"""
+Indexes over the labels of a LabelStore for video_labeler.py. An interval index over STime/ETime, to answer which
+labels are active at the playhead and which label starts next or before. And an inverted index over Type, Label
+and Vid for filtering the data-table. The indexes are built from the columns at once and are only built again after
+many changes, single inserted, closed or deleted labels are kept aside. No Qt in here.
+"""
+import math
+import shlex
+
+import numpy as np
+
+from label_store import LabelStore, parse_time
+
+# For Documentation
+from typing import Dict, List, Optional, Tuple
+
+TOLERANCE = 0.02  # Seconds, a label is active this long before its start and after its end (point_activities)
+LEAF_SIZE = 64  # Intervals of a node, that are not split any further (scanned at once)
+REBUILD_AFTER = 512  # Changes kept aside, until the index is built again
+SEARCH_COLUMNS = {"type": 2, "label": 3, "vid": 4}  # Prefixes of the filter terms -> column
+
+
+class IntervalIndex:
+    """
+    Static centered interval tree, flattened into arrays. Every node keeps the intervals containing its center
+    twice: sorted by start and sorted by end (descending). A query walks down one path of the tree and takes a
+    prefix of one of the two lists of every node with a binary search, so it is O(log n + k) (k found intervals).
+    Open intervals (end is infinite) are allowed.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, ids: np.ndarray):
+        self.size = len(ids)
+        centers, lefts, rights, offsets, counts, leaves = [], [], [], [], [], []
+        by_start, by_end = [], []
+        position = 0
+        stack = [(np.arange(self.size), -1, False)]  # (intervals, parent node, is the right child)
+        while stack:
+            intervals, parent, right = stack.pop()
+            node = len(centers)
+            if parent >= 0:
+                (rights if right else lefts)[parent] = node
+            leaf = len(intervals) <= LEAF_SIZE
+            center = 0.0
+            if leaf:
+                here = intervals
+            else:
+                endpoints = np.concatenate((starts[intervals], ends[intervals]))
+                center = float(np.median(endpoints[np.isfinite(endpoints)]))
+                left = intervals[ends[intervals] < center]
+                right_intervals = intervals[starts[intervals] > center]
+                here = intervals[(ends[intervals] >= center) & (starts[intervals] <= center)]
+                if len(right_intervals):
+                    stack.append((right_intervals, node, True))
+                if len(left):
+                    stack.append((left, node, False))
+            centers.append(center)
+            lefts.append(-1)
+            rights.append(-1)
+            offsets.append(position)
+            counts.append(len(here))
+            leaves.append(leaf)
+            by_start.append(here[np.argsort(starts[here], kind="stable")])
+            by_end.append(here[np.argsort(-ends[here], kind="stable")])
+            position += len(here)
+        self.centers, self.lefts, self.rights = centers, lefts, rights
+        self.offsets, self.counts, self.leaves = offsets, counts, leaves
+        order_start = np.concatenate(by_start) if by_start else np.empty(0, dtype=np.int64)
+        order_end = np.concatenate(by_end) if by_end else np.empty(0, dtype=np.int64)
+        self.start_sorted = starts[order_start]
+        self.end_of_start = ends[order_start]
+        self.id_by_start = ids[order_start]
+        self.negative_end = -ends[order_end]  # Ascending, so searchsorted can be used
+        self.id_by_end = ids[order_end]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def stab(self, seconds: float) -> np.ndarray:
+        """
+        Ids of all intervals containing the time (start <= seconds <= end).
+        """
+        found = []
+        node = 0 if self.size else -1
+        while node >= 0:
+            first, last = self.offsets[node], self.offsets[node] + self.counts[node]
+            if self.leaves[node]:
+                inside = (self.start_sorted[first:last] <= seconds) & (self.end_of_start[first:last] >= seconds)
+                found.append(self.id_by_start[first:last][inside])
+                break
+            if seconds < self.centers[node]:
+                count = np.searchsorted(self.start_sorted[first:last], seconds, side="right")
+                found.append(self.id_by_start[first:first + count])
+                node = self.lefts[node]
+            elif seconds > self.centers[node]:
+                count = np.searchsorted(self.negative_end[first:last], -seconds, side="right")
+                found.append(self.id_by_end[first:first + count])
+                node = self.rights[node]
+            else:
+                found.append(self.id_by_start[first:last])
+                break
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+class LabelIntervals:
+    """
+    Interval index of the labels of every video of a LabelStore, addressed by the stable label ids. Open
+    time_windows are active from their start on. Changes (insert() and remove()) are kept aside and searched
+    linearly, after REBUILD_AFTER changes (or reset()) the index of a video is built again, when it is queried.
+    """
+
+    def __init__(self, tolerance: float = TOLERANCE, rebuild_after: int = REBUILD_AFTER):
+        self.tolerance = tolerance
+        self.rebuild_after = rebuild_after
+        self._videos = {}  # Video -> (IntervalIndex, starts sorted, ids sorted by start)
+        self._added = {}  # Label id -> (video, start, end), inserted since the indexes were built
+        self._removed = set()  # Label ids removed since the indexes were built
+
+    def reset(self):
+        self._videos = {}
+        self._added = {}
+        self._removed = set()
+
+    def insert(self, label_id: int, video: str, start: float, end: float):
+        if math.isnan(start):
+            return
+        self._added[label_id] = (video, start, math.inf if math.isnan(end) else end)
+        self._changed()
+
+    def remove(self, label_id: int):
+        self._added.pop(label_id, None)
+        self._removed.add(label_id)
+        self._changed()
+
+    def _changed(self):
+        if len(self._added) + len(self._removed) > self.rebuild_after:
+            self.reset()
+
+    def _video(self, store: LabelStore, video: str) -> Tuple[IntervalIndex, np.ndarray, np.ndarray]:
+        """
+        Helper returning the index of a video, built from the columns of the store if needed. Building it
+        includes all the changes kept aside, so they are dropped afterwards.
+        """
+        if self._added or self._removed:
+            self.reset()
+        index = self._videos.get(video)
+        if index is None:
+            code = store.vids.codes.get(video)
+            rows = np.flatnonzero((store.vid_codes == code) & ~np.isnan(store.stime)) if code is not None else \
+                np.empty(0, dtype=np.int64)
+            starts, ends, ids = store.stime[rows], store.etime[rows], store.ids[rows]
+            ends = np.where(np.isnan(ends), np.inf, ends)
+            order = np.argsort(starts, kind="stable")
+            index = (IntervalIndex(starts - self.tolerance, ends + self.tolerance, ids), starts[order], ids[order])
+            self._videos[video] = index
+        return index
+
+    def _pending(self, video: str) -> Dict[int, Tuple[float, float]]:
+        return {label_id: (start, end) for label_id, (vid, start, end) in self._added.items() if vid == video}
+
+    def active(self, store: LabelStore, video: str, seconds: float) -> np.ndarray:
+        """
+        Ids of the labels of the video, that are active at this time.
+        """
+        if video not in self._videos:
+            self._video(store, video)
+        tree = self._videos[video][0]
+        found = tree.stab(seconds)
+        if self._removed:
+            found = found[~np.isin(found, list(self._removed))]
+        pending = [label_id for label_id, (start, end) in self._pending(video).items()
+                   if start - self.tolerance <= seconds <= end + self.tolerance]
+        return np.concatenate((found, np.array(pending, dtype=np.int64))) if pending else found
+
+    def next_start(self, store: LabelStore, video: str, seconds: float,
+                   backwards: bool = False) -> Optional[Tuple[float, int]]:
+        """
+        (start, id) of the first label starting after this time (or the last one starting before it, if backwards).
+        None, if there is no such label.
+        """
+        if video not in self._videos:
+            self._video(store, video)
+        _tree, starts, ids = self._videos[video]
+        candidates = [(start, label_id) for label_id, (start, _end) in self._pending(video).items()
+                      if (start < seconds if backwards else start > seconds)]
+        if backwards:
+            position = int(np.searchsorted(starts, seconds, side="left")) - 1
+            while position >= 0 and int(ids[position]) in self._removed:
+                position -= 1
+            if position >= 0:
+                candidates.append((float(starts[position]), int(ids[position])))
+            return max(candidates) if candidates else None
+        position = int(np.searchsorted(starts, seconds, side="right"))
+        while position < len(starts) and int(ids[position]) in self._removed:
+            position += 1
+        if position < len(starts):
+            candidates.append((float(starts[position]), int(ids[position])))
+        return min(candidates) if candidates else None
+
+
+def parse_query(query: str) -> Tuple[List[Tuple[Optional[int], str]], List[Tuple[float, float]]]:
+    """
+    Splitting a filter of the data-table into terms and time ranges. Terms are (column, text): "label:run",
+    "type:point" or "vid:a.mp4" search within one column (Label, Type, Vid), other words within all three. "10-20"
+    (seconds) is a time range. Texts with spaces can be quoted. All terms and ranges must match.
+    """
+    try:
+        words = shlex.split(query)
+    except ValueError:  # Quote not closed yet, while typing
+        words = query.split()
+    terms, ranges = [], []
+    for word in words:
+        prefix, colon, text = word.partition(":")
+        if colon and prefix.lower() in SEARCH_COLUMNS:
+            if text:
+                terms.append((SEARCH_COLUMNS[prefix.lower()], text.lower()))
+            continue
+        first, dash, last = word.partition("-")
+        try:
+            if dash and first:
+                ranges.append((float(first), float(last) if last else math.inf))
+                continue
+        except ValueError:
+            pass
+        terms.append((None, word.lower()))
+    return terms, ranges
+
+
+class LabelSearch:
+    """
+    Inverted index of the text columns (Type, Label, Vid) of a LabelStore: every value of a column points to the ids
+    of its labels (posting list). A term of the filter only looks at the values (a few hundred at most), the labels
+    are taken from the posting lists of the matching values. The posting lists are built from the columns at once
+    (one stable argsort per column), inserted labels are kept aside, until REBUILD_AFTER changes. Deleted labels
+    have no row anymore (LabelStore.rows_of()), so they are skipped without changing the posting lists.
+    """
+
+    def __init__(self, rebuild_after: int = REBUILD_AFTER):
+        self.rebuild_after = rebuild_after
+        self._postings = None  # Column -> (values, ids sorted by value, offset of every value)
+        self._added = {}  # Label id -> row texts, inserted since the posting lists were built
+        self._changes = 0  # Inserted and deleted labels since the posting lists were built
+
+    def reset(self):
+        self._postings = None
+        self._added = {}
+        self._changes = 0
+
+    def insert(self, label_id: int, row_data: List[str]):
+        if self._postings is not None:
+            self._added[label_id] = row_data
+            self._changed()
+
+    def remove(self, label_id: int):
+        if self._postings is not None:
+            self._added.pop(label_id, None)
+            self._changed()
+
+    def _changed(self):
+        self._changes += 1
+        if self._changes > self.rebuild_after:
+            self.reset()
+
+    def _build(self, store: LabelStore):
+        """
+        Helper building the posting lists of all text columns.
+        """
+        self.reset()
+        self._postings = {}
+        for column, dictionary, codes in ((2, store.types, store.type_codes), (3, store.labels, store.label_codes),
+                                          (4, store.vids, store.vid_codes)):
+            order = np.argsort(codes, kind="stable")
+            offsets = np.searchsorted(codes[order], np.arange(len(dictionary) + 1))
+            self._postings[column] = ([value.lower() for value in dictionary.values], store.ids[order], offsets)
+
+    def _term(self, store: LabelStore, column: int, text: str) -> Optional[np.ndarray]:
+        """
+        Helper returning a mask of all rows, whose value within the column contains the text, None if there is no
+        such row. Rare values are taken from the posting lists. If the matching values cover many labels, comparing
+        the codes of the whole column once is faster than scattering the posting lists.
+        """
+        values, ids, offsets = self._postings[column]
+        codes = np.array([code for code, value in enumerate(values) if text in value], dtype=np.int64)
+        added = [label_id for label_id, row_data in self._added.items() if text in row_data[column].lower()]
+        if not len(codes) and not added:
+            return None
+        if int(np.sum(offsets[codes + 1] - offsets[codes])) > len(store) // 8:
+            dictionary, column_codes = {2: (store.types, store.type_codes), 3: (store.labels, store.label_codes),
+                                        4: (store.vids, store.vid_codes)}[column]
+            lookup = np.array([text in value.lower() for value in dictionary.values])
+            return lookup[column_codes]
+        found = [ids[offsets[code]:offsets[code + 1]] for code in codes.tolist()]
+        rows = store.rows_of(np.concatenate(found + [np.array(added, dtype=np.int64)]))
+        matched = np.zeros(len(store), dtype=bool)
+        matched[rows[rows >= 0]] = True  # Deleted labels have no row anymore
+        return matched
+
+    def search(self, store: LabelStore, query: str) -> Optional[np.ndarray]:
+        """
+        Rows (ascending) of all labels matching the filter (see parse_query()). None if the filter is empty.
+        """
+        terms, ranges = parse_query(query)
+        if not terms and not ranges:
+            return None
+        if self._postings is None:
+            self._build(store)
+        matched = None
+        for column, text in terms:
+            columns = SEARCH_COLUMNS.values() if column is None else [column]
+            masks = [mask for mask in (self._term(store, searched, text) for searched in columns) if mask is not None]
+            if not masks:
+                return np.empty(0, dtype=np.int64)
+            term = masks[0] if len(masks) == 1 else np.logical_or.reduce(masks)
+            matched = term if matched is None else matched & term
+        if matched is not None and np.count_nonzero(matched) <= len(store) // 8:
+            rows = np.flatnonzero(matched)  # Few rows, the time ranges are only checked for them
+            for first, last in ranges:
+                ends = store.etime[rows]
+                rows = rows[(store.stime[rows] <= last) & ((ends >= first) | np.isnan(ends))]
+            return rows
+        for first, last in ranges:  # Many rows, whole columns at once
+            ends = store.etime
+            inside = (store.stime <= last) & ((ends >= first) | np.isnan(ends))
+            matched = inside if matched is None else matched & inside
+        return np.flatnonzero(matched)
+
+    @staticmethod
+    def matches(query: str, row_data: List[str]) -> bool:
+        """
+        Whether a single label (row texts) matches the filter, without the index.
+        """
+        terms, ranges = parse_query(query)
+        for column, text in terms:
+            columns = SEARCH_COLUMNS.values() if column is None else [column]
+            if not any(text in row_data[searched].lower() for searched in columns):
+                return False
+        start, end = parse_time(row_data[0]), parse_time(row_data[1])
+        return all(start <= last and (math.isnan(end) or end >= first) for first, last in ranges)
@@ -0,0 +1,838 @@
+"""
+Columnar storage for the labels shown in the data-table of video_labeler.py. No Qt in here, so the labels
+can also be handled without the GUI.
+"""
+import os
+import io
+import csv
+import math
+import zlib
+import struct
+import zipfile
+import threading
+
+import numpy as np
+
+# For Documentation
+from typing import Iterable, Iterator, List, Optional, Tuple, Callable
+
+COLUMNS = ["STime", "ETime", "Type", "Label", "Vid", "SFrame", "EFrame"]  # Header of the data-table
+CSV_HEADER = ["STIME", "ETIME", "TYPE", "LABEL", "VID", "SFRAME", "EFRAME"]  # Header of the .csv files
+WAIT = "WAIT..."  # EndTime of a time_window, that is not closed yet
+LABEL_FORMATS = ("csv", "npz")  # Formats of the label files within "data"
+
+
+def format_time(value: float) -> str:
+    """
+    Converting a stored time back to the text shown in the data-table and written to the csv. Open time_windows
+    are stored as NaN and shown as "WAIT...". Times are shown with three decimals like the playtime widget,
+    as long as this does not lose precision.
+    """
+    if math.isnan(value):
+        return WAIT
+    text = f"{value:.3f}"
+    if float(text) != value:
+        text = repr(value)
+    return text
+
+
+def parse_time(text: str) -> float:
+    """
+    Converting the text of a time (playtime widget or csv) to a float. "WAIT..." or anything else that is not
+    a number will be NaN.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def format_times(values: np.ndarray) -> List[str]:
+    """
+    format_time() for a whole array. Only the values, that need more than three decimals, are formatted one by one.
+    """
+    texts = np.char.mod("%.3f", values).astype(object)
+    texts[np.isnan(values)] = WAIT
+    inexact = np.flatnonzero(~np.isnan(values) & (np.round(values, 3) != values))
+    texts[inexact] = [format_time(value) for value in values[inexact]]
+    return texts.tolist()
+
+
+def format_frame(value: int) -> str:
+    """
+    Text of a frame number, empty if the frame is unknown (-1). For example no frame index or an open time_window.
+    """
+    return "" if value < 0 else str(value)
+
+
+def parse_frame(text: str) -> int:
+    """
+    Converting the text of a frame number to an int, -1 if empty (labels without frame numbers).
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return -1
+
+
+class StringDictionary:
+    """
+    Dictionary-encoding for the text columns (Type, Label, Vid). Every distinct text is stored only once,
+    the columns itself only store the integer codes.
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        """
+        Returning the code of the value. Unknown values will be added to the dictionary.
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+
+class LabelStore:
+    """
+    Holding all the labels of the data-table as columns. STime and ETime are float arrays, Type, Label and Vid
+    are dictionary-encoded integer arrays, SFrame and EFrame are the frame numbers (-1 if unknown). The arrays
+    grow by doubling their capacity, so appending a label is O(1) (amortized).
+    Every label also gets a stable id, which does not change when rows are sorted or removed. It is not written
+    to the label files, so the ids are only valid as long as the store lives.
+    """
+    _ARRAYS = ("_stime", "_etime", "_type", "_label", "_vid", "_sframe", "_eframe", "_id")
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._stime = np.empty(capacity, dtype=np.float64)
+        self._etime = np.empty(capacity, dtype=np.float64)
+        self._type = np.empty(capacity, dtype=np.int32)
+        self._label = np.empty(capacity, dtype=np.int32)
+        self._vid = np.empty(capacity, dtype=np.int32)
+        self._sframe = np.empty(capacity, dtype=np.int64)
+        self._eframe = np.empty(capacity, dtype=np.int64)
+        self._id = np.empty(capacity, dtype=np.int64)
+        self.next_id = 0
+        self._rows = None  # Label id -> row, built lazily by row_of()
+        self._positions = None  # Same as array (index is the id, -1 without label), built lazily by rows_of()
+        self.types = StringDictionary()
+        self.labels = StringDictionary()
+        self.vids = StringDictionary()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def stime(self) -> np.ndarray:
+        return self._stime[:self._size]
+
+    @property
+    def etime(self) -> np.ndarray:
+        return self._etime[:self._size]
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        return self._type[:self._size]
+
+    @property
+    def label_codes(self) -> np.ndarray:
+        return self._label[:self._size]
+
+    @property
+    def vid_codes(self) -> np.ndarray:
+        return self._vid[:self._size]
+
+    @property
+    def sframe(self) -> np.ndarray:
+        return self._sframe[:self._size]
+
+    @property
+    def eframe(self) -> np.ndarray:
+        return self._eframe[:self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._id[:self._size]
+
+    def id_of(self, row: int) -> int:
+        return int(self._id[row])
+
+    def row_of(self, label_id: int) -> Optional[int]:
+        """
+        Row of the label with this id, None if there is no such label (anymore). The lookup-table is rebuilt only
+        after rows were reordered or removed, so this is O(1) (amortized).
+        """
+        if self._rows is None:
+            self._rows = dict(zip(self.ids.tolist(), range(self._size)))
+        return self._rows.get(label_id)
+
+    def rows_of(self, label_ids: np.ndarray) -> np.ndarray:
+        """
+        Rows of many labels at once (vectorized row_of()), -1 for ids without label.
+        """
+        if self._positions is None or len(self._positions) < self.next_id:
+            self._positions = np.full(self.next_id, -1, dtype=np.int64)
+            self._positions[self.ids] = np.arange(self._size)
+        return self._positions[label_ids]
+
+    def _reserve(self, size: int):
+        """
+        Making sure that the arrays can hold at least size rows.
+        """
+        capacity = len(self._stime)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity = max(capacity * 2, 16)
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def append(self, stime: float, etime: float, act_type: str, label: str, vid: str, sframe: int = -1,
+               eframe: int = -1, label_id: Optional[int] = None) -> int:
+        """
+        Appending one label at the end and returning its row. Without label_id the label gets a new id.
+        """
+        row = self._size
+        self._reserve(row + 1)
+        if label_id is None:
+            label_id = self.next_id
+        self.next_id = max(self.next_id, label_id + 1)
+        self._id[row] = label_id
+        if self._rows is not None:
+            self._rows[label_id] = row
+        if self._positions is not None and label_id < len(self._positions):
+            self._positions[label_id] = row
+        self._stime[row] = stime
+        self._etime[row] = etime
+        self._type[row] = self.types.encode(act_type)
+        self._label[row] = self.labels.encode(label)
+        self._vid[row] = self.vids.encode(vid)
+        self._sframe[row] = sframe
+        self._eframe[row] = eframe
+        self._size += 1
+        return row
+
+    def append_text(self, row_data: List[str], label_id: Optional[int] = None) -> int:
+        """
+        Same as append(), but with the texts of a data-table or csv row ("StartTime", "EndTime", "ActType",
+        "Label", "Video", "StartFrame", "EndFrame"). Missing values are empty strings.
+        """
+        row_data = list(row_data) + [""] * (len(COLUMNS) - len(row_data))
+        return self.append(parse_time(row_data[0]), parse_time(row_data[1]), row_data[2], row_data[3], row_data[4],
+                           parse_frame(row_data[5]), parse_frame(row_data[6]), label_id)
+
+    def insert_text(self, rows: List[int], rows_data: List[List[str]], label_ids: List[int]):
+        """
+        Inserting labels (texts like append_text()) with the given ids, so that they end up at the given rows
+        (ascending). Used to put removed labels back to where they were.
+        """
+        start = self._size
+        for row_data, label_id in zip(rows_data, label_ids):
+            self.append_text(row_data, label_id)
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.empty(self._size, dtype=np.int64)
+        old = np.ones(self._size, dtype=bool)
+        old[rows] = False
+        order[rows] = np.arange(start, self._size)
+        order[old] = np.arange(start)
+        self.take(order)
+
+    def extend(self, other: "LabelStore"):
+        """
+        Appending all rows of another store. The codes of the other store are translated to the own dictionaries.
+        """
+        start, size = self._size, len(other)
+        self._reserve(start + size)
+        self._stime[start:start + size] = other.stime
+        self._etime[start:start + size] = other.etime
+        self._sframe[start:start + size] = other.sframe
+        self._eframe[start:start + size] = other.eframe
+        for name, dictionary, other_dictionary, codes in (
+                ("_type", self.types, other.types, other.type_codes),
+                ("_label", self.labels, other.labels, other.label_codes),
+                ("_vid", self.vids, other.vids, other.vid_codes)):
+            translate = np.array([dictionary.encode(value) for value in other_dictionary.values], dtype=np.int32)
+            getattr(self, name)[start:start + size] = translate[codes] if size else codes
+        self._id[start:start + size] = np.arange(self.next_id, self.next_id + size)
+        self.next_id += size
+        self._size += size
+        self._rows = None
+        self._positions = None
+
+    def set_etime(self, row: int, etime: float, eframe: int = -1):
+        self._etime[row] = etime
+        self._eframe[row] = eframe
+
+    def find(self, row_data: List[str]) -> Optional[int]:
+        """
+        Returning the last row with exactly these texts ("StartTime", "EndTime", "ActType", "Label", "Video",
+        "StartFrame", "EndFrame"), None if there is no such row.
+        """
+        row_data = list(row_data) + [""] * (len(COLUMNS) - len(row_data))
+        codes = [dictionary.codes.get(value) for dictionary, value in
+                 zip((self.types, self.labels, self.vids), row_data[2:5])]
+        if None in codes:
+            return None
+        mask = (self.type_codes == codes[0]) & (self.label_codes == codes[1]) & (self.vid_codes == codes[2])
+        for column, text in ((self.stime, row_data[0]), (self.etime, row_data[1])):
+            value = parse_time(text)
+            mask &= np.isnan(column) if math.isnan(value) else column == value
+        mask &= (self.sframe == parse_frame(row_data[5])) & (self.eframe == parse_frame(row_data[6]))
+        rows = np.flatnonzero(mask)
+        return int(rows[-1]) if len(rows) else None
+
+    def find_next(self, label: str, vid: str, seconds: float, backwards: bool = False) -> Optional[int]:
+        """
+        Row of the next label with this name and video, starting after seconds (the closest start time). Backwards
+        the closest start before. None if there is no such row. The rows don't have to be sorted.
+        """
+        label_code, vid_code = self.labels.codes.get(label), self.vids.codes.get(vid)
+        if label_code is None or vid_code is None:
+            return None
+        mask = (self.label_codes == label_code) & (self.vid_codes == vid_code)
+        mask &= self.stime < seconds - 0.001 if backwards else self.stime > seconds + 0.001
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return None
+        starts = self.stime[rows]
+        return int(rows[np.argmax(starts) if backwards else np.argmin(starts)])
+
+    def remove_rows(self, rows: Iterable[int]):
+        """
+        Removing the given rows with a single pass over the columns.
+        """
+        keep = np.ones(self._size, dtype=bool)
+        keep[np.fromiter(rows, dtype=np.int64)] = False
+        self.take(np.flatnonzero(keep))
+
+    def take(self, order: np.ndarray):
+        """
+        Reordering (or filtering) all the columns by the given row indices.
+        """
+        for name in self._ARRAYS:
+            column = getattr(self, name)[:self._size][order]
+            getattr(self, name)[:len(column)] = column
+        self._size = len(order)
+        self._rows = None
+        self._positions = None
+
+    def _sort_keys(self, column: int) -> np.ndarray:
+        """
+        Helper returning numeric keys of a column. Times and frames are the keys itself, texts are ranked
+        alphabetically (only the dictionary is sorted, not the rows).
+        """
+        if column == 0:
+            return self.stime
+        if column == 1:
+            return self.etime
+        if column >= 5:
+            return self.sframe if column == 5 else self.eframe
+        dictionary, codes = [(self.types, self.type_codes),
+                             (self.labels, self.label_codes),
+                             (self.vids, self.vid_codes)][column - 2]
+        rank = np.empty(len(dictionary), dtype=np.int64)
+        rank[np.argsort(np.array(dictionary.values, dtype=object), kind="stable")] = np.arange(len(dictionary))
+        return rank[codes]
+
+    def sort_order(self, columns: List[int], descending: bool = False) -> np.ndarray:
+        """
+        Stable permutation of the rows sorted by several columns (the first column is the primary key), for
+        example Vid, STime, ETime. Open time_windows (NaN) are sorted behind all the closed ones, also descending.
+        """
+        keys = [self._sort_keys(column) for column in reversed(columns)]  # lexsort takes the primary key last
+        if descending:
+            keys = [-key for key in keys]  # NaN stays NaN, so it is still sorted last
+        return np.lexsort(keys)
+
+    def sort(self, column: int, descending: bool = False) -> bool:
+        """
+        Stable sort of all rows by one column. Times and frames are sorted numerically, texts alphabetically.
+        """
+        return self.sort_by([column], descending)
+
+    def sort_by(self, columns: List[int], descending: bool = False) -> bool:
+        """
+        Stable sort of all rows by several columns, the rows are reordered in one pass over every column.
+        False (and nothing is moved), if the rows are sorted already.
+        """
+        order = self.sort_order(columns, descending)
+        if np.array_equal(order, np.arange(self._size)):
+            return False
+        self.take(order)
+        return True
+
+    def text(self, row: int, column: int) -> str:
+        """
+        Text of a single cell, like it is shown in the data-table.
+        """
+        if column == 0:
+            return format_time(self._stime[row])
+        elif column == 1:
+            return format_time(self._etime[row])
+        elif column == 2:
+            return self.types.decode(self._type[row])
+        elif column == 3:
+            return self.labels.decode(self._label[row])
+        elif column == 4:
+            return self.vids.decode(self._vid[row])
+        return format_frame(self._sframe[row] if column == 5 else self._eframe[row])
+
+    def row_text(self, row: int) -> List[str]:
+        """
+        Texts of a whole row ("StartTime", "EndTime", "ActType", "Label", "Video", "StartFrame", "EndFrame").
+        """
+        return [self.text(row, column) for column in range(len(COLUMNS))]
+
+    def rows_text(self, rows: List[int]) -> List[List[str]]:
+        """
+        Texts of many rows at once (like row_text()), formatted column by column.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = [format_times(self._stime[rows]), format_times(self._etime[rows])]
+        for dictionary, codes in ((self.types, self._type), (self.labels, self._label), (self.vids, self._vid)):
+            columns.append(np.array(dictionary.values, dtype=object)[codes[rows]].tolist())
+        for frames in (self._sframe[rows], self._eframe[rows]):
+            columns.append(np.where(frames >= 0, frames.astype(str), "").tolist())
+        return [list(row) for row in zip(*columns)]
+
+    def detach(self):
+        """
+        Copying memory-mapped columns (loaded from .npz) into memory. Afterwards the file can be replaced.
+        """
+        for name in self._ARRAYS:
+            column = getattr(self, name)
+            if isinstance(column, np.memmap):
+                setattr(self, name, np.array(column))
+
+    def copy(self) -> "LabelStore":
+        """
+        Snapshot of the store, for example to write it to a file in the background.
+        """
+        store = LabelStore(capacity=max(self._size, 1))
+        for name in self._ARRAYS:
+            getattr(store, name)[:self._size] = getattr(self, name)[:self._size]
+        store._size = self._size
+        store.next_id = self.next_id
+        store.types = StringDictionary(self.types.values)
+        store.labels = StringDictionary(self.labels.values)
+        store.vids = StringDictionary(self.vids.values)
+        return store
+
+    @classmethod
+    def from_columns(cls, stime: np.ndarray, etime: np.ndarray, type_codes: np.ndarray, label_codes: np.ndarray,
+                     vid_codes: np.ndarray, types: List[str], labels: List[str], vids: List[str],
+                     sframe: np.ndarray = None, eframe: np.ndarray = None) -> "LabelStore":
+        """
+        Creating a store directly from the columns and the dictionaries. The arrays are used as they are (no copy),
+        so they can be memory-mapped. Without frame columns (older files), the frames are unknown (-1).
+        """
+        store = cls(capacity=0)
+        store._stime, store._etime = stime, etime
+        store._type, store._label, store._vid = type_codes, label_codes, vid_codes
+        store._sframe = sframe if sframe is not None else np.full(len(stime), -1, dtype=np.int64)
+        store._eframe = eframe if eframe is not None else np.full(len(stime), -1, dtype=np.int64)
+        store._size = len(stime)
+        store._id = np.arange(store._size, dtype=np.int64)
+        store.next_id = store._size
+        store.types = StringDictionary(types)
+        store.labels = StringDictionary(labels)
+        store.vids = StringDictionary(vids)
+        return store
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[List[str]]) -> "LabelStore":
+        """
+        Creating a store from text rows, for example a csv.reader.
+        """
+        store = cls()
+        for row_data in rows:
+            store.append_text(row_data)
+        return store
+
+
+def label_file_name(video_name: str) -> str:
+    """
+    Name of the label file of a video, without folder and extension. "my video.mp4" -> "my_video"
+    Videos within sub-folders of "videos" are named with the sub-folder. "day 1/my video.mp4" -> "day_1_my_video"
+    """
+    video_name = video_name.replace("\\", "/").replace("/", "_")
+    video_name_csv = "_".join(video_name.split(".")[:-1])
+    return video_name_csv.replace(" ", "_")
+
+
+def csv_bytes(store: LabelStore) -> bytes:
+    """
+    The whole store as the content of a .csv file (semicolon separated, with header).
+    """
+    buffer = io.StringIO(newline="")
+    csvwriter = csv.writer(buffer, delimiter=";")
+    csvwriter.writerow(CSV_HEADER)
+    for row in range(len(store)):
+        csvwriter.writerow(store.row_text(row))
+    return buffer.getvalue().encode()
+
+
+def read_csv_bytes(content: bytes) -> LabelStore:
+    """
+    Parsing the content of a .csv label file. The header is skipped.
+    """
+    csvreader = csv.reader(io.StringIO(content.decode(), newline=""), delimiter=";")
+    next(csvreader, None)
+    return LabelStore.from_rows(row for row in csvreader if row)
+
+
+def npz_bytes(store: LabelStore) -> bytes:
+    """
+    The whole store as the content of a .npz file. The columns are stored as they are (codes for the texts),
+    the dictionaries as string arrays. Not compressed, so the columns can be memory-mapped when loading.
+    """
+    buffer = io.BytesIO()
+    np.savez(buffer,
+             stime=store.stime, etime=store.etime,
+             type=store.type_codes, label=store.label_codes, vid=store.vid_codes,
+             sframe=store.sframe, eframe=store.eframe,
+             type_values=np.array(store.types.values, dtype=str),
+             label_values=np.array(store.labels.values, dtype=str),
+             vid_values=np.array(store.vids.values, dtype=str))
+    return buffer.getvalue()
+
+
+def _npz_memmap(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    """
+    Helper to memory-map a single (not compressed) array of a .npz file. Copy-on-write, so the file itself is
+    never changed.
+    """
+    with open(path, "rb") as file:
+        file.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", file.read(30)[26:30])
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        offset = file.tell()
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="c", shape=shape, offset=offset, order="F" if fortran_order else "C")
+
+
+def read_npz(path: str) -> LabelStore:
+    """
+    Loading a .npz label file. The time and code columns are memory-mapped, only the (small) dictionaries are
+    read. Texts are only decoded, when a row is shown or written. So opening a file with many labels is instant.
+    """
+    columns = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if name.endswith("_values") or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    columns[name] = np.load(member)
+            else:
+                columns[name] = _npz_memmap(path, info)
+    return LabelStore.from_columns(columns["stime"], columns["etime"],
+                                   columns["type"], columns["label"], columns["vid"],
+                                   columns["type_values"].tolist(), columns["label_values"].tolist(),
+                                   columns["vid_values"].tolist(), columns.get("sframe"), columns.get("eframe"))
+
+
+def label_bytes(store: LabelStore, label_format: str) -> bytes:
+    """
+    Content of a label file in the given format ("csv" or "npz").
+    """
+    return npz_bytes(store) if label_format == "npz" else csv_bytes(store)
+
+
+def read_labels(path: str) -> LabelStore:
+    """
+    Loading a label file, the format is taken from the extension (.csv or .npz).
+    """
+    if path.endswith(".npz"):
+        return read_npz(path)
+    with open(path, "rb") as file:
+        return read_csv_bytes(file.read())
+
+
+def file_crc(path: str) -> int:
+    """
+    Checksum of a whole file, needed to check the compaction marker of a journal.
+    """
+    crc = 0
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def iter_csv_chunks(content: bytes, chunk_size: int = 5000) -> Iterator[Tuple[LabelStore, int]]:
+    """
+    Parsing the content of a .csv label file in chunks of chunk_size rows. Yields every chunk as a store together
+    with the number of rows parsed so far. The header is skipped.
+    """
+    csvreader = csv.reader(io.StringIO(content.decode(), newline=""), delimiter=";")
+    next(csvreader, None)
+    chunk, rows = LabelStore(capacity=chunk_size), 0
+    for row_data in csvreader:
+        if not row_data:
+            continue
+        chunk.append_text(row_data)
+        rows += 1
+        if len(chunk) == chunk_size:
+            yield chunk, rows
+            chunk = LabelStore(capacity=chunk_size)
+    yield chunk, rows
+
+
+def iter_label_file(path: str, chunk_size: int = 50000) -> Iterator[LabelStore]:
+    """
+    Reading a label file chunk by chunk (stores of chunk_size rows), a .csv is streamed from the file and never
+    read as a whole. A .npz is memory-mapped anyway, so it is one chunk.
+    """
+    if path.endswith(".npz"):
+        yield read_npz(path)
+        return
+    with open(path, "r", newline="") as file:
+        csvreader = csv.reader(file, delimiter=";")
+        next(csvreader, None)
+        chunk = LabelStore(capacity=chunk_size)
+        for row_data in csvreader:
+            if not row_data:
+                continue
+            chunk.append_text(row_data)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = LabelStore(capacity=chunk_size)
+        if len(chunk):
+            yield chunk
+
+
+def replace_file(path: str, content: bytes):
+    """
+    Writing a file crash-safe. First to a temporary file, then replacing the old one. So there is always
+    either the old or the new file, never half of it.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class LabelJournal:
+    """
+    Append-only journal of a label file (data/<video>.journal next to data/<video>.csv or .npz). Every insert, close
+    and delete is appended as one line, as soon as it happens. So saving costs O(1) per label and nothing is
+    lost if the app crashes. Rows are addressed by their content, not by their row index:
+
+    - I;ROW                                   inserted row
+    - C;ROW;NEW_ETIME;NEW_EFRAME              closed time_window (row before closing)
+    - D;ROW                                   deleted row
+    - #;CRC;OFFSET                            compaction marker
+
+    ROW is STIME;ETIME;TYPE;LABEL;VID;SFRAME;EFRAME. Journals written before the frame columns existed (ROW
+    without frames, C without NEW_EFRAME) are still replayed.
+
+    compact() writes the label file and drops the journal lines that are inside the label file now. Before the
+    label file is replaced, a marker with the checksum of the new file is appended. If the app crashes after
+    replacing the file, but before the journal is shortened, replay() knows which lines are already inside.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path  # Label file without extension, data/<video>
+        self.path = base_path + ".journal"
+        self.lock = threading.Lock()
+        self._file = None
+
+    def label_path(self, label_format: str) -> str:
+        return f"{self.base_path}.{label_format}"
+
+    def existing_path(self, label_format: str) -> Optional[str]:
+        """
+        Path of the label file. The given format is preferred, if there is only a file with the other format,
+        this one is returned (it will be converted with the next save).
+        """
+        for path in [self.label_path(label_format)] + [self.label_path(other) for other in LABEL_FORMATS]:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def stamp(self, label_format: str) -> tuple:
+        """
+        Path, size and mtime of the label file and of the journal. A store loaded before is still valid, if the
+        stamp did not change since.
+        """
+        stamp = []
+        for path in (self.existing_path(label_format), self.path):
+            if path is not None and os.path.exists(path):
+                stat = os.stat(path)
+                stamp.append((path, stat.st_size, stat.st_mtime_ns))
+        return tuple(stamp)
+
+    def _append(self, record: List[str]):
+        self._append_many([record])
+
+    def _append_many(self, records: List[List[str]]):
+        """
+        Appending many records with one write and one fsync (deleting or restoring many rows at once).
+        """
+        if not records:
+            return
+        buffer = io.StringIO(newline="")
+        csv.writer(buffer, delimiter=";").writerows(records)
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, "a", newline="")
+            self._file.write(buffer.getvalue())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def insert(self, row_data: List[str]):
+        self._append(["I"] + list(row_data))
+
+    def close_window(self, row_data: List[str], end_time: str, end_frame: str = ""):
+        self._append(["C"] + list(row_data) + [end_time, end_frame])
+
+    def delete(self, row_data: List[str]):
+        self._append(["D"] + list(row_data))
+
+    def insert_many(self, rows_data: List[List[str]]):
+        self._append_many([["I"] + list(row_data) for row_data in rows_data])
+
+    def delete_many(self, rows_data: List[List[str]]):
+        self._append_many([["D"] + list(row_data) for row_data in rows_data])
+
+    def offset(self) -> int:
+        """
+        Current size of the journal. Everything before the offset is inside a snapshot taken now.
+        """
+        with self.lock:
+            return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, path: str) -> Tuple[bytes, bytes]:
+        """
+        Reading the label file at path and the journal together, so the journal matches the label file.
+        """
+        with self.lock:
+            with open(path, "rb") as file:
+                content = file.read()
+            journal = b""
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    journal = file.read()
+        return content, journal
+
+    def load(self, label_format: str = "csv") -> Tuple[LabelStore, int, int]:
+        """
+        Loading the label file and replaying the journal on top of it. Returns the store, the number of replayed
+        journal lines and the journal offset the store is based on.
+        """
+        with self.lock:
+            path = self.existing_path(label_format)
+            store = read_labels(path) if path is not None else LabelStore()
+            journal = b""
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    journal = file.read()
+            base_crc = (lambda: file_crc(path)) if path is not None else (lambda: zlib.crc32(b""))
+            replayed = self.replay(store, journal, base_crc)
+        return store, replayed, len(journal)
+
+    @staticmethod
+    def replay(store: LabelStore, journal: bytes, base_crc: Callable[[], int]) -> int:
+        """
+        Applying the journal lines to a store loaded from the label file. Lines before the last marker that
+        matches the checksum of the label file (base_crc, only computed if there is a marker) are skipped,
+        they are already inside the label file.
+        """
+        lines = journal.decode().splitlines(keepends=True)
+        start, crc = 0, None
+        for line in lines:
+            if line.startswith("#;"):
+                record = next(csv.reader([line], delimiter=";"))
+                crc = base_crc() if crc is None else crc
+                if int(record[1]) == crc:
+                    start = int(record[2])
+        replayed = 0
+        for record in csv.reader(io.StringIO(journal[start:].decode(), newline=""), delimiter=";"):
+            if not record or record[0] == "#":
+                continue
+            if record[0] == "I":
+                store.append_text(record[1:])
+            else:
+                width = 5 if len(record) == 7 and record[0] == "C" else len(COLUMNS)  # Without frames
+                row = store.find(record[1:1 + width])
+                if row is None:
+                    continue
+                if record[0] == "C":
+                    end = record[1 + width:] + [""]
+                    store.set_etime(row, parse_time(end[0]), parse_frame(end[1]))
+                elif record[0] == "D":
+                    store.remove_rows([row])
+            replayed += 1
+        return replayed
+
+    def compact(self, store: LabelStore, offset: int, label_format: str = "csv"):
+        """
+        Writing the snapshot (store) to the label file and removing the journal lines before offset. Lines
+        appended after the snapshot was taken stay inside the journal. A label file of the other format is
+        removed, it is converted now. Meant to run in the background.
+        """
+        store.detach()
+        content = label_bytes(store, label_format)
+        label_path = self.label_path(label_format)
+        tmp_path = label_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        with self.lock:
+            self._release()
+            journal = b""
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    journal = file.read()
+                with open(self.path, "ab") as file:
+                    file.write(f"#;{zlib.crc32(content)};{offset}\r\n".encode())
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(tmp_path, label_path)
+            for other in LABEL_FORMATS:
+                if other != label_format and os.path.exists(self.label_path(other)):
+                    os.remove(self.label_path(other))
+            tail = journal[offset:]
+            if tail:
+                replace_file(self.path, tail)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+    def discard(self):
+        """
+        Dropping all the changes that are not compacted into the csv yet.
+        """
+        with self.lock:
+            self._release()
+            if os.path.exists(self.path):
+                os.remove(self.path)
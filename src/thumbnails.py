@@ -0,0 +1,128 @@
+"""
+Thumbnails of the videos for the filmstrip above the time slider of video_labeler.py. A thumbnail is one
+downscaled frame every THUMBNAIL_INTERVAL seconds, decoded by ffmpeg (started by the worker threads of the
+filmstrip, one ffmpeg process per thumbnail). The thumbnails are kept inside the folder "thumbnails" (one folder
+per video hash), the least recently used ones are removed, if the folder is bigger than the size cap. No Qt in
+here.
+"""
+import os
+import shutil
+import hashlib
+import threading
+import subprocess
+from collections import OrderedDict
+
+# For Documentation
+from typing import Optional
+
+THUMBNAIL_FOLDER = "thumbnails"
+THUMBNAIL_INTERVAL = 5.0  # Seconds between two thumbnails
+THUMBNAIL_HEIGHT = 72  # Pixels, the width follows the aspect ratio of the video
+THUMBNAIL_CACHE_SIZE = 256 * 1024 * 1024  # Bytes
+
+
+def video_hash(video_path: str) -> str:
+    """
+    Key of a video within the cache. Made from path, size and mtime, so a changed video gets new thumbnails
+    and the video itself does not have to be read.
+    """
+    stat = os.stat(video_path)
+    key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def render_thumbnail(video_path: str, seconds: float, height: int = THUMBNAIL_HEIGHT) -> Optional[bytes]:
+    """
+    One downscaled frame at seconds as jpeg. ffmpeg seeks to the keyframe before and decodes only up to the
+    frame. None if ffmpeg is not installed or there is no frame. Runs within a worker thread.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    try:
+        content = subprocess.run([ffmpeg, "-v", "error", "-ss", f"{seconds:.3f}", "-i", video_path,
+                                  "-frames:v", "1", "-an", "-vf", f"scale=-2:{height}",
+                                  "-f", "image2pipe", "-vcodec", "mjpeg", "-q:v", "5", "-"],
+                                 capture_output=True, check=True, timeout=60).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return content or None
+
+
+class ThumbnailCache:
+    """
+    On-disk LRU cache of the thumbnails: <folder>/<video hash>/<index>.jpg. The order of use is kept in memory
+    (filled from the mtimes of the files, when the cache is used first). Reading a thumbnail moves it to the end,
+    writing one removes the least recently used thumbnails, until the cache is below max_bytes again.
+    """
+
+    def __init__(self, folder: str = THUMBNAIL_FOLDER, max_bytes: int = THUMBNAIL_CACHE_SIZE):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._entries = None  # Path -> size, least recently used first
+        self._bytes = 0
+
+    def path(self, hash_key: str, index: int) -> str:
+        return os.path.join(self.folder, hash_key, f"{index}.jpg")
+
+    def _load(self):
+        """
+        Helper to read the sizes and the order of use of all thumbnails (only once).
+        """
+        if self._entries is not None:
+            return
+        files = []
+        if os.path.isdir(self.folder):
+            for directory in os.scandir(self.folder):
+                if directory.is_dir():
+                    for entry in os.scandir(directory.path):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, entry.path, stat.st_size))
+        files.sort()
+        self._entries = OrderedDict((path, size) for _mtime, path, size in files)
+        self._bytes = sum(self._entries.values())
+
+    def contains(self, hash_key: str, index: int) -> bool:
+        with self.lock:
+            self._load()
+            return self.path(hash_key, index) in self._entries
+
+    def get(self, hash_key: str, index: int) -> Optional[bytes]:
+        """
+        Content of a thumbnail, None if it is not cached.
+        """
+        path = self.path(hash_key, index)
+        with self.lock:
+            self._load()
+            if path not in self._entries:
+                return None
+            self._entries.move_to_end(path)
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+            os.utime(path)  # Order of use for the next start
+        except OSError:
+            return None
+        return content
+
+    def put(self, hash_key: str, index: int, content: bytes):
+        """
+        Writing a thumbnail and removing the least recently used ones, if the cache is too big.
+        """
+        path = self.path(hash_key, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(content)
+        with self.lock:
+            self._load()
+            self._bytes += len(content) - self._entries.pop(path, 0)
+            self._entries[path] = len(content)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_path, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                try:
+                    os.remove(old_path)
+                    os.rmdir(os.path.dirname(old_path))  # Only if it was the last thumbnail of the video
+                except OSError:
+                    pass
@@ -1,28 +1,92 @@
 # For handling different OS
 import sys
 import os
+import time
+IMPORT_START = time.perf_counter()  # For --profile-startup
+import math
 import locale
 
 # For different file-formats
 import json
-import csv
 
-# For plotting Hotkeys
-import pandas as pd
-import matplotlib.pyplot as plt
+# For writing and loading in the background
+import queue
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 
-# App Widgets
-from PyQt5.QtWidgets import QTableWidget, QMainWindow, QLabel, QWidget, QGridLayout, QScrollArea, QSlider, QStyle, \
-    QShortcut, QTableWidgetItem, QApplication, QSplitter, QVBoxLayout, QAbstractItemView, QMessageBox
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QKeySequence, QCloseEvent
+# For the label overlay of the time slider
+import numpy as np
 
-# MPV Player and Style of the App
-import mpv
-from qt_material import apply_stylesheet
+# App Widgets
+from PyQt5.QtWidgets import QMainWindow, QLabel, QWidget, QGridLayout, QScrollArea, QSlider, QStyle, \
+    QShortcut, QApplication, QSplitter, QVBoxLayout, QAbstractItemView, QMessageBox, QTableView, \
+    QListView, QStyledItemDelegate, QStyleOptionViewItem, QToolTip, QLineEdit, QDialog, QPushButton
+from PyQt5.QtCore import Qt, QTimer, QAbstractTableModel, QAbstractListModel, QAbstractProxyModel, QModelIndex, \
+    QSize, pyqtSignal, QFileSystemWatcher, QRect, QPoint
+from PyQt5.QtGui import QKeySequence, QCloseEvent, QColor, QPainter, QPixmap, QImage, QImageReader
 
 # For Documentation
-from typing import Iterator, List
+from typing import List, Callable, Iterable, Optional
+
+# Columnar storage of the labels
+from label_store import LabelStore, LabelJournal, COLUMNS, WAIT, parse_time, parse_frame, label_file_name, \
+    iter_csv_chunks
+# Frame timestamps of the videos, for frame numbers and exact seeks
+from frame_index import FRAME_FOLDER, load_frame_index
+# Thumbnails for the filmstrip above the time slider
+from thumbnails import ThumbnailCache, THUMBNAIL_INTERVAL, THUMBNAIL_HEIGHT, video_hash, render_thumbnail
+# Labels active at the playhead (interval index) and the filter of the data-table (inverted index)
+from label_index import LabelIntervals, LabelSearch
+# Metadata of the videos for the playlist
+from video_library import VideoLibrary, VideoInfo, VIDEO_COLUMNS, video_texts, warm_file
+# Hotkeys of the .json files for the hotkey overview
+from hotkeys import Hotkey, HOTKEY_COLUMNS, HOTKEY_FILES as CONFIG_FILES, DUPLICATED, config_hash, load_hotkeys, \
+    check_for_duplicates
+
+# Imported when needed, they take most of the start-up time: mpv (libmpv) with the first video, qt_material with
+# the style of settings.json
+IMPORT_END = time.perf_counter()
+
+
+class StartupProfile:
+    """
+    Timings of the start of the app, printed with "--profile-startup". Every mark is the time since the mark before.
+    Marks after the report (for example creating the mpv-player with the first video) are printed right away.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.marks = [("imports", IMPORT_END - IMPORT_START)]
+        self.reported = False
+        self._last = time.perf_counter()
+
+    def mark(self, step: str):
+        now = time.perf_counter()
+        self.marks.append((step, now - self._last))
+        self._last = now
+        if self.enabled and self.reported:
+            print(f"{step:<40}{self.marks[-1][1] * 1000:>10.1f} ms")
+
+    def start(self, step: str = None):
+        """
+        Restarting the clock, the time since the last mark is not counted (or counted as step).
+        """
+        if step is not None:
+            self.mark(step)
+        self._last = time.perf_counter()
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("Start-up of the app")
+        for step, seconds in self.marks:
+            print(f"{step:<40}{seconds * 1000:>10.1f} ms")
+        print(f"{'total':<40}{sum(seconds for _step, seconds in self.marks) * 1000:>10.1f} ms")
+
+
+startup_profile = StartupProfile()
 
 
 class Labeler(QMainWindow):
@@ -39,21 +103,31 @@ class Labeler(QMainWindow):
     Everything is set up here. Also loading the .json files and processing and binding them.a
     """
 
+    # Emitted from background threads, the function is called within the GUI thread
+    gui_call = pyqtSignal(object)
+    # Emitted from the mpv event thread, if the time position changed (only once per shown update)
+    time_position_changed = pyqtSignal()
+
     def __init__(self, application, parent=None):
         super().__init__(parent)
+        # noinspection PyUnresolvedReferences
+        self.gui_call.connect(lambda function: function())
         self.initialize_folders_and_settings()
+        startup_profile.mark("folders and example .json files")
         self.mouse_event = MouseEventHandler(self)  # Get access to MouseEventHandler
         self.layout = Layout(self)  # Get access to Layout
+        startup_profile.mark("widgets")
         self.app_functions = AppFunctions(self)  # Get access to Settings methods
         self.logger = Logger(self)  # Get access to Logger
         self.activity_handler = ActivityHandler(self)  # Get access to ActivityHandler
+        startup_profile.mark("app functions, logger, activity handler")
 
         self.installEventFilter(self)
         self.setWindowTitle("Video Labeler")
         self.app = application
 
         # Cached values
-        self.time_window_activity = []
+        self.time_window_activity = {}  # Open time_windows, shortcut -> label id
         self.data_table_changed = False  # Needed for saving data, if some changes happened
 
         self.playtime = self.layout.playtime  #
@@ -61,32 +135,64 @@ class Labeler(QMainWindow):
         self.app_window = self.layout.app_window_layout  # Main Window
 
         self.video = self.layout.video
-        self.player = self.layout.player
+        self.player = self.layout.player  # mpv is started with the first video (LazyPlayer)
+        # One observer for the time position, as long as the player lives
+        self.time_position = None  # Newest time position of the player, set within the mpv event thread
+        self._time_position_pending = False
+        self.playhead_timer = QTimer()
+        self.playhead_timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self.playhead_timer.timeout.connect(self._show_time_position)
+        # noinspection PyUnresolvedReferences
+        self.time_position_changed.connect(self._schedule_time_position)
+        self.observe_time_position()
 
         # Define Playlist (left side list, to play videos from)
         # If click on a row, it will play the video
         self.video_table = self.layout.video_table
+        self.video_model = self.layout.video_model
         # noinspection PyUnresolvedReferences
-        self.video_table.itemClicked.connect(self.mouse_event.video_table_click)
-        self.app_functions.update_video_table()
+        self.video_table.clicked.connect(self.mouse_event.video_table_click)
         self.video_table_scroll = self.layout.video_table_scroll
 
         # Define DataTable, for entered observations
         self.data_table = self.layout.data_table
+        self.data_model = self.layout.data_model
+        # Every change of the data-table (re)starts the autosave
+        # noinspection PyUnresolvedReferences
+        self.data_model.changed.connect(self.app_functions.schedule_autosave)
+        # Filter bar above the data-table, the rows are found within an inverted index
+        self.data_filter = self.layout.data_filter
+        self.filter_bar = self.layout.filter_bar
+        # noinspection PyUnresolvedReferences
+        self.filter_bar.textChanged.connect(self.data_filter.set_filter)
         # Scroll Area for data Table
         self.data_table_scroll = self.layout.data_table_scroll
         # noinspection PyUnresolvedReferences
-        self.data_table.itemClicked.connect(self.mouse_event.data_table_click)
+        self.data_table.clicked.connect(self.mouse_event.data_table_click)
 
-        # Define Time Slider
+        # Define Time Slider and the Filmstrip (thumbnails) above
+        self.filmstrip = self.layout.filmstrip
         self.time_slider = self.layout.time_slider
-        self.time_slider.mousePressEvent = self.mouse_event.slider_move
+        self.time_slider.mousePressEvent = self.mouse_event.slider_press
         self.time_slider.mouseMoveEvent = self.mouse_event.slider_move
+        self.time_slider.mouseReleaseEvent = self.mouse_event.slider_release
+        # Labels of the playing video painted on the time slider, updated with every change of the data-table
+        self.label_overlay = self.layout.label_overlay
+        self.time_slider.paintEvent = self.label_overlay.paint_slider
+        # noinspection PyUnresolvedReferences
+        self.data_model.label_changed.connect(self.label_overlay.label_changed)
+        # noinspection PyUnresolvedReferences
+        self.data_model.labels_reset.connect(self.label_overlay.reset)
+        # Labels active at the playhead are highlighted within the data-table
+        # noinspection PyUnresolvedReferences
+        self.data_model.label_changed.connect(self.activity_handler.label_changed)
+        # noinspection PyUnresolvedReferences
+        self.data_model.labels_reset.connect(self.activity_handler.intervals.reset)
 
         # Define Logger
-        self.logger_widget = self.layout.logger_widget
-        self.logger_scroller = self.layout.logger_scroll
-        self.logger_grid = self.layout.logger_grid
+        self.logger_view = self.layout.logger_view
+        self.log_model = self.layout.log_model
 
         # Vertical (v) und Horizontal (h) splitter
         self.splitter_v = self.layout.splitter_v
@@ -97,11 +203,43 @@ class Labeler(QMainWindow):
         self.splitter_h.splitterMoved.connect(self.mouse_event.splitter_click)
         QTimer.singleShot(0, self.mouse_event.splitter_click)
 
-        # Loading shortcuts, commands for the mpv player and the settings
         self.closeEvent = self.mouse_event.close_app
-        self.label_shortcuts()
-        self.commands_mpv()
-        self.settings()
+        # Hotkeys of the .json files, only the changed ones are bound again if a file changes
+        self.shortcuts = {}  # Key sequence -> ((hotkey, binding), QShortcut)
+        self.applied_settings = {}  # Setting -> value, as applied the last time
+        self.config = None  # Hash of the .json files
+        self.config_watcher = QFileSystemWatcher()
+        # noinspection PyUnresolvedReferences
+        self.config_watcher.fileChanged.connect(self._config_changed)
+        self.config_timer = QTimer()
+        self.config_timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self.config_timer.timeout.connect(self.reload_config)
+        startup_profile.mark("connecting widgets")
+        # The window is shown first, the playlist and the .json files are loaded afterwards
+        self._started = False
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """
+        Second part of the start, after the window is shown: Loading shortcuts, commands for the mpv player, the
+        settings and the playlist. Only done once.
+        """
+        if self._started:
+            return
+        self._started = True
+        startup_profile.mark("showing the window")
+        self.config = config_hash()
+        self.load_config()
+        # Changes of the .json files are applied while the app is running
+        self.config_watcher.addPaths([path for path in CONFIG_FILES if os.path.exists(path)])
+        startup_profile.mark("shortcuts and settings")
+        self.app_functions.update_video_table()
+        startup_profile.mark("playlist (cached videos)")
+
+        # Journals left by a crash are replayed and written to the csv files
+        self.app_functions.recover_journals()
+        startup_profile.report()
 
     def initialize_folders_and_settings(self):
         """
@@ -112,17 +250,29 @@ class Labeler(QMainWindow):
             os.makedirs("data")
         if not os.path.exists("videos"):
             os.makedirs("videos")
+        if not os.path.exists(FRAME_FOLDER):
+            os.makedirs(FRAME_FOLDER)
         if not os.path.exists('settings.json'):
             with open('settings.json', 'w') as f:
                 settings = {
                     "X": "delete_selected_rows()",
                     "CTRL+S": "save_csv()",
+                    "CTRL+Z": "undo()",
+                    "CTRL+Y": "redo()",
+                    "CTRL+RIGHT": "next_label()",
+                    "CTRL+LEFT": "previous_label()",
+                    "CTRL+SHIFT+RIGHT": "next_occurrence()",
+                    "CTRL+SHIFT+LEFT": "previous_occurrence()",
                     "S": "sort_data_table()",
                     "U": "update_video_table()",
+                    "N": "next_video()",
                     "P": "plot_hotkeys()",
                     "dark_amber.xml": "style",
                     "1600:800": "width_height",
-                    "12": "log_max"
+                    "12": "log_max",
+                    "autosave:30": "autosave_interval",
+                    "csv": "label_format",
+                    "prefetch:off": "prefetch_next_video"
                 }
                 json.dump(settings, f, sort_keys=True, indent=4,
                           ensure_ascii=False)
@@ -161,20 +311,19 @@ class Labeler(QMainWindow):
                 json.dump(label_shortcuts, f, sort_keys=True, indent=4,
                           ensure_ascii=False)
 
-    def commands_mpv(self):
+    def commands_mpv(self) -> List[tuple]:
         """
-        All the commands defined in commands_mpv.json will be loaded and set for the mpv-player.
+        All the commands defined in commands_mpv.json will be loaded, to be set for the mpv-player. Returns the
+        shortcuts as (hotkey, binding), see bind_shortcuts().
 
         For more information, see:
         https://github.com/mpv-player/mpv/blob/master/etc/input.conf
         https://mpv.io/manual/stable/#command-interface
         """
         with open('commands_mpv.json', 'r') as file:
-            shortcuts = json.load(file)
-        for shortcut, command in shortcuts.items():
-            shortcut = QShortcut(QKeySequence(shortcut), self)
-            # noinspection PyUnresolvedReferences
-            shortcut.activated.connect(lambda commands=command: self._handle_commands_mpv(commands))
+            shortcuts = json.load(file, object_pairs_hook=check_for_duplicates)
+        return [(shortcut, ("mpv", tuple(command) if isinstance(command, list) else command))
+                for shortcut, command in shortcuts.items()]
 
     def _handle_commands_mpv(self, commands: str or list[str]):
         """
@@ -185,43 +334,153 @@ class Labeler(QMainWindow):
         else:
             self.player.command(commands)
 
-    def settings(self):
+    def settings(self) -> List[tuple]:
         """
         Will load the settings.json file and process the settings, that are set up.
-        Like the size of the window, or some other hotkeys etc.
+        Like the size of the window, or some other hotkeys etc. A setting is only applied, if it changed since it was
+        applied the last time. Returns the hotkeys as (hotkey, binding), see bind_shortcuts().
         """
+        duplicated_settings = {}
+
+        def check_settings(ordered_pairs: List[tuple]) -> dict:
+            # The file is keyed by value, so two settings with the same value would be dropped as a duplicated hotkey
+            values = {}
+            for k, v in ordered_pairs:
+                values.setdefault(k, []).append(v)
+            duplicated_settings.update({k: v for k, v in values.items()
+                                        if len(v) > 1 and any(item[-2:] != "()" for item in v)})
+            return check_for_duplicates(ordered_pairs)
+
         with open('settings.json', 'r') as file:
-            settings = json.load(file)
+            settings = json.load(file, object_pairs_hook=check_settings)
+        for key, values in duplicated_settings.items():
+            self.logger.append_logging(text=f"ERROR settings.json: \"{key}\" is set for {', '.join(values)}. "
+                                            f"Give every setting its own value, like \"autosave:30\"",
+                                       bg_color="#400000", border_color="#400000")
+        shortcuts = []
         for key, value in settings.items():
-            if value[-2:] == "()":
-                shortcut = QShortcut(QKeySequence(key), self)
-                # noinspection PyUnresolvedReferences
-                shortcut.activated.connect(getattr(self.app_functions, value[:-2]))
+            if key in duplicated_settings:
+                continue
+            if value == DUPLICATED or value[-2:] == "()":
+                shortcuts.append((key, ("function", value)))
+                continue
+            if self.applied_settings.get(value) == key:
+                continue  # Not changed
             elif value == "style":
                 # https://pypi.org/project/qt-material/
+                from qt_material import apply_stylesheet
                 apply_stylesheet(self.app, theme=key, extra={"density_scale": "0"})
             elif value == "width_height":
                 w_h = key.split(":")
                 self.resize(int(w_h[0]), int(w_h[1]))
             elif value == "log_max":
                 self.logger.log_max = int(key)
+            elif value == "autosave_interval":
+                self.app_functions.autosave_interval = int(key.split(":")[-1])  # "autosave:30" (or "30")
+            elif value == "label_format":
+                self.app_functions.label_format = key.lower()
+            elif value == "prefetch_next_video":
+                self.app_functions.prefetch_next_video = key.lower().split(":")[-1] in ("on", "true", "1")
             else:
-                pass
+                continue
+            self.applied_settings[value] = key
+        return shortcuts
 
-    def label_shortcuts(self):
+    def load_config(self) -> bool:
         """
-        Will load the label_shortcuts.json file and process the shortcuts.
+        Loading the three .json files and binding their hotkeys. Only the changed hotkeys are bound again, everything
+        else (playhead, open time_windows, the data-table) is kept. A hotkey used twice (also between the files) is
+        a conflict. Then nothing is changed, as long as there are bound hotkeys already (at the start the conflicting
+        hotkeys are not bound). Returns the number of changed hotkeys, None if nothing was changed.
         """
-        with open('label_shortcuts.json', 'r') as file:
-            shortcuts = json.load(file)
+        try:
+            shortcuts = self.label_shortcuts() + self.commands_mpv() + self.settings()
+        except (OSError, ValueError, AttributeError) as error:
+            self.logger.append_logging(text=f"ERROR while loading the .json files: {error}",
+                                       bg_color="#400000", border_color="#400000")
+            return None
+        bindings, conflicts = {}, set()
+        for shortcut_key, binding in shortcuts:
+            sequence = QKeySequence(shortcut_key).toString(QKeySequence.PortableText)
+            if sequence in bindings or binding[-1] == DUPLICATED:
+                conflicts.add(shortcut_key)
+            bindings[sequence] = (shortcut_key, binding)
+        unknown = [binding[1] for _key, binding in bindings.values()
+                   if binding[0] == "function" and binding[1] != DUPLICATED and
+                   not hasattr(self.app_functions, binding[1][:-2])]
+        if conflicts or unknown:
+            problems = [f"{key} duplicated" for key in sorted(conflicts)] + [f"{name} unknown" for name in unknown]
+            self.logger.append_logging(text=f"ERROR hotkeys: {', '.join(problems)}" +
+                                       (" (.json files not applied)" if self.shortcuts else ""),
+                                       bg_color="#400000", border_color="#400000")
+            if self.shortcuts:
+                return None
+            for sequence in [sequence for sequence, (shortcut_key, binding) in bindings.items()
+                             if shortcut_key in conflicts or (binding[0] == "function" and binding[1] in unknown)]:
+                del bindings[sequence]
+        return self.bind_shortcuts(bindings)
+
+    def bind_shortcuts(self, bindings: dict) -> int:
+        """
+        Binding the hotkeys (key sequence -> (hotkey, binding)). A binding is ("label", act_type, label),
+        ("mpv", command) or ("function", "name()") of AppFunctions. Only the hotkeys, which are new, removed or bound
+        to something else, are changed. Returns the number of changed hotkeys.
+        """
+        changed = 0
+        for sequence in [sequence for sequence in self.shortcuts if sequence not in bindings]:
+            self.shortcuts.pop(sequence)[1].setParent(None)
+            changed += 1
+        for sequence, (shortcut_key, binding) in bindings.items():
+            if sequence in self.shortcuts:
+                if self.shortcuts[sequence][0] == (shortcut_key, binding):
+                    continue
+                self.shortcuts.pop(sequence)[1].setParent(None)
+            shortcut = QShortcut(QKeySequence(shortcut_key), self)
+            if binding[0] == "label":
+                function = (lambda labels=binding[2], act_types=binding[1], shortcut_keys=shortcut_key:
+                            self._handle_label_shortcuts(labels, act_types, shortcut_keys))
+            elif binding[0] == "mpv":
+                function = (lambda commands=binding[1]:
+                            self._handle_commands_mpv(list(commands) if isinstance(commands, tuple) else commands))
+            else:
+                function = getattr(self.app_functions, binding[1][:-2])
+            # noinspection PyUnresolvedReferences
+            shortcut.activated.connect(function)
+            self.shortcuts[sequence] = ((shortcut_key, binding), shortcut)
+            changed += 1
+        return changed
 
-        for act_type in shortcuts:
-            for shortcut_key, label in shortcuts[act_type].items():
-                shortcut = QShortcut(QKeySequence(shortcut_key), self)
-                # noinspection PyUnresolvedReferences
-                shortcut.activated.connect(
-                    lambda labels=label, act_types=act_type, shortcut_keys=shortcut_key:
-                    self._handle_label_shortcuts(labels, act_types, shortcut_keys))
+    def _config_changed(self, _path: str = None):
+        """
+        One of the .json files changed. Editors often replace the file, so it is watched again. Many changes at once
+        are loaded together.
+        """
+        watched = set(self.config_watcher.files())
+        missing = [path for path in CONFIG_FILES if path not in watched and os.path.exists(path)]
+        if missing:
+            self.config_watcher.addPaths(missing)
+        self.config_timer.start(200)
+
+    def reload_config(self):
+        """
+        Loading the .json files again, if their content changed.
+        """
+        config = config_hash()
+        if config != self.config:
+            self.config = config
+            changed = self.load_config()
+            if changed is not None:
+                self.logger.append_logging("Loaded", ".json files", "#0e1a40", "#0e1a40",
+                                           f"{changed} hotkeys changed")
+
+    def label_shortcuts(self) -> List[tuple]:
+        """
+        Will load the label_shortcuts.json file. Returns the shortcuts as (hotkey, binding), see bind_shortcuts().
+        """
+        with open('label_shortcuts.json', 'r') as file:
+            shortcuts = json.load(file, object_pairs_hook=check_for_duplicates)
+        return [(shortcut_key, ("label", act_type, label)) for act_type in shortcuts
+                for shortcut_key, label in shortcuts[act_type].items()]
 
     def _handle_label_shortcuts(self, labels: str, act_types: str, shortcut_keys: str):
         """
@@ -232,10 +491,21 @@ class Labeler(QMainWindow):
         """
         video_name = self.video_name_playing.text()
         play_time = self.playtime.text()
+        frame = self.app_functions.frame_text(video_name, play_time)
 
-        # "StartTime", "EndTime", "ActType", "Label", "Video"
-        data_to_insert = [play_time, play_time, act_types, labels, video_name]
+        # "StartTime", "EndTime", "ActType", "Label", "Video", "StartFrame", "EndFrame"
+        data_to_insert = [play_time, play_time, act_types, labels, video_name, frame, frame]
+
+        if self.app_functions.loading:
+            # The label file is still loading, the label is inserted afterwards
+            self.app_functions.pending_labels.append((data_to_insert, act_types, shortcut_keys))
+        else:
+            self.insert_label(data_to_insert, act_types, shortcut_keys)
 
+    def insert_label(self, data_to_insert: list, act_types: str, shortcut_keys: str):
+        """
+        Inserting a label into the data-table, depending on the act_types.
+        """
         if act_types == "time_window":
             self.activity_handler.populate_data_table_time_window(data_to_insert, shortcut_keys)
         elif act_types == "point_activity":
@@ -246,68 +516,145 @@ class Labeler(QMainWindow):
         Change the position of the slider, defined by current video time.
         """
         if self.player.duration != 0 and not self.time_slider.isSliderDown() and self.player.duration is not None:
-            slider_value = int((value / self.player.duration) * 1000)
-            self.time_slider.setValue(slider_value)
+            self.layout.set_time_slider_duration(self.player.duration)
+            self.filmstrip.set_duration(self.player.duration)
+            self.label_overlay.set_duration(self.player.duration)
+            self.time_slider.setValue(int(value * 1000))
 
     def observe_time_position(self):
         """
-        Observing the time position and writing it into the playtime widget.
+        Observing the time position and writing it into the playtime widget. Only called once, the observer lives
+        as long as the player. mpv calls it within its own thread for every frame, so it only keeps the newest
+        value and wakes up the GUI thread, if there is no update pending already.
         """
 
         @self.player.property_observer('time-pos')
         def time_observer(_name, value: float):
-            if value is not None:
-                self.playtime.setText(f"{value:.3f}")
-                self._slider_time_change(value)
-            else:
-                self.playtime.setText("NaN")
+            self.time_position = value
+            if not self._time_position_pending:
+                self._time_position_pending = True
+                # noinspection PyUnresolvedReferences
+                self.time_position_changed.emit()
+
+    def _schedule_time_position(self):
+        """
+        Showing the time position at most once per refresh of the display. Frame-stepping or playing faster than the
+        display refreshes does not update the widgets more often.
+        """
+        if not self.playhead_timer.isActive():
+            screen = self.app.primaryScreen() if self.app is not None else None
+            refresh_rate = screen.refreshRate() if screen is not None else 0
+            self.playhead_timer.start(int(1000 / refresh_rate) if refresh_rate > 0 else 16)
+
+    def _show_time_position(self):
+        """
+        Writing the newest time position into the playtime widget and the slider.
+        """
+        self._time_position_pending = False
+        value = self.time_position
+        if value is not None:
+            self.playtime.setText(f"{value:.3f}")
+            self._slider_time_change(value)
+            self.activity_handler.show_active_labels(value)
+        else:
+            self.playtime.setText("NaN")
 
 
 class ActivityHandler:
+    """
+    Inserting the labels of the shortcuts into the data-table. Open time_windows are registered within
+    Labeler.time_window_activity (shortcut -> label id), so a shortcut is handled in O(1), no matter how many
+    time_windows are open or how many rows the data-table has.
+    """
+
     def __init__(self, labeler_instance: Labeler):
         self.labeler = labeler_instance
+        self.intervals = LabelIntervals()  # Interval index of the labels, for the labels active at the playhead
 
-    def _get_saved_time_window(self, shortcut_keys: str) -> tuple or None:
+    def label_changed(self, label_id: int, old_data: List[str] or None, new_data: List[str] or None):
         """
-        Similar to _get_logging_idx(), but for data-table.
+        Keeping the interval index up to date, if one label was inserted, closed or deleted.
         """
-        for idx, activity in enumerate(self.labeler.time_window_activity):
-            if activity[2] == shortcut_keys:
-                values = (activity, idx)
-                return values
-        return None
+        if old_data is not None:
+            self.intervals.remove(label_id)
+        if new_data is not None:
+            self.intervals.insert(label_id, new_data[4], parse_time(new_data[0]), parse_time(new_data[1]))
 
-    def _handle_first_time_window(self, data: list, shortcut_keys: str):
+    def active_labels(self, seconds: float) -> set:
         """
-        Handling the first shortcut-pressed key for time_window activities.
+        Ids of the labels of the playing video, that are active at this time. O(log n + k).
+        """
+        return set(self.intervals.active(self.labeler.data_model.store, self.labeler.video_name_playing.text(),
+                                         seconds).tolist())
+
+    def show_active_labels(self, seconds: float):
+        """
+        Highlighting the labels active at the playhead within the data-table and scrolling to the first of the
+        labels, that became active.
+        """
+        model = self.labeler.data_model
+        active = self.active_labels(seconds)
+        if active == model.active:
+            return
+        started = active - model.active
+        model.set_active(active)
+        rows = [row for row in (model.store.row_of(label_id) for label_id in started) if row is not None]
+        index = self.labeler.data_filter.index_of_row(min(rows)) if rows else QModelIndex()
+        if index.isValid():
+            self.labeler.data_table.scrollTo(index, QAbstractItemView.EnsureVisible)
+
+    def open_window(self, shortcut_keys: str, label_id: int, data: list):
+        """
+        Registering an open time_window and pinning it within the logger.
         """
-        current_row_count = self.labeler.data_table.rowCount()
-        self.labeler.time_window_activity.append((current_row_count, 1, shortcut_keys, data[0]))
+        self.labeler.time_window_activity[shortcut_keys] = label_id
+        self.labeler.logger.pin_label(label_id, shortcut_keys, data)
 
-        self.labeler.data_table.setRowCount(current_row_count + 1)
-        for j, item in enumerate(data):
-            self.labeler.data_table.setItem(current_row_count, j, QTableWidgetItem(item))
+    def forget_windows(self, label_ids: Iterable[int]):
+        """
+        Removing the time_windows of these labels from the registry, for example if the labels were deleted.
+        """
+        label_ids = set(label_ids)
+        for shortcut_keys, label_id in list(self.labeler.time_window_activity.items()):
+            if label_id in label_ids:
+                del self.labeler.time_window_activity[shortcut_keys]
+                self.labeler.logger.unpin_label(label_id)
+
+    def open_windows_of(self, label_ids: Iterable[int]) -> dict:
+        """
+        The open time_windows (shortcut -> label id) of these labels.
+        """
+        label_ids = set(label_ids)
+        return {shortcut_keys: label_id for shortcut_keys, label_id in self.labeler.time_window_activity.items()
+                if label_id in label_ids}
 
-        self.labeler.logger.logging_activity.append([current_row_count, shortcut_keys, "#333333", "darkorange", data])
-        self.labeler.logger.write_logger()
+    def clear(self):
+        """
+        Forgetting all open time_windows, for example if the label file of another video is loaded.
+        """
+        self.forget_windows(list(self.labeler.time_window_activity.values()))
 
-    def _handle_second_time_window(self, data: list, shortcut_keys: str, activity: list, act_idx: int):
+    def _handle_first_time_window(self, data: list, shortcut_keys: str):
+        """
+        Handling the first shortcut-pressed key for time_window activities.
+        """
+        row = self.labeler.data_model.append_row(data)
+        label_id = self.labeler.data_model.store.id_of(row)
+        self.open_window(shortcut_keys, label_id, data)
+        self.labeler.app_functions.history.record(("insert", label_id, list(data), shortcut_keys))
+
+    def _handle_second_time_window(self, data: list, shortcut_keys: str, label_id: int):
         """
         Handling the second time shortcut-pressed key for time_window activities. It is important to know,
         that "WAIT..." means, it is waiting for the second time to be pressed. So a time_window should be always
         closed and got StartTime and EndTime.
         """
-        self.labeler.data_table.setItem(activity[0], activity[1],
-                                        QTableWidgetItem(data[1]))
-        self.labeler.time_window_activity.pop(act_idx)
+        self.labeler.data_model.set_end_time(self.labeler.data_model.store.row_of(label_id), data[1], data[6])
+        del self.labeler.time_window_activity[shortcut_keys]
+        self.labeler.app_functions.history.record(("close", label_id, data[1], data[6], shortcut_keys))
 
-        logg_idx = self.labeler.logger.get_logging_idx(activity[0], shortcut_keys)
-
-        if logg_idx is not None:
-            self.labeler.logger.logging_activity[logg_idx] = [activity[0], shortcut_keys, "#333333", "#333333", data]
-        else:
-            self.labeler.logger.logging_activity.append([activity[0], shortcut_keys, "#333333", "#333333", data])
-        self.labeler.logger.write_logger()
+        self.labeler.logger.unpin_label(label_id)
+        self.labeler.logger.log_label(label_id, shortcut_keys, data, "#333333", "#333333")
 
     def populate_data_table_time_window(self, data: list, shortcut_keys: str):
         """
@@ -315,28 +662,1240 @@ class ActivityHandler:
         It checks if it is first time pressed or second time pressed for the time_window activity.
         """
         self.labeler.data_table_changed = True
-        act = self._get_saved_time_window(shortcut_keys)
-        if act is None:
-            data[1] = "WAIT..."
+        label_id = self.labeler.time_window_activity.get(shortcut_keys)
+        if label_id is None:
+            data[1], data[6] = WAIT, ""
             self._handle_first_time_window(data, shortcut_keys)
         else:
-            activity = act[0]
-            act_idx = act[1]
-            data[0] = act[0][-1]
-            self._handle_second_time_window(data, shortcut_keys, activity, act_idx)
+            store = self.labeler.data_model.store
+            row = store.row_of(label_id)
+            data[0], data[5] = store.text(row, 0), store.text(row, 5)
+            self._handle_second_time_window(data, shortcut_keys, label_id)
 
     def populate_data_table_point_activity(self, data: list, shortcut_keys: str):
         """
         Handling point activity (writing once)
         """
         self.labeler.data_table_changed = True
-        current_row_count = self.labeler.data_table.rowCount()
-        self.labeler.data_table.setRowCount(current_row_count + 1)
-        for j, item in enumerate(data):
-            self.labeler.data_table.setItem(current_row_count, j, QTableWidgetItem(item))
-        self.labeler.logger.logging_activity.append(
-            [current_row_count, shortcut_keys, "#222222", "#222222", list(data)])
-        self.labeler.logger.write_logger()
+        row = self.labeler.data_model.append_row(data)
+        label_id = self.labeler.data_model.store.id_of(row)
+        self.labeler.app_functions.history.record(("insert", label_id, list(data), None))
+        self.labeler.logger.log_label(label_id, shortcut_keys, data, "#222222", "#222222")
+
+
+class LabelHistory:
+    """
+    Undo/redo of the changes within the data-table. Only the changes (deltas) are kept, never copies of the
+    data-table. The labels are addressed by their id, so sorting the data-table does not break the history:
+
+    - ("insert", label_id, row_data, shortcut_keys) shortcut_keys is None for point_activities
+    - ("close", label_id, end_time, end_frame, shortcut_keys) closing a time_window
+    - ("delete", rows, rows_data, label_ids, open_windows) open_windows is a dict shortcut -> label id
+
+    Undo and redo are going through the LabelTableModel, so they are appended to the journal like every other
+    change.
+    """
+
+    def __init__(self, labeler_instance: Labeler, limit: int = 1000):
+        self.labeler = labeler_instance
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def record(self, change: tuple):
+        self.undo_stack.append(change)
+        self.redo_stack.clear()
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def undo(self) -> tuple or None:
+        """
+        Reverting the last change and returning it, None if there is nothing to undo.
+        """
+        if not self.undo_stack:
+            return None
+        change = self.undo_stack.pop()
+        self._apply(change, undo=True)
+        self.redo_stack.append(change)
+        return change
+
+    def redo(self) -> tuple or None:
+        """
+        Applying the last reverted change again and returning it, None if there is nothing to redo.
+        """
+        if not self.redo_stack:
+            return None
+        change = self.redo_stack.pop()
+        self._apply(change, undo=False)
+        self.undo_stack.append(change)
+        return change
+
+    def _apply(self, change: tuple, undo: bool):
+        """
+        Helper to apply a change (undo=False) or its inverse (undo=True).
+        """
+        model = self.labeler.data_model
+        activity_handler = self.labeler.activity_handler
+        if change[0] == "insert":
+            _kind, label_id, row_data, shortcut_keys = change
+            if undo:
+                activity_handler.forget_windows([label_id])
+                model.remove_ids([label_id])
+            else:
+                model.append_row(row_data, label_id)
+                if shortcut_keys is not None:
+                    activity_handler.open_window(shortcut_keys, label_id, row_data)
+        elif change[0] == "close":
+            _kind, label_id, end_time, end_frame, shortcut_keys = change
+            row = model.store.row_of(label_id)
+            if undo:
+                model.set_end_time(row, WAIT)
+                activity_handler.open_window(shortcut_keys, label_id, model.store.row_text(row))
+            else:
+                model.set_end_time(row, end_time, end_frame)
+                activity_handler.forget_windows([label_id])
+        elif change[0] == "delete":
+            _kind, rows, rows_data, label_ids, open_windows = change
+            if undo:
+                model.insert_rows(rows, rows_data, label_ids)
+                for shortcut_keys, label_id in open_windows.items():
+                    activity_handler.open_window(shortcut_keys, label_id, rows_data[label_ids.index(label_id)])
+            else:
+                activity_handler.forget_windows(label_ids)
+                model.remove_ids(label_ids)
+
+
+class LabelTableModel(QAbstractTableModel):
+    """
+    Model of the data-table. All the labels are kept inside a LabelStore (columns instead of one
+    item per cell), the texts are only created when the view is painting them. Rows are shown
+    batch by batch (canFetchMore/fetchMore), while the user is scrolling.
+    """
+
+    changed = pyqtSignal()  # Emitted if a label is inserted, closed or deleted
+    label_changed = pyqtSignal(int, object, object)  # (id, row before, row after), None if inserted or deleted
+    labels_reset = pyqtSignal()  # Emitted if many labels changed at once (loading, replaying, undo of a delete)
+    fetch_batch = 200  # Rows shown at once, more are fetched while scrolling
+    max_removed_ranges = 32  # Removing more ranges of rows at once resets the view instead
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = LabelStore()
+        self.journal = None  # LabelJournal of the loaded label file, every change is appended to it
+        self.fetched = 0  # Number of rows of the store, that are shown
+        self.active = set()  # Ids of the labels active at the playhead, highlighted
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.fetched
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self.fetched < len(self.store)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        rows = min(self.fetch_batch, len(self.store) - self.fetched)
+        if parent.isValid() or rows <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + rows - 1)
+        self.fetched += rows
+        self.endInsertRows()
+
+    def fetch_all(self):
+        """
+        Showing all the rows of the store.
+        """
+        if self.fetched < len(self.store):
+            self.beginInsertRows(QModelIndex(), self.fetched, len(self.store) - 1)
+            self.fetched = len(self.store)
+            self.endInsertRows()
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.store.text(index.row(), index.column())
+        if index.isValid() and role == Qt.BackgroundRole and self.active and \
+                self.store.id_of(index.row()) in self.active:
+            return QColor(255, 193, 7, 70)
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return str(section + 1)
+
+    def set_active(self, label_ids: set):
+        """
+        Highlighting the rows of these labels (active at the playhead). Only the rows, that changed, are painted again.
+        """
+        changed, self.active = self.active ^ label_ids, label_ids
+        for label_id in changed:
+            row = self.store.row_of(label_id)
+            if row is not None and row < self.fetched:
+                # noinspection PyUnresolvedReferences
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1), [Qt.BackgroundRole])
+
+    def fetch_to(self, row: int):
+        """
+        Showing all the rows up to this row (for scrolling to it).
+        """
+        if row >= self.fetched:
+            self.beginInsertRows(QModelIndex(), self.fetched, row)
+            self.fetched = row + 1
+            self.endInsertRows()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        """
+        Called by the view (sortByColumn). Times are sorted as numbers, not as text.
+        """
+        self.sort_by([column], descending=order == Qt.DescendingOrder)
+
+    def sort_by(self, columns: List[int], descending: bool = False):
+        """
+        Stable sort by several columns (numeric keys, see LabelStore.sort_order). The permutation is computed
+        first, the rows are only reindexed (and the view reset), if the order changes.
+        """
+        order = self.store.sort_order(columns, descending)
+        if np.array_equal(order, np.arange(len(self.store))):
+            return
+        self.beginResetModel()
+        self.store.take(order)
+        self.fetched = min(len(self.store), max(self.fetched, self.fetch_batch))
+        self.endResetModel()
+
+    def text(self, row: int, column: int) -> str:
+        return self.store.text(row, column)
+
+    def append_row(self, data: List[str], label_id: int = None) -> int:
+        """
+        Appending a row ("StartTime", "EndTime", "ActType", "Label", "Video") and returning the row index.
+        Without label_id the row gets a new id. If the rows before are not fetched yet, the row is only appended to
+        the store and shown by fetchMore() later.
+        """
+        row = len(self.store)
+        if self.fetched == row:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.store.append_text(data, label_id)
+            self.fetched += 1
+            self.endInsertRows()
+        else:
+            self.store.append_text(data, label_id)
+        row_data = self.store.row_text(row)
+        if self.journal is not None:
+            self.journal.insert(row_data)
+        # noinspection PyUnresolvedReferences
+        self.label_changed.emit(self.store.id_of(row), None, row_data)
+        # noinspection PyUnresolvedReferences
+        self.changed.emit()
+        return row
+
+    def set_end_time(self, row: int, end_time: str, end_frame: str = ""):
+        """
+        Setting EndTime (and EndFrame) of a row, for example closing a time_window.
+        """
+        row_data = self.store.row_text(row)
+        self.store.set_etime(row, parse_time(end_time), parse_frame(end_frame))
+        if self.journal is not None:
+            self.journal.close_window(row_data, self.store.text(row, 1), self.store.text(row, 6))
+        if row < self.fetched:
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(self.index(row, 1), self.index(row, 6))
+        # noinspection PyUnresolvedReferences
+        self.label_changed.emit(self.store.id_of(row), row_data, self.store.row_text(row))
+        # noinspection PyUnresolvedReferences
+        self.changed.emit()
+
+    def remove_row(self, row: int):
+        row_data = self.store.row_text(row)
+        label_id = self.store.id_of(row)
+        if row < self.fetched:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.store.remove_rows([row])
+            self.fetched -= 1
+            self.endRemoveRows()
+        else:
+            self.store.remove_rows([row])  # Not fetched yet, so not known by the view
+        if self.journal is not None:
+            self.journal.delete(row_data)
+        # noinspection PyUnresolvedReferences
+        self.label_changed.emit(label_id, row_data, None)
+        if row >= self.fetched:
+            # noinspection PyUnresolvedReferences
+            self.labels_reset.emit()  # The rows of the filter behind it moved up
+        # noinspection PyUnresolvedReferences
+        self.changed.emit()
+
+    def remove_rows(self, rows: List[int], rows_data: List[List[str]] = None):
+        """
+        Removing many rows at once (rows ascending, no duplicates). Every contiguous range of rows is removed at
+        once (last range first), the view is told about the range, not about every row. Many scattered rows are
+        removed in a single pass with a reset. rows_data are the texts of the rows for the journal, if they are
+        known already.
+        """
+        if len(rows) == 1:
+            self.remove_row(rows[0])
+            return
+        if not rows:
+            return
+        if rows_data is None:
+            rows_data = self.store.rows_text(rows)
+        rows = np.asarray(rows)
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        ranges = list(zip(rows[np.r_[0, breaks]].tolist(), rows[np.r_[breaks - 1, len(rows) - 1]].tolist()))
+        if len(ranges) > self.max_removed_ranges:
+            # Every range costs the view a pass over its rows, so many scattered rows are removed by a reset
+            self.beginResetModel()
+            self.store.remove_rows(rows)
+            self.fetched = min(len(self.store), max(self.fetched - len(rows), self.fetch_batch))
+            self.endResetModel()
+        else:
+            for first, last in reversed(ranges):
+                if last >= self.fetched:  # Rows, that are not fetched yet, are not known by the view
+                    self.store.remove_rows(np.arange(max(first, self.fetched), last + 1))
+                    last = self.fetched - 1
+                if first <= last:
+                    self.beginRemoveRows(QModelIndex(), first, last)
+                    self.store.remove_rows(np.arange(first, last + 1))
+                    self.fetched -= last - first + 1
+                    self.endRemoveRows()
+        if self.journal is not None:
+            self.journal.delete_many(rows_data)
+        # noinspection PyUnresolvedReferences
+        self.labels_reset.emit()
+        # noinspection PyUnresolvedReferences
+        self.changed.emit()
+
+    def remove_ids(self, label_ids: Iterable[int]):
+        """
+        Removing the rows of these labels.
+        """
+        rows = [self.store.row_of(label_id) for label_id in label_ids]
+        self.remove_rows(sorted(set(row for row in rows if row is not None)))
+
+    def insert_rows(self, rows: List[int], rows_data: List[List[str]], label_ids: List[int]):
+        """
+        Putting removed rows back to where they were (rows ascending), with their old ids.
+        """
+        self.beginResetModel()
+        self.store.insert_text(rows, rows_data, label_ids)
+        self.fetched = min(len(self.store), max(self.fetched + len(rows), self.fetch_batch))
+        self.endResetModel()
+        if self.journal is not None:
+            self.journal.insert_many(rows_data)
+        # noinspection PyUnresolvedReferences
+        self.labels_reset.emit()
+        # noinspection PyUnresolvedReferences
+        self.changed.emit()
+
+    def set_store(self, store: LabelStore, journal: LabelJournal = None):
+        """
+        Replacing all the rows, for example after loading a csv file. Changes are appended to the journal.
+        """
+        self.beginResetModel()
+        self.store = store
+        self.journal = journal
+        self.fetched = min(len(store), self.fetch_batch)
+        self.endResetModel()
+        # noinspection PyUnresolvedReferences
+        self.labels_reset.emit()
+
+    def extend_store(self, chunk: LabelStore):
+        """
+        Appending rows while a label file is loading. The first batch is shown right away, the rest is fetched
+        while scrolling.
+        """
+        self.store.extend(chunk)
+        if self.fetched < self.fetch_batch:
+            self.fetchMore()
+        # noinspection PyUnresolvedReferences
+        self.labels_reset.emit()
+
+    def refresh(self):
+        """
+        Showing the store again, after it was changed directly (for example by replaying a journal).
+        """
+        self.beginResetModel()
+        self.fetched = min(len(self.store), max(self.fetched, self.fetch_batch))
+        self.endResetModel()
+        # noinspection PyUnresolvedReferences
+        self.labels_reset.emit()
+
+
+class LabelFilterModel(QAbstractProxyModel):
+    """
+    Proxy between the data-table and the LabelTableModel, showing only the labels matching the filter bar. Without
+    a filter, every row of the source is passed through. With a filter, the shown rows are a sorted array of rows of
+    the store, found within the inverted index (LabelSearch in label_index.py). The index follows every inserted
+    and deleted label of the source.
+    """
+
+    def __init__(self, source: LabelTableModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.source = source
+        self.search = LabelSearch()
+        self.query = ""
+        self.rows = None  # Rows of the store, that match the filter (ascending), None without filter
+        self.fetched = 0  # Number of matching rows, that are shown
+        self._store_size = 0  # Size of the store, to find the appended rows
+        self._store = source.store  # The inverted index is dropped, if the source gets another store
+        self._removed = None  # Positions of the rows, that are removed right now
+        # noinspection PyUnresolvedReferences
+        source.rowsAboutToBeInserted.connect(self._rows_about_to_be_inserted)
+        # noinspection PyUnresolvedReferences
+        source.rowsInserted.connect(self._rows_inserted)
+        # noinspection PyUnresolvedReferences
+        source.rowsAboutToBeRemoved.connect(self._rows_about_to_be_removed)
+        # noinspection PyUnresolvedReferences
+        source.rowsRemoved.connect(self._rows_removed)
+        # noinspection PyUnresolvedReferences
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        # noinspection PyUnresolvedReferences
+        source.modelReset.connect(self._model_reset)
+        # noinspection PyUnresolvedReferences
+        source.dataChanged.connect(self._data_changed)
+        # noinspection PyUnresolvedReferences
+        source.label_changed.connect(self._label_changed)
+        # noinspection PyUnresolvedReferences
+        source.labels_reset.connect(self._labels_reset)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self.source.rowCount() if self.rows is None else self.fetched
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return self.source.columnCount(parent)
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        return self.createIndex(row, column) if self.hasIndex(row, column, parent) else QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if self.rows is None:
+            return self.source.canFetchMore(parent)
+        return not parent.isValid() and self.fetched < len(self.rows)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if self.rows is None:
+            self.source.fetchMore(parent)
+            return
+        rows = min(self.source.fetch_batch, len(self.rows) - self.fetched)
+        if parent.isValid() or rows <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + rows - 1)
+        self.fetched += rows
+        self.endInsertRows()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        self.source.sort(column, order)
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row() if self.rows is None else int(self.rows[proxy_index.row()])
+        return self.source.createIndex(row, proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.proxy_row(source_index.row())
+        return self.index(row, source_index.column()) if row is not None else QModelIndex()
+
+    def fetch_all(self):
+        """
+        Showing all the rows, that match the filter.
+        """
+        if self.rows is None:
+            self.source.fetch_all()
+        elif self.fetched < len(self.rows):
+            self.beginInsertRows(QModelIndex(), self.fetched, len(self.rows) - 1)
+            self.fetched = len(self.rows)
+            self.endInsertRows()
+
+    def source_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Rows of the store of many shown rows at once.
+        """
+        return np.asarray(rows, dtype=np.int64) if self.rows is None else self.rows[rows]
+
+    def proxy_row(self, row: int) -> int or None:
+        """
+        Shown row of a row of the store, None if it does not match the filter.
+        """
+        if self.rows is None:
+            return row
+        position = int(np.searchsorted(self.rows, row))
+        return position if position < len(self.rows) and self.rows[position] == row else None
+
+    def index_of_row(self, row: int) -> QModelIndex:
+        """
+        Index of a row of the store (for scrolling to it), the rows up to it are fetched. Invalid if the row does
+        not match the filter.
+        """
+        position = self.proxy_row(row)
+        if position is None:
+            return QModelIndex()
+        if self.rows is None:
+            self.source.fetch_to(position)
+        elif position >= self.fetched:
+            self.beginInsertRows(QModelIndex(), self.fetched, position)
+            self.fetched = position + 1
+            self.endInsertRows()
+        return self.index(position, 0)
+
+    def set_filter(self, query: str):
+        """
+        Showing only the labels matching the filter (see parse_query() in label_index.py), all if it is empty.
+        """
+        self.beginResetModel()
+        self.query = query
+        self._filter()
+        self.endResetModel()
+
+    def _filter(self):
+        """
+        Helper searching the matching rows within the inverted index.
+        """
+        self.rows = self.search.search(self.source.store, self.query)
+        self.fetched = min(len(self.rows), self.source.fetch_batch) if self.rows is not None else 0
+        self._store_size = len(self.source.store)
+
+    def _rows_about_to_be_inserted(self, _parent: QModelIndex, first: int, last: int):
+        if self.rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _rows_inserted(self, _parent: QModelIndex, first: int, last: int):
+        """
+        Passing the inserted rows through. With a filter, labels appended to the store are only shown if they match
+        (rows only fetched by the source are not new).
+        """
+        if self.rows is None:
+            self.endInsertRows()
+            return
+        self._append_matching()
+
+    def _append_matching(self):
+        """
+        Helper adding the rows appended to the store since, that match the filter.
+        """
+        store = self.source.store
+        appended = [row for row in range(self._store_size, len(store))
+                    if LabelSearch.matches(self.query, store.row_text(row))]
+        self._store_size = len(store)
+        if appended:
+            shown = self.fetched == len(self.rows)
+            self.rows = np.concatenate((self.rows, appended))
+            if shown:
+                self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + len(appended) - 1)
+                self.fetched += len(appended)
+                self.endInsertRows()
+
+    def _rows_about_to_be_removed(self, _parent: QModelIndex, first: int, last: int):
+        if self.rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            return
+        self._removed = (int(np.searchsorted(self.rows, first)), int(np.searchsorted(self.rows, last, side="right")))
+        if self._removed[0] < min(self._removed[1], self.fetched):
+            self.beginRemoveRows(QModelIndex(), self._removed[0], min(self._removed[1], self.fetched) - 1)
+
+    def _rows_removed(self, _parent: QModelIndex, first: int, last: int):
+        """
+        Removing the matching rows of a removed range, the rows behind are moved up.
+        """
+        if self.rows is None:
+            self.endRemoveRows()
+            return
+        start, end = self._removed
+        self.rows = np.concatenate((self.rows[:start], self.rows[end:] - (last - first + 1)))
+        self._store_size -= last - first + 1
+        if start < min(end, self.fetched):
+            self.fetched -= min(end, self.fetched) - start
+            self.endRemoveRows()
+        self._removed = None
+
+    def _model_reset(self):
+        if self._store is not self.source.store:
+            self._store = self.source.store
+            self.search.reset()
+        if self.rows is not None:
+            self._filter()
+        self.endResetModel()
+
+    def _labels_reset(self):
+        """
+        Many labels changed at once, the inverted index is built again (when it is needed). With a filter, the
+        matching rows are searched again.
+        """
+        self.search.reset()
+        if self.rows is not None:
+            self.set_filter(self.query)
+
+    def _label_changed(self, label_id: int, old_data: List[str] or None, new_data: List[str] or None):
+        if old_data is None:
+            self.search.insert(label_id, new_data)
+            if self.rows is not None:
+                self._append_matching()  # Appended behind the rows, that the source did not fetch yet
+        elif new_data is None:
+            self.search.remove(label_id)
+
+    def _data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles: List[int] = ()):
+        if self.rows is None:
+            first, last = top_left.row(), bottom_right.row()
+        else:
+            first = int(np.searchsorted(self.rows, top_left.row()))
+            last = min(int(np.searchsorted(self.rows, bottom_right.row(), side="right")), self.fetched) - 1
+            if first > last:
+                return
+        # noinspection PyUnresolvedReferences
+        self.dataChanged.emit(self.index(first, top_left.column()), self.index(last, bottom_right.column()), roles)
+
+
+class VideoTableModel(QAbstractTableModel):
+    """
+    Model of the playlist. Every video is a VideoInfo (video_library.py), filled by the background indexer.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.videos = []  # VideoInfo of every row
+        self.rows = {}  # Name of the video -> row
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.videos)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(VIDEO_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return video_texts(self.videos[index.row()])[index.column()]
+        elif role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return VIDEO_COLUMNS[section]
+        return str(section + 1)
+
+    def name(self, row: int) -> str:
+        return self.videos[row].name
+
+    def set_videos(self, videos: List[VideoInfo]):
+        self.beginResetModel()
+        self.videos = list(videos)
+        self.rows = {info.name: row for row, info in enumerate(self.videos)}
+        self.endResetModel()
+
+    def update_videos(self, videos: List[VideoInfo]):
+        """
+        Updating the rows of known videos (only if something changed) and appending new videos.
+        """
+        new_videos = []
+        for info in videos:
+            row = self.rows.get(info.name)
+            if row is None:
+                new_videos.append(info)
+            elif self.videos[row] != info:
+                self.videos[row] = info
+                # noinspection PyUnresolvedReferences
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(VIDEO_COLUMNS) - 1))
+        if new_videos:
+            first = len(self.videos)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_videos) - 1)
+            for info in new_videos:
+                self.rows[info.name] = len(self.videos)
+                self.videos.append(info)
+            self.endInsertRows()
+
+    def remove_videos(self, names: Iterable[str]):
+        for row in sorted((self.rows[name] for name in names if name in self.rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.videos[row]
+            self.endRemoveRows()
+        self.rows = {info.name: row for row, info in enumerate(self.videos)}
+
+    def set_label_count(self, label_name: str, count: int):
+        """
+        Showing the number of labels of the videos with this label file (label_file_name()), after saving.
+        """
+        for row, info in enumerate(self.videos):
+            if label_file_name(info.name) == label_name and info.labels != count:
+                self.videos[row] = info._replace(labels=count)
+                index = self.index(row, len(VIDEO_COLUMNS) - 1)
+                # noinspection PyUnresolvedReferences
+                self.dataChanged.emit(index, index)
+
+
+class LogModel(QAbstractListModel):
+    """
+    Model of the logging window. The entries are kept inside a ring buffer with a fixed capacity ("log_max"),
+    so appending an entry only inserts one row (and drops the oldest one). Open time_windows are pinned on top
+    and never dropped.
+    """
+
+    BorderRole = Qt.UserRole + 1
+
+    def __init__(self, capacity: int = 12, parent=None):
+        super().__init__(parent)
+        self.pinned = {}  # key -> (text, bg_color, border_color), open time_windows
+        self._ring = [None] * capacity
+        self._start = 0  # Index of the oldest entry within the ring
+        self._count = 0
+        self._appended = 0  # Number of all entries ever appended, used as entry id
+        self._tracked = {}  # (text, bg_color, border_color) -> number of entries within the ring
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ring)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.pinned) + self._count
+
+    def _entry(self, row: int) -> tuple:
+        if row < len(self.pinned):
+            return list(self.pinned.values())[row]
+        return self._ring[(self._start + row - len(self.pinned)) % len(self._ring)]
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        text, bg_color, border_color = self._entry(index.row())
+        is_last = index.row() == self.rowCount() - 1 and self._count > 0
+        if role == Qt.DisplayRole:
+            return text
+        elif role == Qt.BackgroundRole:
+            return QColor("#111111" if is_last else bg_color)
+        elif role == self.BorderRole:
+            return QColor("darkgreen" if is_last else border_color)
+        return None
+
+    def contains(self, text: str, bg_color: str, border_color: str) -> bool:
+        return (text, bg_color, border_color) in self._tracked
+
+    def _track(self, entry: tuple, count: int):
+        self._tracked[entry] = self._tracked.get(entry, 0) + count
+        if self._tracked[entry] <= 0:
+            del self._tracked[entry]
+
+    def append(self, text: str, bg_color: str, border_color: str) -> int:
+        """
+        Appending an entry and returning its id. If the ring is full, the oldest entry is dropped.
+        """
+        capacity = len(self._ring)
+        if capacity == 0:
+            return -1
+        first = len(self.pinned)
+        if self._count == capacity:
+            self.beginRemoveRows(QModelIndex(), first, first)
+            self._track(self._ring[self._start], -1)
+            self._start = (self._start + 1) % capacity
+            self._count -= 1
+            self.endRemoveRows()
+        row = first + self._count
+        self.beginInsertRows(QModelIndex(), row, row)
+        entry = (text, bg_color, border_color)
+        self._ring[(self._start + self._count) % capacity] = entry
+        self._track(entry, 1)
+        self._count += 1
+        self.endInsertRows()
+        if row > first:
+            previous = self.index(row - 1)
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(previous, previous)  # Not the last entry anymore
+        self._appended += 1
+        return self._appended - 1
+
+    def update(self, entry_id: int, text: str):
+        """
+        Changing the text of an entry, if it is still inside the ring.
+        """
+        position = entry_id - (self._appended - self._count)
+        if 0 <= position < self._count:
+            ring_idx = (self._start + position) % len(self._ring)
+            old = self._ring[ring_idx]
+            self._track(old, -1)
+            self._ring[ring_idx] = (text, old[1], old[2])
+            self._track(self._ring[ring_idx], 1)
+            index = self.index(len(self.pinned) + position)
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(index, index)
+
+    def pin(self, key, text: str, bg_color: str, border_color: str):
+        row = len(self.pinned)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.pinned[key] = (text, bg_color, border_color)
+        self.endInsertRows()
+
+    def unpin(self, key):
+        if key not in self.pinned:
+            return
+        row = list(self.pinned).index(key)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.pinned[key]
+        self.endRemoveRows()
+
+    def set_capacity(self, capacity: int):
+        """
+        Changing the size of the ring. The newest entries are kept.
+        """
+        self.beginResetModel()
+        entries = [self._ring[(self._start + i) % len(self._ring)] for i in range(self._count)][-capacity:]
+        self._ring = entries + [None] * (capacity - len(entries))
+        self._appended += len(entries) - self._count
+        self._start, self._count = 0, len(entries)
+        self._tracked = {}
+        for entry in entries:
+            self._track(entry, 1)
+        self.endResetModel()
+
+
+class LogDelegate(QStyledItemDelegate):
+    """
+    Painting a single entry of the logging window (background, border and text).
+    """
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        painter.save()
+        rect = option.rect.adjusted(0, 0, -1, -1)
+        painter.fillRect(rect, index.data(Qt.BackgroundRole))
+        painter.setPen(index.data(LogModel.BorderRole))
+        painter.drawRect(rect)
+        painter.setPen(QColor("#999999"))
+        painter.drawText(rect.adjusted(4, 0, -4, 0), Qt.AlignLeft | Qt.AlignVCenter, index.data())
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.fontMetrics.horizontalAdvance(index.data()) + 8, option.fontMetrics.height() + 6)
+
+
+class BackgroundDelegate(QStyledItemDelegate):
+    """
+    Painting the background of a cell (BackgroundRole) below the default painting. The stylesheet (qt_material)
+    paints the cells itself and ignores the BackgroundRole otherwise.
+    """
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        background = index.data(Qt.BackgroundRole)
+        if background is not None:
+            painter.fillRect(option.rect, background)
+        super().paint(painter, option, index)
+
+
+class LabelTableView(QTableView):
+    """
+    Data-table of the labels. The rows are fetched while scrolling, so selecting all (Ctrl+A) fetches all rows
+    first. Otherwise only the shown rows would be selected (and deleted).
+    """
+
+    def selectAll(self):
+        model = self.model()
+        if isinstance(model, LabelFilterModel):
+            model.fetch_all()
+        super().selectAll()
+
+
+class Filmstrip(QWidget):
+    """
+    Thumbnails of the playing video above the time slider. The thumbnails are rendered by ffmpeg (see thumbnails.py,
+    started by a few threads) and kept within an on-disk LRU cache. The thumbnails shown within the strip are
+    requested first, the others are needed for the previews while hovering over the strip or the time slider.
+    They are rendered a few at a time (backlog_batch), the ones near the cursor right away, so the strip is never
+    behind a long queue. Previews only come from the cache, the mpv-player is never sought for them.
+    """
+    backlog_batch = 4  # Thumbnails for the previews rendered at once
+
+    def __init__(self, labeler_instance, parent=None):
+        super().__init__(parent)
+        self.labeler = labeler_instance
+        self.cache = ThumbnailCache()
+        self.pool = None  # Threads starting ffmpeg, created when the first thumbnail is needed
+        self.pending = {}  # Index -> Future, thumbnails of the playing video, that are not rendered yet
+        self.backlog = []  # Indexes for the previews, that are not requested yet (last one first)
+        self.generation = 0  # Thumbnails of older videos are dropped
+        self.video_path = None
+        self.hash_key = None
+        self.duration = None
+        self.pixmaps = {}  # Index of the thumbnail -> QPixmap, only the thumbnails shown within the strip
+        self.setFixedHeight(THUMBNAIL_HEIGHT // 2)
+        self.setMouseTracking(True)
+
+    def set_video(self, video_name: str):
+        """
+        Showing the thumbnails of another video. The thumbnails are requested, as soon as the duration is known.
+        """
+        self._cancel()
+        self.video_path = os.path.join("videos", video_name)
+        try:
+            self.hash_key = video_hash(self.video_path)
+        except OSError:
+            self.hash_key = None
+        self.duration = None
+        self.pixmaps = {}
+        self.update()
+
+    def set_duration(self, duration: float):
+        if duration == self.duration or self.hash_key is None or not duration:
+            return
+        self.duration = duration
+        self._request()
+
+    def stop(self):
+        """
+        Cancelling all thumbnails, that are not rendered yet (closing the app).
+        """
+        self._cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cancel(self):
+        self.generation += 1
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        self.backlog = []
+
+    def _slot_width(self) -> int:
+        return self.height() * 16 // 9
+
+    def shown_indexes(self) -> List[int]:
+        """
+        Indexes of the thumbnails shown within the strip, one per slot.
+        """
+        if not self.duration:
+            return []
+        slots = max(self.width() // self._slot_width(), 1)
+        last = int(self.duration // THUMBNAIL_INTERVAL)
+        return [min(int((slot + 0.5) / slots * self.duration // THUMBNAIL_INTERVAL), last) for slot in range(slots)]
+
+    def _request(self):
+        """
+        Helper to load the cached thumbnails of the strip and to render the missing ones right away. The others
+        (for the previews) are put into the backlog.
+        """
+        shown = self.shown_indexes()
+        self._request_indexes(shown)
+        self.backlog = [index for index in range(int(self.duration // THUMBNAIL_INTERVAL), -1, -1)
+                        if index not in shown]
+        self._fill()
+
+    def _request_indexes(self, indexes: Iterable[int]):
+        """
+        Helper to show the cached thumbnails of indexes (if shown within the strip) and to render the missing ones.
+        """
+        for index in indexes:
+            if index in self.pending:
+                continue
+            if self.cache.contains(self.hash_key, index):
+                if index not in self.pixmaps:
+                    self._show(self.generation, index)
+                continue
+            if self.pool is None:
+                # ffmpeg runs in its own process anyway, so threads are enough (no fork of the GUI process)
+                self.pool = ThreadPoolExecutor(max_workers=max((os.cpu_count() or 2) // 2, 1),
+                                               thread_name_prefix="thumbnail")
+            future = self.pool.submit(render_thumbnail, self.video_path, index * THUMBNAIL_INTERVAL)
+            future.add_done_callback(lambda done, generation=self.generation, hash_key=self.hash_key, idx=index:
+                                     self._rendered(done, generation, hash_key, idx))
+            self.pending[index] = future
+
+    def _fill(self):
+        """
+        Helper to render the next thumbnails of the backlog, as long as less than backlog_batch are rendering.
+        """
+        while self.backlog and len(self.pending) < self.backlog_batch:
+            self._request_indexes([self.backlog.pop()])
+
+    def _rendered(self, future: Future, generation: int, hash_key: str, index: int):
+        """
+        Helper running in the background, after a thumbnail is rendered. Writing it into the cache.
+        """
+        if future.cancelled():
+            return
+        try:
+            if future.exception() is None and future.result() is not None:
+                self.cache.put(hash_key, index, future.result())
+        finally:
+            # Also if the cache can't be written, otherwise the backlog would stop
+            # noinspection PyUnresolvedReferences
+            self.labeler.gui_call.emit(lambda: self._done(generation, index))
+
+    def _done(self, generation: int, index: int):
+        if generation != self.generation:
+            return
+        self.pending.pop(index, None)
+        self._show(generation, index)
+        self._fill()
+
+    def _show(self, generation: int, index: int):
+        if generation != self.generation or index not in self.shown_indexes():
+            return
+        content = self.cache.get(self.hash_key, index)
+        if content is not None:
+            pixmap = QPixmap()
+            pixmap.loadFromData(content)
+            self.pixmaps[index] = pixmap
+            self.update()
+
+    def resizeEvent(self, event):
+        if self.duration:
+            self._request_indexes(self.shown_indexes())  # Slots, that are new, ahead of the backlog
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#111111"))
+        width = self._slot_width()
+        for slot, index in enumerate(self.shown_indexes()):
+            pixmap = self.pixmaps.get(index)
+            if pixmap is not None:
+                painter.drawPixmap(QRect(slot * width, 0, width - 1, self.height()), pixmap)
+        painter.end()
+
+    def preview(self, global_pos: QPoint, seconds: float):
+        """
+        Showing the cached thumbnail of a time as tooltip. Nothing is shown, if it is not cached yet, then it is
+        rendered (with its neighbours) ahead of the backlog.
+        """
+        if not self.duration:
+            return
+        last = int(self.duration // THUMBNAIL_INTERVAL)
+        index = min(int(max(seconds, 0) // THUMBNAIL_INTERVAL), last)
+        if not self.cache.contains(self.hash_key, index):
+            self._request_indexes(range(max(index - 1, 0), min(index + 1, last) + 1))
+            return
+        path = os.path.abspath(self.cache.path(self.hash_key, index))
+        QToolTip.showText(global_pos, f'<img src="{path}" height="{THUMBNAIL_HEIGHT * 2}"><br>{seconds:.3f}', self)
+
+    def mouseMoveEvent(self, event):
+        if self.duration:
+            self.preview(event.globalPos(), event.pos().x() / max(self.width(), 1) * self.duration)
+
+
+class LabelOverlay:
+    """
+    Overlay of the labels of the playing video on the time slider: time_windows as coloured bands (one lane per
+    label), point_activities as ticks and a density histogram of all labels at the bottom. The labels are counted
+    into BINS bins over the duration (NumPy, vectorized), a single inserted, closed or deleted label only changes
+    its own bins. Everything is drawn into a pixmap, that is only drawn again if a label or the size changed, so
+    moving the playhead only copies the pixmap.
+    """
+    BINS = 2048
+
+    def __init__(self, labeler_instance, slider: QSlider):
+        self.labeler = labeler_instance
+        self.slider = slider
+        self.video = None
+        self.duration = None
+        self.dirty = True  # All bins are counted again, before painting the next time
+        self.density = np.zeros(self.BINS, dtype=np.int64)  # Labels starting within a bin
+        self.ticks = np.zeros(self.BINS, dtype=np.int64)  # Point_activities within a bin
+        self.lanes = {}  # Label -> differences of the time_windows per bin (cumsum is the coverage)
+        self.pixmap = None
+
+    def set_video(self, video_name: str):
+        self.video = video_name
+        self.duration = None
+        self.reset()
+
+    def set_duration(self, duration: float):
+        if duration != self.duration:
+            self.duration = duration
+            self.reset()
+
+    def reset(self):
+        """
+        Counting all labels again (lazy), for example after loading a label file.
+        """
+        self.dirty = True
+        self.pixmap = None
+        self.slider.update()
+
+    def _bin(self, seconds: float) -> int or None:
+        if math.isnan(seconds):
+            return None
+        return min(max(int(seconds * self.BINS / self.duration), 0), self.BINS - 1)
+
+    def _bins(self, seconds: np.ndarray) -> np.ndarray:
+        return np.clip((np.nan_to_num(seconds) * (self.BINS / self.duration)).astype(np.int64), 0, self.BINS - 1)
+
+    def label_changed(self, _label_id: int, old_data: List[str] or None, new_data: List[str] or None):
+        """
+        Updating only the bins of one label (inserted, closed or deleted).
+        """
+        if self.dirty or not self.duration:
+            return
+        if old_data is not None:
+            self._count(old_data, -1)
+        if new_data is not None:
+            self._count(new_data, 1)
+        self.pixmap = None
+        self.slider.update()
+
+    def _count(self, row_data: List[str], sign: int):
+        """
+        Helper adding (sign 1) or removing (sign -1) one label from the bins.
+        """
+        if row_data[4] != self.video:
+            return
+        start = self._bin(parse_time(row_data[0]))
+        if start is None:
+            return
+        self.density[start] += sign
+        if row_data[2] == "point_activity":
+            self.ticks[start] += sign
+        end = self._bin(parse_time(row_data[1]))
+        if row_data[2] == "time_window" and end is not None:
+            lane = self.lanes.setdefault(row_data[3], np.zeros(self.BINS + 1, dtype=np.int64))
+            lane[min(start, end)] += sign
+            lane[max(start, end) + 1] -= sign
+
+    def _count_all(self):
+        """
+        Helper counting all labels of the video into the bins, vectorized over the columns of the store.
+        """
+        store = self.labeler.data_model.store
+        self.lanes = {}
+        self.density = np.zeros(self.BINS, dtype=np.int64)
+        self.ticks = np.zeros(self.BINS, dtype=np.int64)
+        self.dirty = False
+        code = store.vids.codes.get(self.video)
+        if code is None:
+            return
+        mask = store.vid_codes == code
+        stime, etime = store.stime[mask], store.etime[mask]
+        type_codes, label_codes = store.type_codes[mask], store.label_codes[mask]
+        known = ~np.isnan(stime)
+        start = self._bins(stime)
+        self.density = np.bincount(start[known], minlength=self.BINS)
+        point = store.types.codes.get("point_activity", -1)
+        self.ticks = np.bincount(start[known & (type_codes == point)], minlength=self.BINS)
+        window = known & ~np.isnan(etime) & (type_codes == store.types.codes.get("time_window", -1))
+        first, last = np.minimum(start, self._bins(etime)), np.maximum(start, self._bins(etime))
+        for label_code in np.unique(label_codes[window]):
+            lane = window & (label_codes == label_code)
+            self.lanes[store.labels.decode(int(label_code))] = (np.bincount(first[lane], minlength=self.BINS + 1)
+                                                                - np.bincount(last[lane] + 1, minlength=self.BINS + 1))
+
+    def _render(self) -> QPixmap:
+        """
+        Helper drawing the bins into a pixmap of the size of the slider. Bins are combined per pixel column.
+        """
+        if self.dirty:
+            self._count_all()
+        width, height = max(self.slider.width(), 1), max(self.slider.height(), 1)
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        columns = np.arange(width) * self.BINS // width  # First bin of every pixel column
+        band_height = height // 3
+        lanes = sorted((label, lane) for label, lane in self.lanes.items() if lane.any())  # Without deleted
+        lane_height = max(band_height // max(len(lanes), 1), 1)
+        for number, (label, lane) in enumerate(lanes):
+            covered = np.maximum.reduceat(np.cumsum(lane[:-1]) > 0, columns)
+            changes = np.flatnonzero(np.diff(np.concatenate(([0], covered.astype(np.int8), [0]))))
+            color = QColor.fromHsv(zlib.crc32(label.encode()) % 360, 170, 230, 190)
+            top = min(number * lane_height, band_height - lane_height)
+            for first, last in zip(changes[::2], changes[1::2]):
+                painter.fillRect(int(first), top, int(last - first), lane_height, color)
+        painter.setPen(QColor(255, 255, 255, 200))
+        for x in np.flatnonzero(np.add.reduceat(self.ticks, columns)):
+            painter.drawLine(int(x), band_height, int(x), band_height + 3)
+        density = np.add.reduceat(self.density, columns)
+        if density.max() > 0:
+            bars = (density * (height // 3) // density.max()).astype(np.int64)
+            color = QColor(255, 255, 255, 90)
+            for x in np.flatnonzero(bars):
+                painter.fillRect(int(x), height - int(bars[x]), 1, int(bars[x]), color)
+        painter.end()
+        return pixmap
+
+    def paint_slider(self, event):
+        """
+        Paint event of the time slider. The overlay is drawn above the slider (the style paints an opaque
+        background), the colours are translucent, so the groove and the handle stay visible.
+        """
+        QSlider.paintEvent(self.slider, event)
+        if self.duration and self.video is not None:
+            if self.pixmap is None or self.pixmap.size() != self.slider.size():
+                self.pixmap = self._render()
+            painter = QPainter(self.slider)
+            painter.drawPixmap(0, 0, self.pixmap)
+            painter.end()
+
+
+class LazyPlayer:
+    """
+    Stands in for the mpv-player until the first video is played, so the app starts without loading libmpv. Before,
+    properties read are None (like mpv without a file) or the value set, properties set and observers are kept and
+    handed to the player, when it is started. Calling one of the methods in PLAYER_METHODS starts the player,
+    afterwards everything is passed to the player.
+    """
+
+    PLAYER_METHODS = {"play", "loadfile", "command", "command_async", "seek", "playlist_append"}
+
+    def __init__(self, start: Callable):
+        object.__setattr__(self, "_start", start)
+        object.__setattr__(self, "_player", None)
+        object.__setattr__(self, "_properties", {})  # Set before the player is started
+        object.__setattr__(self, "_observers", [])  # (property, function), observed before the player is started
+
+    @property
+    def started(self) -> bool:
+        return self._player is not None
+
+    def player(self):
+        """
+        The mpv-player, started if needed.
+        """
+        if self._player is None:
+            player = self._start()
+            for name, value in self._properties.items():
+                setattr(player, name, value)
+            for name, function in self._observers:
+                player.observe_property(name, function)
+            object.__setattr__(self, "_player", player)
+        return self._player
+
+    def property_observer(self, name: str) -> Callable:
+        if self._player is not None:
+            return self._player.property_observer(name)
+
+        def register(function: Callable) -> Callable:
+            self._observers.append((name, function))
+            return function
+        return register
+
+    def __getattr__(self, name: str):
+        if self._player is not None:
+            return getattr(self._player, name)
+        if name in self.PLAYER_METHODS:
+            return getattr(self.player(), name)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._properties.get(name)
+
+    def __setattr__(self, name: str, value):
+        if self._player is not None:
+            setattr(self._player, name, value)
+        else:
+            self._properties[name] = value
+
+    def __setitem__(self, name: str, value):
+        self.player()[name] = value
+
+    def __getitem__(self, name: str):
+        return self._player[name] if self._player is not None else None
 
 
 class Layout:
@@ -351,10 +1910,13 @@ class Layout:
         self.now_playing = QLabel("No Video Playing")
         self.app_window, self.app_window_layout = self.create_app_window()
         self.video, self.player = self.create_mpv_player()
-        self.video_table, self.video_table_scroll = self.create_video_table()
-        self.data_table, self.data_table_scroll = self.create_data_table()
+        self.video_table, self.video_model, self.video_table_scroll = self.create_video_table()
+        self.data_table, self.data_model, self.data_filter, self.filter_bar, self.data_table_scroll = \
+            self.create_data_table()
         self.time_slider = self.create_time_slider()
-        self.logger_widget, self.logger_scroll, self.logger_grid = self.create_logger()
+        self.filmstrip = Filmstrip(self.labeler)
+        self.label_overlay = LabelOverlay(self.labeler, self.time_slider)
+        self.logger_view, self.log_model = self.create_logger()
         self.video_widget, self.video_layout = self.create_second_column_video_layout()
         self.splitter_h, self.splitter_v = self.create_splitter()
         self.create_style()
@@ -368,11 +1930,22 @@ class Layout:
         app_window_layout = QGridLayout(app_window)
         return app_window, app_window_layout
 
-    def create_mpv_player(self) -> tuple[QWidget, mpv.MPV]:
+    def create_mpv_player(self) -> tuple[QWidget, "LazyPlayer"]:
         """
-        Starting MPV-Player and putting in withing a Widget.
+        Creating the widget of the MPV-Player. The player itself is started within the widget, when the first video
+        is played.
         """
         video = QWidget(self.labeler)
+        return video, LazyPlayer(lambda: self._start_mpv_player(video))
+
+    @staticmethod
+    def _start_mpv_player(video: QWidget):
+        """
+        Starting MPV-Player and putting in withing a Widget.
+        """
+        startup_profile.start()
+        import mpv
+        startup_profile.mark("import mpv (first video)")
         player = mpv.MPV(
             wid=str(int(video.winId())),
             vo="x11",
@@ -382,44 +1955,57 @@ class Layout:
             # script_opts="osd-level=3"
         )
         player["vo"] = "gpu"
-        return video, player
+        startup_profile.mark("starting mpv (first video)")
+        return player
 
-    def create_video_table(self) -> tuple[QTableWidget, QScrollArea]:
+    def create_video_table(self) -> tuple[QTableView, "VideoTableModel", QScrollArea]:
         """
-        Creating a table for all videos within the folder "videos".
+        Creating a table for all videos within the folder "videos" (with metadata). The view is backed by the
+        VideoTableModel.
         """
-        video_table = QTableWidget(self.labeler)
-        video_table.setRowCount(0)
-        video_table.setColumnCount(1)
-        video_table.setHorizontalHeaderLabels(["Video"])
+        video_model = VideoTableModel(self.labeler)
+        video_table = QTableView(self.labeler)
+        video_table.setModel(video_model)
         video_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        video_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        video_table.verticalHeader().setDefaultSectionSize(video_table.verticalHeader().minimumSectionSize())
 
         video_table_scroll = QScrollArea(self.labeler)
         video_table_scroll.setWidgetResizable(True)
         video_table_scroll.setWidget(video_table)
 
-        return video_table, video_table_scroll
+        return video_table, video_model, video_table_scroll
 
-    def create_data_table(self) -> tuple[QTableWidget, QScrollArea]:
+    def create_data_table(self) -> tuple[LabelTableView, LabelTableModel, LabelFilterModel, QLineEdit, QScrollArea]:
         """
-        Here will be all the values, that are labeled as an overview
+        Here will be all the values, that are labeled as an overview. The view is backed by the LabelTableModel,
+        behind the LabelFilterModel of the filter bar above the table.
         """
-        data_table = QTableWidget(self.labeler)
-        data_table.setRowCount(0)
-        data_table.setColumnCount(5)
-        data_table.setHorizontalHeaderLabels(
-            ["STime", "ETime", "Type", "Label", "Vid"])
+        data_model = LabelTableModel(self.labeler)
+        data_filter = LabelFilterModel(data_model, self.labeler)
+        data_table = LabelTableView(self.labeler)
+        data_table.setModel(data_filter)
+        data_table.setItemDelegate(BackgroundDelegate(data_table))  # Labels active at the playhead
         data_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
 
-        # Create a scroll are for the table and set table widget as its widget
+        filter_bar = QLineEdit(self.labeler)
+        filter_bar.setPlaceholderText("Filter: label, type or video (label:, type:, vid:), time range 10-20")
+        filter_bar.setClearButtonEnabled(True)
+
+        # Create a scroll are for the filter bar and the table
+        data_table_widget = QWidget(self.labeler)
+        data_table_layout = QVBoxLayout(data_table_widget)
+        data_table_layout.setContentsMargins(0, 0, 0, 0)
+        data_table_layout.addWidget(filter_bar)
+        data_table_layout.addWidget(data_table)
         data_table_scroll = QScrollArea()
         data_table_scroll.setWidgetResizable(True)
-        data_table_scroll.setWidget(data_table)
-        return data_table, data_table_scroll
+        data_table_scroll.setWidget(data_table_widget)
+        return data_table, data_model, data_filter, filter_bar, data_table_scroll
 
     def create_second_column_video_layout(self) -> tuple[QWidget, QVBoxLayout]:
         """
-        Combining MPV-Player, Playing-Time, Video-Name and Time-Slider
+        Combining MPV-Player, Playing-Time, Video-Name, Filmstrip and Time-Slider
         within one column.
         """
         video_widget = QWidget(self.labeler)
@@ -427,20 +2013,24 @@ class Layout:
         video_layout.addWidget(self.video, stretch=10)
         video_layout.addWidget(self.playtime)
         video_layout.addWidget(self.now_playing)
+        video_layout.addWidget(self.filmstrip)
         video_layout.addWidget(self.time_slider)
         return video_widget, video_layout
 
-    def create_logger(self) -> tuple[QWidget, QScrollArea, QGridLayout]:
+    def create_logger(self) -> tuple[QListView, LogModel]:
         """
         The logging window, to get some feedback, what is going on.
         """
         # Will show the labels for every frame (ongoing, not done)
-        logger_widget = QWidget(self.labeler)
-        logger_scroller = QScrollArea()
-        logger_scroller.setWidgetResizable(True)
-        logger_grid = QGridLayout(logger_widget)
-        logger_scroller.setWidget(logger_widget)
-        return logger_widget, logger_scroller, logger_grid
+        log_model = LogModel(parent=self.labeler)
+        logger_view = QListView(self.labeler)
+        logger_view.setModel(log_model)
+        logger_view.setItemDelegate(LogDelegate(logger_view))
+        logger_view.setUniformItemSizes(True)  # Rows are not measured one by one
+        logger_view.setLayoutMode(QListView.Batched)  # Else every change lays out all the rows again
+        logger_view.setSelectionMode(QAbstractItemView.NoSelection)
+        logger_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        return logger_view, log_model
 
     def create_splitter(self) -> tuple[QSplitter, QSplitter]:
         """
@@ -450,7 +2040,7 @@ class Layout:
         # Add scroll_video_table to the first column
         splitter_v = QSplitter(Qt.Vertical)
         splitter_v.addWidget(self.video_table_scroll)
-        splitter_v.addWidget(self.logger_scroll)
+        splitter_v.addWidget(self.logger_view)
 
         splitter_h = QSplitter(Qt.Horizontal)
         splitter_h.addWidget(splitter_v)
@@ -488,15 +2078,28 @@ class Layout:
         time_slider.setMaximum(1000)
         time_slider.setTickPosition(QSlider.TicksBelow)
         time_slider.setSingleStep(1)
+        time_slider.setMouseTracking(True)  # Previews of the filmstrip while hovering
+        time_slider.setMinimumHeight(36)  # Room for the label overlay
         return time_slider
 
+    def set_time_slider_duration(self, duration: float):
+        """
+        The values of the time slider are milliseconds, so the range is adapted to the duration of the video. Ticks
+        are drawn every 5% of the video.
+        """
+        maximum = max(int(duration * 1000), 1)
+        if self.time_slider.maximum() != maximum:
+            self.time_slider.setMaximum(maximum)
+            self.time_slider.setTickInterval(max(maximum // 20, 1))
+            self.time_slider.setPageStep(max(maximum // 100, 1))
+
     def create_style(self):
         """
         Styling the app. Making it more visual-friendly
         """
         self.data_table.horizontalHeader().setStyleSheet("QHeaderView::section { padding: 1px; }")
         self.video_table.horizontalHeader().setStyleSheet("QHeaderView::section { padding: 1px; }")
-        self.logger_widget.setStyleSheet("color : #999999;")
+        self.logger_view.setStyleSheet("color : #999999;")
 
 
 class AppFunctions:
@@ -508,43 +2111,357 @@ class AppFunctions:
     def __init__(self, labeler_instance: Labeler):
         self.labeler = labeler_instance
         # Now you have access to all self objects from the Labeler instance
+        self.journals = {}  # One LabelJournal for every label file (path without extension as key)
+        self.label_format = "csv"  # "csv" or "npz", can be set within settings.json as "label_format"
+
+        # Loading csv files in chunks in the background
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="label-loader")
+        self.loading = False  # True, while a label file is loading
+        self.pending_labels = []  # Labels entered while loading, inserted afterwards
+        self._load_generation = 0  # Older loads are cancelled
+        self._load_future = None
+        self._loaded_chunks = queue.Queue()
+        self._load_log = None  # Id of the logger entry, that shows the progress
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="label-writer")
+        self.writes = []  # Writes that are not finished yet
+        self.history = LabelHistory(self.labeler)  # Undo/redo of the changes within the data-table
+
+        # Indexing the videos of the playlist in the background, changes within "videos" are watched
+        self.library = VideoLibrary()
+        self.indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video-indexer")
+        self.video_watcher = QFileSystemWatcher()
+        # noinspection PyUnresolvedReferences
+        self.video_watcher.directoryChanged.connect(self._video_folder_changed)
+        self._changed_video_folders = set()
+        self._indexing_stopped = False
+
+        # Stepping through a label across all videos (global label index within the library)
+        self.occurrence_label = None  # Label of the last next_occurrence() / previous_occurrence()
+        self.prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._prefetched = {}  # (label, video, backwards) -> Future of the next video with the label
+
+        # Prefetching the next video of the playlist, can be set within settings.json as "prefetch_next_video"
+        self.prefetch_next_video = False
+
+        self.hotkey_overview = None  # HotkeyOverview, created with the first plot_hotkeys()
+        self._prefetched_video = None  # (name of the video, Future of (stamp, store, replayed, label path))
+
+        # Frame timestamps of the opened videos, read in the background (cached within "frames")
+        self.frame_indexes = {}  # Name of the video -> FrameIndex (None, if there is no index)
+        self.frame_indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-indexer")
+        self.video_watcher_timer = QTimer()  # Many changes at once (copying videos) are indexed together
+        self.video_watcher_timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self.video_watcher_timer.timeout.connect(self._index_changed_video_folders)
+
+        # Autosave, can be set within settings.json as "autosave_interval" in seconds (0 is off)
+        self.autosave_interval = 30
+        self.autosave_timer = QTimer()
+        self.autosave_timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self.autosave_timer.timeout.connect(self.write_csv_data)
+        self._first_unsaved_change = None
 
     def sort_data_table(self):
         """
-        Will sort the data table by the first column (in this case StartTime)
+        Will sort the data table by Video, StartTime and EndTime (numerically and stable, labels with the same times
+        keep their order)
         """
-        self.labeler.data_table.sortByColumn(0, Qt.AscendingOrder)
+        self.finish_loading()
+        self.labeler.data_model.sort_by([4, 0, 1])
 
     def delete_selected_rows(self):
         """
         Will deleted selected row in the data tale
         """
-        selected_rows = self.labeler.data_table.selectedItems()
-        if selected_rows:
-            rows_to_delete = set()
-            for item in selected_rows:
-                rows_to_delete.add(item.row())
-            for row in sorted(rows_to_delete, reverse=True):
-                self.labeler.data_table.removeRow(row)
+        # The selection is read as ranges of rows, not cell by cell
+        selection = self.labeler.data_table.selectionModel().selection()
+        if not selection.isEmpty():
+            shown_rows = np.concatenate([np.arange(selection_range.top(), selection_range.bottom() + 1)
+                                         for selection_range in selection])
+            rows_to_delete = np.unique(self.labeler.data_filter.source_rows(shown_rows)).tolist()
+            store = self.labeler.data_model.store
+            label_ids = store.ids[rows_to_delete].tolist()
+            rows_data = store.rows_text(rows_to_delete)
+            open_windows = self.labeler.activity_handler.open_windows_of(label_ids)
+            self.history.record(("delete", rows_to_delete, rows_data, label_ids, open_windows))
+            self.labeler.activity_handler.forget_windows(label_ids)
+            self.labeler.data_model.remove_rows(rows_to_delete, rows_data)
         self.labeler.data_table_changed = True
 
-    def write_csv_data(self):
+    def next_label(self):
         """
-        Will write the data to csv. Loading the values from data_table and saving the video_name.csv.
+        Jumping to the start of the next label of the playing video.
         """
-        video_name_csv = self.labeler.video_name_playing.text()
-        video_name_csv = "_".join(video_name_csv.split(".")[:-1])
-        video_name_csv = video_name_csv.replace(" ", "_")
+        self._go_to_label(backwards=False)
 
-        if self.labeler.data_table_changed is True:
-            with open(f"data\\{video_name_csv}.csv", 'w', newline='') as csvfile:
-                csvwriter = csv.writer(csvfile, delimiter=";")
-                csvwriter.writerow(["STIME", "ETIME", "TYPE", "LABEL", "VID"])
-                self._csv_write_rows(csvwriter)
-            self.labeler.logger.logging_activity.append(["Saved", video_name_csv, "#0e1a40", "#0e1a40", "Format: CSV"])
-            self.labeler.logger.write_logger()
+    def previous_label(self):
+        """
+        Jumping to the start of the previous label of the playing video.
+        """
+        self._go_to_label(backwards=True)
+
+    def _go_to_label(self, backwards: bool):
+        """
+        Helper for next_label() and previous_label(). The label is found within the interval index (binary search),
+        selected within the data-table and sought exactly. The time position is set right away, so pressing the
+        hotkey again does not wait for mpv.
+        """
+        video_name = self.labeler.video_name_playing.text()
+        seconds = self.labeler.time_position
+        if seconds is None or self.labeler.player.duration is None:
+            return
+        store = self.labeler.data_model.store
+        # Labels start at the timestamp of their frame, seeking there may end up to half a millisecond before
+        found = self.labeler.activity_handler.intervals.next_start(
+            store, video_name, seconds - 0.001 if backwards else seconds + 0.001, backwards)
+        if found is None:
+            return
+        start, label_id = found
+        row = store.row_of(label_id)
+        index = self.labeler.data_filter.index_of_row(row)
+        if index.isValid():  # Else it does not match the filter
+            self.labeler.data_table.selectRow(index.row())
+            self.labeler.data_table.scrollTo(index, QAbstractItemView.EnsureVisible)
+        self.labeler.time_position = start
+        seek_time = self.snap_time(video_name, start, parse_frame(store.text(row, 5)))
+        self.labeler.player.pause = True
+        self.labeler.player.command_async("seek", f"{seek_time:.6f}", "absolute+exact")
+
+    def next_occurrence(self):
+        """
+        Jumping to the next label with the same name (label of the selected row), also within the other videos.
+        """
+        self._go_to_occurrence(backwards=False)
+
+    def previous_occurrence(self):
+        """
+        Jumping to the previous label with the same name (label of the selected row), also within the other videos.
+        """
+        self._go_to_occurrence(backwards=True)
+
+    def _go_to_occurrence(self, backwards: bool):
+        """
+        Helper for next_occurrence() and previous_occurrence(). The playing video is searched within the data-table
+        (also unsaved labels). After its last label, the next video with such a label is taken from the global label
+        index (prefetched in the background, while the user is looking at the current label) and opened at the label.
+        """
+        video_name = self.labeler.video_name_playing.text()
+        seconds = self.labeler.time_position
+        if seconds is None or video_name == "No Video Playing":
+            return
+        self.finish_loading()
+        store = self.labeler.data_model.store
+        index = self.labeler.data_table.currentIndex()
+        if index.isValid():
+            self.occurrence_label = store.text(self.labeler.data_filter.mapToSource(index).row(), 3)
+        label = self.occurrence_label
+        if label is None:
+            return
+        row = store.find_next(label, video_name, seconds, backwards)
+        if row is None:
+            found = self._next_video_with_label(label, video_name, backwards)
+            if found is None:  # No other video, so starting again within the playing video
+                row = store.find_next(label, video_name, math.inf if backwards else -math.inf, backwards)
+            else:
+                next_video, start, frame = found
+                self.open_video(next_video, self.snap_time(next_video, start, frame))
+                self.labeler.time_position = start
+                self._prefetch_occurrence(label, next_video, backwards)
+                return
+        if row is None:
+            return
+        start = float(store.stime[row])
+        index = self.labeler.data_filter.index_of_row(row)
+        if index.isValid():  # Else it does not match the filter
+            self.labeler.data_table.selectRow(index.row())
+            self.labeler.data_table.scrollTo(index, QAbstractItemView.EnsureVisible)
+        self.labeler.time_position = start
+        seek_time = self.snap_time(video_name, start, int(store.sframe[row]))
+        self.labeler.player.pause = True
+        self.labeler.player.command_async("seek", f"{seek_time:.6f}", "absolute+exact")
+        self._prefetch_occurrence(label, video_name, backwards)
+
+    def _next_video_with_label(self, label: str, video_name: str, backwards: bool) -> Optional[tuple]:
+        """
+        Helper to take the next video with the label from the prefetch, or to look it up right away.
+        """
+        future = self._prefetched.pop((label, video_name, backwards), None)
+        if future is not None and future.exception() is None:
+            return future.result()
+        return self.library.next_label(label, video_name, backwards)
+
+    def _prefetch_occurrence(self, label: str, video_name: str, backwards: bool):
+        """
+        Helper to look up the next video with the label in the background and to load its frame index, so the next
+        jump to another video only has to open it.
+        """
+        key = (label, video_name, backwards)
+        if key in self._prefetched:
+            return
+        future = self.prefetcher.submit(self.library.next_label, label, video_name, backwards)
+        self._prefetched = {key: future}  # Only the next jump is prefetched
+        future.add_done_callback(self._occurrence_prefetched)
+
+    def _occurrence_prefetched(self, future: Future):
+        if future.exception() is None and future.result() is not None:
+            next_video = future.result()[0]
+            # noinspection PyUnresolvedReferences
+            self.labeler.gui_call.emit(lambda: self.load_frame_index(next_video))
+
+    def open_video(self, video_name: str, start_time: float = None):
+        """
+        Opening a video (paused) with its labels. The labels of the playing video are saved before. With start_time
+        mpv starts the video at this time.
+        """
+        if self.labeler.video_name_playing.text() != "No Video Playing":
+            self.write_csv_data()
+
+        self.labeler.player.keep_open = "yes"
+        if start_time is None:
+            self.labeler.player.play(f'videos/{video_name}')
+        else:
+            self.labeler.player.loadfile(f'videos/{video_name}', start=f"{start_time:.6f}")
+        self.labeler.player.pause = True
+        self.labeler.video_name_playing.setText(video_name)
+        self.load_frame_index(video_name)
+        self.labeler.filmstrip.set_video(video_name)
+        self.labeler.label_overlay.set_video(video_name)
+        self.load_csv_data(video_name)
+        if self.prefetch_next_video:
+            self._prefetch_video(self._next_video_name(video_name))
+
+    def next_video(self):
+        """
+        Opening the next video of the playlist (instant with "prefetch_next_video").
+        """
+        next_name = self._next_video_name(self.labeler.video_name_playing.text())
+        if next_name is None:
+            return
+        index = self.labeler.video_model.index(self.labeler.video_model.rows[next_name], 0)
+        self.labeler.video_table.setCurrentIndex(index)
+        self.labeler.video_table.scrollTo(index, QAbstractItemView.EnsureVisible)
+        self.open_video(next_name)
+
+    def _next_video_name(self, video_name: str) -> Optional[str]:
+        """
+        Helper for the video after video_name within the playlist, the first one if no video of the playlist is
+        playing. None after the last video.
+        """
+        row = self.labeler.video_model.rows.get(video_name, -1) + 1
+        return self.labeler.video_model.name(row) if row < self.labeler.video_model.rowCount() else None
+
+    def _prefetch_video(self, video_name: Optional[str]):
+        """
+        Prefetching a video in the background: the start and end of the file are read into the page cache (mpv
+        opens it without waiting for the disk), the frame index is loaded and the label file is parsed with its
+        journal. load_csv_data() takes the parsed labels, if the label file did not change since.
+        """
+        if video_name is None or (self._prefetched_video is not None and self._prefetched_video[0] == video_name):
+            return
+        journal = self._journal(video_name)
+        self._prefetched_video = (video_name, self.prefetcher.submit(self._prefetch_video_files, video_name, journal,
+                                                                     self.label_format))
+        self.load_frame_index(video_name)
+
+    @staticmethod
+    def _prefetch_video_files(video_name: str, journal: LabelJournal, label_format: str) -> tuple:
+        """
+        Helper running in the background, see _prefetch_video().
+        """
+        stamp = journal.stamp(label_format)
+        store, replayed, _offset = journal.load(label_format)
+        warm_file(os.path.join("videos", video_name))
+        return stamp, store, replayed, journal.existing_path(label_format)
+
+    def _take_prefetched_video(self, video_name: str, journal: LabelJournal) -> Optional[tuple]:
+        """
+        Helper to take the prefetched labels of a video, (store, replayed, label path). None if the video was not
+        prefetched (or not yet), or its label file changed since.
+        """
+        prefetched, self._prefetched_video = self._prefetched_video, None
+        if prefetched is None or prefetched[0] != video_name:
+            return None
+        future = prefetched[1]
+        if not future.done() or future.exception() is not None:
+            return None
+        stamp, store, replayed, label_path = future.result()
+        if stamp != journal.stamp(self.label_format):
+            return None
+        return store, replayed, label_path
+
+    def undo(self):
+        """
+        Reverting the last change within the data-table (insert, closing a time_window or delete).
+        """
+        self._undo_redo(self.history.undo, "Undo")
+
+    def redo(self):
+        """
+        Applying the last reverted change again.
+        """
+        self._undo_redo(self.history.redo, "Redo")
+
+    def _undo_redo(self, function: Callable, logg_type: str):
+        """
+        Helper for undo() and redo(), writing into the logger.
+        """
+        self.finish_loading()
+        change = function()
+        if change is None:
+            self.labeler.logger.append_logging(logg_type, "Nothing to do", ignore_if_tracked=True)
+            return
+        self.labeler.data_table_changed = True
+        label_ids = change[3] if change[0] == "delete" else [change[1]]
+        self.labeler.logger.append_logging(logg_type, change[0], text_2=f"{len(label_ids)} rows")
+
+    def write_csv_data(self):
+        """
+        Will write the data to csv (or npz, see "label_format" in settings.json). All changes are already inside
+        the journal of the label file, so the journal is only compacted into data/video_name.csv. This is done in
+        the background.
+        """
+        if self.loading and (self.pending_labels or self.labeler.data_table_changed):
+            self.finish_loading()  # Only the whole table can be saved
+        self.autosave_timer.stop()
+        self._first_unsaved_change = None
+        journal = self.labeler.data_model.journal
+        if self.loading:
+            return
+        if self.labeler.data_table_changed is True and journal is not None:
+            store = self.labeler.data_model.store
+            store.detach()  # The label file can only be replaced, if it is not memory-mapped anymore
+            video_name_csv = os.path.basename(journal.base_path)
+            label_count = len(store)
+            label_path = journal.label_path(self.label_format)
+            self._submit_write(journal.compact, store.copy(), journal.offset(), self.label_format,
+                               on_done=lambda _result: self._saved(video_name_csv, label_count, label_path))
+            self.labeler.logger.append_logging("Saved", video_name_csv, "#0e1a40", "#0e1a40",
+                                               f"Format: {self.label_format.upper()}")
             self.labeler.data_table_changed = False
 
+    def _saved(self, video_name_csv: str, label_count: int, label_path: str):
+        """
+        Helper after a label file is written. Updating the playlist and the global label index.
+        """
+        self.labeler.video_model.set_label_count(video_name_csv, label_count)
+        self.indexer.submit(self.library.index_label_file, label_path)
+        self._prefetched.clear()
+
+    def schedule_autosave(self):
+        """
+        Debounced autosave. The data is written autosave_interval seconds after the last change, but not later than
+        twice the autosave_interval after the first unsaved change. So labeling without a break is still saved.
+        """
+        if self.autosave_interval <= 0:
+            return
+        now = time.monotonic()
+        if self._first_unsaved_change is None:
+            self._first_unsaved_change = now
+        remaining = 2 * self.autosave_interval - (now - self._first_unsaved_change)
+        delay = max(0.0, min(self.autosave_interval, remaining))
+        self.autosave_timer.start(int(delay * 1000))
+
     def save_csv(self):
         """
         Is needed to hard-save the csv file. It saves the csv file even the table is not changed. Where write_csv_data()
@@ -553,77 +2470,316 @@ class AppFunctions:
         self.labeler.data_table_changed = True
         self.write_csv_data()
 
-    def _csv_write_rows(self, csvwriter: csv.writer):
+    def load_csv_data(self, video_name: str = None):
         """
-        Helper to write the rows to the csv file
+        If there are any safed files for the loaded video. It will open the csv file and convert it into the
+        data_table. So you can switch between videos and still have the actual data. Changes inside the journal,
+        which are not saved yet (for example after a crash), are replayed. A csv file is parsed in chunks in the
+        background, the first rows are shown right away.
+        """
+        if video_name is None:
+            video_name = self.labeler.video_model.name(self.labeler.video_table.currentIndex().row())
+        journal = self._journal(video_name)
+        self._load_generation += 1  # Cancel a load, that is still running
+        self.labeler.activity_handler.clear()  # Label ids and changes are only valid for the loaded label file
+        self.history.clear()
+        self.loading = False
+        prefetched = self._take_prefetched_video(video_name, journal)
+        if prefetched is not None:
+            store, replayed, label_path = prefetched
+            self.labeler.data_model.set_store(store, journal)
+            self._log_loaded(label_path, replayed)
+            return
+        label_path = journal.existing_path(self.label_format)
+        if label_path is None or label_path.endswith(".npz"):
+            # Nothing to load or memory-mapped (instant), no need to load in chunks
+            store, replayed, _offset = journal.load(self.label_format)
+            self.labeler.data_model.set_store(store, journal)
+            self._log_loaded(label_path, replayed)
+            return
+
+        self.labeler.data_model.set_store(LabelStore(), journal)
+        self.loading = True
+        self._loaded_chunks = queue.Queue()
+        self._load_log = None
+        self._load_future = self.loader.submit(self._load_csv_chunks, journal, label_path, self._load_generation,
+                                               self._loaded_chunks)
+
+    def _load_csv_chunks(self, journal: LabelJournal, label_path: str, generation: int, chunks: queue.Queue):
+        """
+        Helper running in the background. Parsing the csv file in chunks and handing them to the GUI thread.
+        """
+        content, journal_content = journal.read(label_path)
+        total = max(content.count(b"\n") - 1, 0)
+        for chunk, rows in iter_csv_chunks(content):
+            if generation != self._load_generation:
+                return
+            chunks.put((chunk, rows, total))
+            # noinspection PyUnresolvedReferences
+            self.labeler.gui_call.emit(lambda: self._add_loaded_chunks(generation, chunks))
+        chunks.put((label_path, journal_content, zlib.crc32(content)))
+        # noinspection PyUnresolvedReferences
+        self.labeler.gui_call.emit(lambda: self._add_loaded_chunks(generation, chunks))
+
+    def _add_loaded_chunks(self, generation: int, chunks: queue.Queue):
+        """
+        Helper to add the parsed chunks to the data-table and to report the progress within the logger.
+        """
+        if generation != self._load_generation or not self.loading:
+            return
+        rows, total = None, 0
+        while not chunks.empty():
+            item = chunks.get()
+            if isinstance(item[0], LabelStore):
+                chunk, rows, total = item
+                self.labeler.data_model.extend_store(chunk)
+                continue
+            label_path, journal_content, crc = item
+            replayed = LabelJournal.replay(self.labeler.data_model.store, journal_content, lambda: crc)
+            if replayed:
+                self.labeler.data_model.refresh()
+            self.loading = False
+            self._log_loaded(label_path, replayed)
+            self._insert_pending_labels()
+            return
+        if rows is not None:
+            video_name_csv = os.path.basename(self.labeler.data_model.journal.base_path)
+            progress = f"{rows}/{total} rows"
+            if self._load_log is None:
+                self._load_log = self.labeler.logger.append_logging("Loaded", video_name_csv, "#0e1a40", "#0e1a40",
+                                                                    progress)
+            else:
+                self.labeler.logger.update_logging(self._load_log, "Loaded", video_name_csv, progress)
+
+    def finish_loading(self):
         """
-        for data_table_row in range(self.labeler.data_table.rowCount()):
-            row_data = []
-            for column in range(self.labeler.data_table.columnCount()):
-                row_column_item = self.labeler.data_table.item(data_table_row, column)
-                if row_column_item is not None:
-                    row_data.append(row_column_item.text())
-                else:
-                    row_data.append("")
-            csvwriter.writerow(row_data)
+        Waiting until the label file is loaded completely. Needed before the whole table is saved or sorted.
+        """
+        if self.loading and self._load_future is not None:
+            self._load_future.result()
+            self._add_loaded_chunks(self._load_generation, self._loaded_chunks)
 
-    def load_csv_data(self):
+    def _insert_pending_labels(self):
         """
-        If there are any safed files for the loaded video. It will open the csv file and convert it into the
-        data_table. So you can switch between videos and still have the actual data.
+        Inserting the labels that were entered while loading.
         """
-        row = self.labeler.video_table.currentRow()
-        video_name = self.labeler.video_table.item(row, 0).text()
-        video_name_csv = "_".join(video_name.split(".")[:-1])
-        video_name_csv = video_name_csv.replace(" ", "_")
-        try:
-            with open(f"data\\{video_name_csv}.csv", 'r', newline='') as csvfile:
-                csvreader = csv.reader(csvfile, delimiter=";")
-                next(csvreader)
-                self._csv_load_rows(csvreader)
-            self.labeler.logger.logging_activity.append(["Loaded", video_name_csv, "#0e1a40", "#0e1a40", "Format: CSV"])
-            self.labeler.logger.write_logger()
-        except FileNotFoundError:
-            self.labeler.data_table.setRowCount(0)  # Clear existing rows
-
-    def _csv_load_rows(self, csvreader: Iterator[List[str]]):
-        """
-        Helper to load the rows from the csv file.
-        """
-        self.labeler.data_table.setRowCount(0)  # Clear existing rows
-        for row_data in csvreader:
-            row = self.labeler.data_table.rowCount()
-            self.labeler.data_table.insertRow(row)
-            for column, data in enumerate(row_data):
-                item = QTableWidgetItem(data)
-                self.labeler.data_table.setItem(row, column, item)
+        pending_labels, self.pending_labels = self.pending_labels, []
+        for data_to_insert, act_types, shortcut_keys in pending_labels:
+            self.labeler.insert_label(data_to_insert, act_types, shortcut_keys)
+
+    def _log_loaded(self, label_path: str or None, replayed: int):
+        """
+        Helper to write into the logger, after a label file is loaded.
+        """
+        video_name_csv = os.path.basename(self.labeler.data_model.journal.base_path)
+        if label_path is not None:
+            label_format = os.path.splitext(label_path)[1][1:]
+            text = f"Format: {label_format.upper()} ({len(self.labeler.data_model.store)} rows)"
+            if self._load_log is not None:
+                self.labeler.logger.update_logging(self._load_log, "Loaded", video_name_csv, text)
+            else:
+                self.labeler.logger.append_logging("Loaded", video_name_csv, "#0e1a40", "#0e1a40", text)
+        if replayed:
+            self.labeler.logger.append_logging("Loaded", video_name_csv, "#0e1a40", "#0e1a40",
+                                               f"{replayed} unsaved changes from journal")
+        self.labeler.data_table_changed = replayed > 0 or bool(self.pending_labels)
+        self._load_log = None
+
+    def recover_journals(self):
+        """
+        Journals, which are still inside "data" (app crashed before saving), are replayed and compacted into
+        their csv files in the background.
+        """
+        for file_name in os.listdir("data"):
+            if file_name.endswith(".journal"):
+                base_path = os.path.join("data", file_name[:-len(".journal")])
+                journal = self.journals.setdefault(base_path, LabelJournal(base_path))
+                self._submit_write(self._recover_journal, journal, self.label_format,
+                                   on_done=lambda replayed, name=file_name: self._log_recovered(name, replayed))
+
+    def _log_recovered(self, file_name: str, replayed: int):
+        self.labeler.logger.append_logging("Saved", file_name, "#0e1a40", "#0e1a40", f"Recovered {replayed} changes")
+
+    @staticmethod
+    def _recover_journal(journal: LabelJournal, label_format: str) -> int:
+        """
+        Helper to replay a journal and to write the result into the label file.
+        """
+        store, replayed, offset = journal.load(label_format)
+        journal.compact(store, offset, label_format)
+        return replayed
+
+    def _journal(self, video_name: str) -> LabelJournal:
+        """
+        Helper to get the journal of the label file of a video.
+        """
+        base_path = os.path.join("data", label_file_name(video_name))
+        if base_path not in self.journals:
+            self.journals[base_path] = LabelJournal(base_path)
+        return self.journals[base_path]
+
+    def _submit_write(self, function: Callable, *args, on_done: Callable = None) -> Future:
+        """
+        Helper to run a write in the background. on_done is called with the result within the GUI thread.
+        """
+        future = self.writer.submit(function, *args)
+        self.writes.append(future)
+        # noinspection PyUnresolvedReferences
+        future.add_done_callback(lambda done: self.labeler.gui_call.emit(lambda: self._write_done(done, on_done)))
+        return future
+
+    def _write_done(self, future: Future, on_done: Callable = None):
+        if future in self.writes:
+            self.writes.remove(future)
+        if future.exception() is not None:
+            self.labeler.logger.append_logging(text=f"ERROR while writing: {future.exception()}",
+                                               bg_color="#400000", border_color="#400000")
+        elif on_done is not None:
+            on_done(future.result())
+
+    def wait_for_writes(self):
+        """
+        Blocking until the writes, which are already running in the background, are finished.
+        """
+        wait(list(self.writes))
 
     def update_video_table(self):
         """
-        Will create the playlist as a table, so all the videos in the "videos" directory will be shown as a table.
-        Disable edits for column 0 (Video).
+        Will create the playlist as a table, so all the videos in the "videos" directory (also sub-folders) will be
+        shown as a table. The cached videos are shown right away, the folder is indexed in the background
+        (duration, fps, resolution and number of labels). Afterwards, changes within "videos" are indexed
+        automatically.
+        """
+        if self.labeler.video_model.rowCount() == 0:
+            self.labeler.video_model.set_videos(self.library.cached())
+        self._index_video_folders([""])
+        self.indexer.submit(self.library.index_labels)  # Only new or changed label files are read
+
+    def _video_folder_changed(self, path: str):
+        folder = os.path.relpath(path, self.library.video_folder)
+        self._changed_video_folders.add("" if folder == "." else folder)
+        self.video_watcher_timer.start(500)
+
+    def _index_changed_video_folders(self):
+        folders, self._changed_video_folders = sorted(self._changed_video_folders), set()
+        self._index_video_folders(folders)
+
+    def _index_video_folders(self, folders: List[str]):
+        """
+        Helper to index folders of "videos" (recursive) in the background.
+        """
+        self.indexer.submit(self._index_videos, folders)
+
+    def _index_videos(self, folders: List[str]):
+        """
+        Helper running in the background. Walking the folders, handing the metadata to the GUI thread in batches
+        and removing videos, which are not there anymore.
+        """
+        for folder in folders:
+            if self._indexing_stopped:
+                return
+            names, directories = self.library.walk(folder)
+            # noinspection PyUnresolvedReferences
+            self.labeler.gui_call.emit(lambda paths=directories: self._watch_video_folders(paths))
+            for infos in self.library.scan(names):
+                if self._indexing_stopped:
+                    return
+                # noinspection PyUnresolvedReferences
+                self.labeler.gui_call.emit(lambda videos=infos: self.labeler.video_model.update_videos(videos))
+            # noinspection PyUnresolvedReferences
+            self.labeler.gui_call.emit(lambda prefix=folder, found=set(names): self._remove_missing_videos(prefix,
+                                                                                                           found))
+
+    def stop_indexing(self):
+        """
+        Stopping the indexer after the current batch, so closing the app does not wait for a whole scan.
         """
+        self._indexing_stopped = True
+        self.video_watcher_timer.stop()
 
-        videos = os.listdir("videos")
-        self.labeler.video_table.setRowCount(0)
-        for idx, video in enumerate(videos):
-            current_row_count = self.labeler.video_table.rowCount()
-            self.labeler.video_table.setRowCount(current_row_count + 1)
-            self.labeler.video_table.setItem(current_row_count, 0, QTableWidgetItem(video))
+    def _watch_video_folders(self, paths: List[str]):
+        watched = set(self.video_watcher.directories())
+        new_paths = [path for path in paths if path not in watched]
+        if new_paths:
+            self.video_watcher.addPaths(new_paths)
+
+    def _remove_missing_videos(self, folder: str, found: set):
+        """
+        Helper to remove the videos of a folder from the playlist (and the cache), which were not found anymore.
+        """
+        prefix = folder.replace(os.sep, "/") + "/" if folder else ""
+        missing = [info.name for info in self.labeler.video_model.videos
+                   if info.name.startswith(prefix) and info.name not in found]
+        if missing:
+            self.labeler.video_model.remove_videos(missing)
+            self.indexer.submit(self.library.remove, missing)
+
+    def load_frame_index(self, video_name: str):
+        """
+        Loading the frame index of a video in the background. Until it is loaded, labels get no frame numbers and
+        seeks are not snapped to frames.
+        """
+        if video_name in self.frame_indexes:
+            return
+        self.frame_indexes[video_name] = None
+        cache_path = os.path.join(FRAME_FOLDER, label_file_name(video_name) + ".npz")
+        future = self.frame_indexer.submit(load_frame_index, os.path.join("videos", video_name), cache_path)
+        # noinspection PyUnresolvedReferences
+        future.add_done_callback(lambda done: self.labeler.gui_call.emit(
+            lambda: self._frame_index_loaded(video_name, done)))
+
+    def _frame_index_loaded(self, video_name: str, future: Future):
+        if future.exception() is not None:
+            self.labeler.logger.append_logging(text=f"ERROR while reading frames: {future.exception()}",
+                                               bg_color="#400000", border_color="#400000", ignore_if_tracked=True)
+        elif future.result() is not None:
+            self.frame_indexes[video_name] = future.result()
+            self.labeler.logger.append_logging("Loaded", video_name, "#0e1a40", "#0e1a40",
+                                               f"{len(future.result())} frames")
+
+    def frame_text(self, video_name: str, time_text: str) -> str:
+        """
+        Frame number (text) shown at the time, empty if the frame index of the video is not loaded.
+        """
+        frame_index = self.frame_indexes.get(video_name)
+        seconds = parse_time(time_text)
+        if frame_index is None or seconds != seconds:  # NaN
+            return ""
+        return str(frame_index.frame_at(seconds))
+
+    def snap_time(self, video_name: str, seconds: float, frame: int = -1) -> float:
+        """
+        Exact start of a frame, to seek to. The frame is used if known, otherwise the frame shown at seconds
+        (binary search). Without frame index, seconds is returned as it is.
+        """
+        frame_index = self.frame_indexes.get(video_name)
+        if frame_index is None:
+            return seconds
+        return frame_index.time_of(frame) if frame >= 0 else frame_index.snap(seconds)
 
     def plot_hotkeys(self):
         """
-        To get access to plot hotkeys within settings.json. Important to know here. It will also open the plotted
-        hotkeys and write it into the logger.
+        To get access to the hotkey overview within settings.json. Shows all hotkeys of the .json files within the
+        app, duplicated hotkeys are marked red. Only loaded again, if one of the files changed.
         """
-        HotkeyPlotter().load_and_plot()
-        os.startfile("Hotkeys.png")
-        self.labeler.logger.logging_activity.append(["Saved",
-                                                     "Hotkeys.png",
-                                                     "#0e1a40",
-                                                     "#0e1a40",
-                                                     "\nIF CHANGE .json -> RESTART APP"])
-        self.labeler.logger.write_logger()
+        if self.hotkey_overview is None:
+            self.hotkey_overview = HotkeyOverview(self.labeler)
+        if self.hotkey_overview.refresh():
+            duplicated = sum(hotkey.duplicated for hotkey in self.hotkey_overview.hotkeys)
+            self.labeler.logger.append_logging("Loaded", "Hotkeys", "#0e1a40", "#0e1a40",
+                                               f"{duplicated} duplicated")
+        self.hotkey_overview.show()
+        self.hotkey_overview.raise_()
+
+    def export_hotkeys(self):
+        """
+        Exporting the hotkey overview as Hotkeys.svg and Hotkeys.png (only if the .json files changed since).
+        """
+        if self.hotkey_overview is None:
+            self.hotkey_overview = HotkeyOverview(self.labeler)
+        written = self.hotkey_overview.export()
+        self.labeler.logger.append_logging("Saved", ", ".join(written) or "Hotkeys.svg, Hotkeys.png", "#0e1a40",
+                                           "#0e1a40", "" if written else "Unchanged")
 
 
 class MouseEventHandler:
@@ -636,100 +2792,162 @@ class MouseEventHandler:
         self.labeler = labeler_instance
         # Now you have access to all self objects from the Labeler instance
 
+        # Scrubbing with the time slider
+        self._scrub_target = None  # Newest position (seconds), that is not sought yet
+        self._scrub_position = None  # (x, value) of the last mouse event, for the slow scrubbing with Shift
+        self._seek_in_flight = False
+
     def close_app(self, event: QCloseEvent):
         """
         Custom close event. If data-table was changed it will ask the user, if he wants to save the actual
-        data-table. Save, Discard or Cancel possible.
+        data-table. Save, Discard or Cancel possible. With the autosave, Discard only drops the changes since the
+        last autosave (the autosaved labels are inside the label file already).
         """
         if self.labeler.data_table_changed is True:
-            reply = QMessageBox.question(self.labeler, 'Message',
-                                         "Do you want to save changes?",
+            question = "Do you want to save changes?"
+            if self.labeler.app_functions.autosave_interval > 0:
+                question = ("Do you want to save the changes since the last autosave?\n"
+                            "Discard only drops these changes, the labels saved by the autosave are kept.")
+            reply = QMessageBox.question(self.labeler, 'Message', question,
                                          QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel,
                                          QMessageBox.Save)
             if reply == QMessageBox.Save:
                 video_name_csv = self.labeler.video_name_playing.text()
                 if video_name_csv != "No Video Playing":
                     self.labeler.app_functions.save_csv()
+                self.labeler.app_functions.wait_for_writes()
                 event.accept()  # Close the window
             elif reply == QMessageBox.Discard:
+                self.labeler.app_functions.wait_for_writes()
+                if self.labeler.data_model.journal is not None:
+                    self.labeler.data_model.journal.discard()  # Unsaved changes are inside the journal
                 event.accept()  # Close the window
             else:
                 event.ignore()  # Keep the window open
+        else:
+            self.labeler.app_functions.wait_for_writes()
+        if event.isAccepted():
+            self.labeler.app_functions.stop_indexing()
+            self.labeler.filmstrip.stop()
 
-    def video_table_click(self, item: QTableWidgetItem):
+    def video_table_click(self, index: QModelIndex):
         """
         Starting and playing a video, by clicking on the row of the video in the table (play_list)
         """
-        row = item.row()
-        video_name = self.labeler.video_table.item(row, 0).text()
-
-        video_name_csv = self.labeler.video_name_playing.text()
-        if video_name_csv != "No Video Playing":
-            self.labeler.app_functions.write_csv_data()
+        self.labeler.app_functions.open_video(self.labeler.video_model.name(index.row()))
 
-        self.labeler.player.keep_open = "yes"
-        self.labeler.player.play(f'videos/{video_name}')
-        self.labeler.player.pause = True
-        self.labeler.observe_time_position()
-        self.labeler.video_name_playing.setText(video_name)
-
-        # self.labeler.close_event()
-        self.labeler.app_functions.load_csv_data()
-        self.labeler.data_table_changed = False
-
-    def data_table_click(self, item: QTableWidgetItem):
+    def data_table_click(self, index: QModelIndex):
         """
         Handling a row click on the populated data table. If row StartTime is selected, it will go to the
         video with the StartTime. If EndTime, it will go there. If something else. It will go to StartTime
-        """
-        row = item.row()
-        column = item.column()
-        if column == 0 or column == 1:
-            start_time = self.labeler.data_table.item(row, column).text()
-            if start_time == "WAIT...":
-                start_time = self.labeler.data_table.item(row, 0).text()
-        else:
-            start_time = self.labeler.data_table.item(row, 0).text()
-
-        video_name = self.labeler.data_table.item(row, 4).text()
-        self.labeler.player.keep_open = "yes"
-        self.labeler.player.play(f'videos/{video_name}')
-        self.labeler.player.wait_for_property('seekable')
-        self.labeler.player.seek(start_time, "absolute", "exact")
+        If the video is already loaded, it only seeks. Otherwise, the video is loaded and started at the time
+        by mpv itself. Nothing is waiting for mpv, so jumping between labels does not block the app.
+        With a frame index, the seek goes exactly to the start of the frame (SFrame/EFrame of the label).
+        """
+        index = self.labeler.data_filter.mapToSource(index)  # Row of the store, also if the table is filtered
+        row = index.row()
+        column = index.column()
+        time_column = 1 if column in (1, 6) and self.labeler.data_model.text(row, 1) != WAIT else 0
+        start_time = self.labeler.data_model.text(row, time_column)
+        frame = parse_frame(self.labeler.data_model.text(row, 5 + time_column))
+
+        video_name = self.labeler.data_model.text(row, 4)
+        start_time = f"{self.labeler.app_functions.snap_time(video_name, parse_time(start_time), frame):.6f}"
         self.labeler.player.pause = True
-        self.labeler.observe_time_position()
-        self.labeler.video_name_playing.setText(video_name)
+        if video_name == self.labeler.video_name_playing.text():
+            self.labeler.player.command_async("seek", start_time, "absolute+exact")
+        else:
+            self.labeler.player.keep_open = "yes"
+            self.labeler.player.loadfile(f'videos/{video_name}', start=start_time)
+            self.labeler.video_name_playing.setText(video_name)
+            self.labeler.app_functions.load_frame_index(video_name)
+            self.labeler.filmstrip.set_video(video_name)
+        self.labeler.label_overlay.set_video(video_name)
 
-    def slider_move(self, event):
+    def slider_press(self, event):
         """
         Handling the slider mouse press event. So it acts like a normal slider for a video.
-        For example, you can add self.player.pause = False at the end, and it will play the video
+        For example, you can add self.player.pause = False to slider_release(), and it will play the video
         after releasing the mouse. So some settings for the slider can be done here.
         """
         self.labeler.player.pause = True
-        click_pos = event.pos().x()
-        value = QStyle.sliderValueFromPosition(
-            self.labeler.time_slider.minimum(),
-            self.labeler.time_slider.maximum(),
-            click_pos,
-            self.labeler.time_slider.width()
-        )
-        self.labeler.time_slider.setValue(value)
-        # noinspection PyUnresolvedReferences
-        self.labeler.time_slider.valueChanged.emit(value)
-        try:
-            seek_time = self.labeler.time_slider.value() / 1000 * self.labeler.player.duration
-        except Exception as e:
-            seek_time = 0
+        self.labeler.time_slider.setSliderDown(True)  # The playing video is not moving the slider anymore
+        self._scrub_position = None
+        self.slider_move(event)
+
+    def slider_move(self, event):
+        """
+        Scrubbing while the slider is dragged. Only fast seeks to keyframes, and only one at a time. If the mouse is
+        moved while mpv is still seeking, only the newest position is sought afterwards. Holding Shift moves the
+        slider ten times slower than the mouse, for precise scrubbing also within long videos.
+        Without a pressed button (hovering), only the thumbnail of the position is shown.
+        """
+        if not event.buttons() & Qt.LeftButton:
+            slider = self.labeler.time_slider
+            value = QStyle.sliderValueFromPosition(slider.minimum(), slider.maximum(), event.pos().x(), slider.width())
+            self.labeler.filmstrip.preview(event.globalPos(), value / 1000)
+            return
+        if self.labeler.player.duration is None:
             self.labeler.logger.append_logging(
                 logg_type="Information",
-                text=f"ERROR probably corrupted VIDEO: {e}",
+                text="ERROR probably corrupted VIDEO: no duration",
                 bg_color="#400000",
                 border_color="#400000",
                 ignore_if_tracked=True
             )
+            return
+        self.labeler.layout.set_time_slider_duration(self.labeler.player.duration)
+        value = self._slider_value(event)
+        self.labeler.time_slider.setValue(value)
+        # noinspection PyUnresolvedReferences
+        self.labeler.time_slider.valueChanged.emit(value)
+        self._scrub_target = value / 1000
+        if not self._seek_in_flight:
+            self._scrub_seek()
+
+    def slider_release(self, event):
+        """
+        Seeking exactly to the position of the slider (start of the frame), after scrubbing.
+        """
+        self.labeler.time_slider.setSliderDown(False)
+        self._scrub_target = None
+        if self.labeler.player.duration is not None:
+            seek_time = self.labeler.app_functions.snap_time(self.labeler.video_name_playing.text(),
+                                                             self.labeler.time_slider.value() / 1000)
+            self.labeler.player.command_async("seek", seek_time, "absolute+exact")
+
+    def _slider_value(self, event) -> int:
+        """
+        Helper to get the value (milliseconds) of the slider at the mouse position. With Shift only the movement of
+        the mouse is used (ten times slower).
+        """
+        slider = self.labeler.time_slider
+        x = event.pos().x()
+        if event.modifiers() & Qt.ShiftModifier and self._scrub_position is not None:
+            last_x, last_value = self._scrub_position
+            milliseconds_per_pixel = (slider.maximum() - slider.minimum()) / max(slider.width(), 1)
+            value = int(last_value + (x - last_x) * milliseconds_per_pixel / 10)
+            value = min(max(value, slider.minimum()), slider.maximum())
+        else:
+            value = QStyle.sliderValueFromPosition(slider.minimum(), slider.maximum(), x, slider.width())
+        self._scrub_position = (x, value)
+        return value
 
-        self.labeler.player.command('seek', seek_time, 'absolute')
+    def _scrub_seek(self):
+        """
+        Helper to seek to the newest scrub position, the reply of mpv is handled by _scrub_done().
+        """
+        seek_time, self._scrub_target = self._scrub_target, None
+        self._seek_in_flight = True
+        # noinspection PyUnresolvedReferences
+        self.labeler.player.command_async(
+            "seek", seek_time, "absolute+keyframes",
+            callback=lambda _error, _result: self.labeler.gui_call.emit(self._scrub_done))
+
+    def _scrub_done(self):
+        self._seek_in_flight = False
+        if self._scrub_target is not None:
+            self._scrub_seek()
 
     def splitter_click(self):
         """
@@ -737,8 +2955,8 @@ class MouseEventHandler:
         """
         video_table_size = int(self.labeler.splitter_h.sizes()[0] * 0.8)
         data_table_size = int(self.labeler.splitter_h.sizes()[2] * 0.95)
-        columns_videos = self.labeler.video_table.columnCount()
-        columns_data = self.labeler.data_table.columnCount()
+        columns_videos = self.labeler.video_model.columnCount()
+        columns_data = self.labeler.data_model.columnCount()
         video_table_size = video_table_size // columns_videos
         data_table_size = data_table_size // columns_data
         for column in range(columns_videos):
@@ -750,45 +2968,29 @@ class MouseEventHandler:
 class Logger:
     """
     This class is creating some logging to inform the user what happens. The most important cases are
-    handled here and will be written into the Logging window within the app.
+    handled here and will be written into the Logging window within the app. The entries are kept by the
+    LogModel (ring buffer), so logging costs the same, no matter how many entries there are.
     """
 
     def __init__(self, labeler_instance: Labeler):
         self.labeler = labeler_instance
-        self.logging_activity = []
+        self.log_model = self.labeler.layout.log_model
         self.log_max = 12  # Max number of logging rows
 
-    def get_logging_idx(self, act_idx: int, shortcut_keys: str) -> int or None:
-        """
-        Needed for time_window activities. So if the shortcut was already pressed it will return the index of
-        the list, else it returns None.
-        """
-        for idx, activity in enumerate(self.logging_activity):
-            if activity[1] == shortcut_keys and activity[0] == act_idx:
-                return idx
-        return None
+    @property
+    def log_max(self) -> int:
+        return self.log_model.capacity
 
-    def _remove_too_many_logs(self):
-        """
-        Removing too long logging list. Can be setup within settings.json as "log_max". Important to keep an
-        overview about labeling.
-        """
-        counter = 0
-        while len(self.logging_activity) > self.log_max and counter < self.log_max + 1:
-            for idx, logg in enumerate(self.logging_activity):
-                if logg[3] != "darkorange":
-                    self.logging_activity.pop(idx)
-                    break
-            counter += 1
+    @log_max.setter
+    def log_max(self, log_max: int):
+        self.log_model.set_capacity(log_max)
 
-    def _clear_logger(self):
-        """
-        Removing log-widgets.
-        """
-        for i in reversed(range(self.labeler.logger_grid.count())):
-            widget_item = self.labeler.logger_grid.itemAt(i)
-            if widget_item is not None:
-                self.labeler.logger_grid.removeWidget(widget_item.widget())
+    @staticmethod
+    def _label_text(label_id: int, shortcut_keys: str, data: list) -> str:
+        return " | ".join([str(label_id), shortcut_keys, data[0], data[1], data[2], data[3]])
+
+    def _scroll_to_bottom(self):
+        self.labeler.layout.logger_view.scrollToBottom()
 
     def append_logging(self,
                        logg_type: str = "Information",
@@ -798,162 +3000,228 @@ class Logger:
                        border_color: str = "#333333",
                        text_2: str = "",
                        ignore_if_tracked: bool = False
-                       ):
+                       ) -> int or None:
         """
         Easier way to append the logging activity. More understandable.
         Set ignore_if_tracked as True if you want to show it only once or if it already in the logging window.
-        Then it won't display.
-        """
-        if ignore_if_tracked is True:
-            if [logg_type, text, bg_color, border_color, text_2] in self.logging_activity:
-                pass
-            else:
-                self.logging_activity.append([logg_type, text, bg_color, border_color, text_2])
-        else:
-            self.logging_activity.append([logg_type, text, bg_color, border_color, text_2])
-
-    def write_logger(self):
-        """
-        Create Labels as a logging window within the GUI. Use "Information" as the first value within
-        the logging_activity list. Just append this list somewhere with three values. or just use
-        append_logging() instead of self.logging_activity.append(). Both ways are fine.
+        Then it won't display. Returns the id of the entry, needed for update_logging().
 
         Example:
         --------
-        self.logging_activity.append(["Information",
+        self.logger.append_logging("Information",
         "The data is saved to .csv",
-        "Check documentation for more Information"])
-        self.logger.write_logger() # Will write the appended logging
-
+        text_2="Check documentation for more Information")
         """
-        # Clearing the layout before reading widgets
-        self._clear_logger()
+        line = " | ".join([logg_type, text, text_2])
+        if ignore_if_tracked is True and self.log_model.contains(line, bg_color, border_color):
+            return None
+        entry_id = self.log_model.append(line, bg_color, border_color)
+        self._scroll_to_bottom()
+        return entry_id
 
-        for idx, activity in enumerate(self.logging_activity):
-            act_row = activity[0]
-            act_key = activity[1]
-            act_bg_color = activity[2]
-            act_border_color = activity[3]
-            act_data = activity[4]
-            if act_row == "Saved" or act_row == "Loaded" or act_row == "Information":
-                label = [act_row, act_key, act_data]
-            else:
-                label = [str(act_row), act_key, act_data[0], act_data[1], act_data[2], act_data[3]]
-            label = " | ".join(label)
-            label = QLabel(label)
-            if idx == len(self.logging_activity) - 1:
-                label.setStyleSheet(f"background-color: #111111; border: 1px solid darkgreen;")
-            else:
-                label.setStyleSheet(f"background-color: {act_bg_color}; border: 1px solid {act_border_color};")
-            self.labeler.logger_grid.addWidget(label, idx, 1)
-
-        self._remove_too_many_logs()
-
-
-class HotkeyPlotter:
-    """
-    This class is for checking the hotkeys and creating a plot for all the available hotkeys to give an
-    overview to the user. The user can instantly see all the available hotkeys and also to check if there
-    are some duplicated hotkeys, which should be avoided.
-    """
-
-    def __init__(self):
-        # noinspection PyUnresolvedReferences
-        self.colormap = plt.get_cmap("tab10").colors
-
-    def _check_for_duplicates(self, ordered_pairs):
+    def update_logging(self, entry_id: int, logg_type: str, text: str, text_2: str = ""):
         """
-        Finding duplicates within a dictionary.
+        Changing an entry, for example to show some progress.
         """
-        d = {}
-        for k, v in ordered_pairs:
-            if k in d:
-                d[k] = "Duplicated key"
-            else:
-                d[k] = v
-        return d
+        self.log_model.update(entry_id, " | ".join([logg_type, text, text_2]))
 
-    def _make_colors(self, row):
+    def log_label(self, label_id: int, shortcut_keys: str, data: list, bg_color: str, border_color: str):
         """
-        Making the plot more visible for the user with colors. Duplicated values are marked as red for example.
+        Logging a label ("StartTime", "EndTime", "ActType", "Label", "Video") of the data-table.
         """
-        if row["Duplicates"] is True or row["Value"] == "Duplicated key":
-            return 4 * [self.colormap[3]]
-        elif row["File"] == "settings.json":
-            return 4 * [self.colormap[5]]
-        elif row["File"] == "label_shortcuts.json":
-            return 4 * [self.colormap[0]]
-        elif row["File"] == "commands_mpv.json":
-            return 4 * [self.colormap[2]]
+        self.log_model.append(self._label_text(label_id, shortcut_keys, data), bg_color, border_color)
+        self._scroll_to_bottom()
 
-    def _load_files(self, json_file):
+    def pin_label(self, label_id: int, shortcut_keys: str, data: list):
         """
-        Loading all the json files and adding them to a DataFrame. Also checking the duplicates.
-        Is needed for plotting.
+        Logging an open time_window. It is pinned on top (darkorange), until it is closed.
         """
-        data = []
-        with open(json_file, 'r') as file:
-            json_data = json.load(file, object_pairs_hook=self._check_for_duplicates)
+        self.log_model.pin(label_id, self._label_text(label_id, shortcut_keys, data), "#333333", "darkorange")
 
-        if json_file == "label_shortcuts.json":
-            for act_type in json_data:
-                for key, value in json_data[act_type].items():
-                    data.append((key, value, act_type, json_file))
-        else:
-            for key, value in json_data.items():
-                data.append((key, value, "", json_file))
-        df = pd.DataFrame(data, columns=["Hotkey", "Value", "ActType", "File"])
-        return df
-
-    def _plot_hotkeys(self, df):
-        """
-        Creating the plot of hotkeys named as Hotkeys.png within the application folder.
-        """
-        colors = df.apply(lambda row: self._make_colors(row), axis=1)
-        df = df.drop(columns=["Duplicates"])
+    def unpin_label(self, label_id: int):
+        self.log_model.unpin(label_id)
 
-        fig, ax = plt.subplots()
 
-        ax.axis('off')
-        table = ax.table(
-            cellText=df.values,
-            colLabels=df.keys(),
-            loc='center',
-            cellLoc='left',
-            cellColours=colors.to_list(),
-        )
-
-        for key, cell in table.get_celld().items():
-            cell.set_linewidth(0.05)
-            cell.get_text().set_color("white")
-            cell.set_edgecolor("white")
+class HotkeyOverview(QDialog):
+    """
+    Overview of all the hotkeys of the three .json files (hotkeys.py), to give an overview to the user and to check
+    if there are some duplicated hotkeys, which should be avoided (marked red). Painted by Qt, kept until one of the
+    files changes (hash of the files). Can be exported as Hotkeys.svg and Hotkeys.png, only written again if the
+    files changed since the last export.
+    """
 
-        for i in range(0, 4):
-            table.get_celld()[(0, i)].set_facecolor("black")
+    COLORS = {"label_shortcuts.json": QColor(31, 119, 180), "settings.json": QColor(140, 86, 75),
+              "commands_mpv.json": QColor(44, 160, 44)}
+    DUPLICATED_COLOR = QColor(214, 39, 40)
+    EXPORT_PATHS = ("Hotkeys.svg", "Hotkeys.png")
 
-        fig.tight_layout()
-        fig.savefig('Hotkeys.png', dpi=1000)
-        plt.close()
+    def __init__(self, labeler_instance: Labeler):
+        super().__init__(labeler_instance)
+        self.labeler = labeler_instance
+        self.setWindowTitle("Hotkeys")
+        self.config = None  # Hash of the .json files the hotkeys are loaded from
+        self.hotkeys = []
+        self.model = HotkeyTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(BackgroundDelegate(self.table))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(self.table.verticalHeader().minimumSectionSize())
+        self.summary = QLabel(self)
+        export_button = QPushButton("Export (SVG, PNG)", self)
+        # noinspection PyUnresolvedReferences
+        export_button.clicked.connect(self.labeler.app_functions.export_hotkeys)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table)
+        layout.addWidget(export_button)
+        self.resize(640, 560)
+
+    def refresh(self) -> bool:
+        """
+        Loading the hotkeys again, if one of the .json files changed. Returns True if they were loaded.
+        """
+        config = config_hash()
+        if config == self.config:
+            return False
+        self.config = config
+        self.hotkeys = load_hotkeys()
+        self.model.set_hotkeys(self.hotkeys)
+        self.table.resizeColumnsToContents()
+        duplicated = sum(hotkey.duplicated for hotkey in self.hotkeys)
+        self.summary.setText(f"{len(self.hotkeys)} hotkeys, {duplicated} duplicated" if duplicated else
+                             f"{len(self.hotkeys)} hotkeys, no duplicates")
+        return True
+
+    def color(self, hotkey: Hotkey) -> QColor:
+        return self.DUPLICATED_COLOR if hotkey.duplicated else self.COLORS.get(hotkey.file, QColor("black"))
+
+    def _cells(self) -> tuple:
+        """
+        Helper for the texts (header first), the column widths and the row height of the exported table.
+        """
+        metrics = self.fontMetrics()
+        texts = [HOTKEY_COLUMNS] + [list(hotkey[:4]) for hotkey in self.hotkeys]
+        widths = [max(metrics.horizontalAdvance(row[column]) for row in texts) + 12
+                  for column in range(len(HOTKEY_COLUMNS))]
+        return texts, widths, metrics.height() + 6
+
+    def export_size(self) -> QSize:
+        _texts, widths, row_height = self._cells()
+        return QSize(sum(widths) + 1, (len(self.hotkeys) + 1) * row_height + 1)
+
+    def paint(self, painter: QPainter):
+        """
+        Painting the hotkeys as table (header black, rows coloured like within the overview), see export_size().
+        """
+        texts, widths, row_height = self._cells()
+        painter.setFont(self.font())
+        for row, row_texts in enumerate(texts):
+            color = QColor("black") if row == 0 else self.color(self.hotkeys[row - 1])
+            x = 0
+            for column, text in enumerate(row_texts):
+                cell = QRect(x, row * row_height, widths[column], row_height)
+                painter.fillRect(cell, color)
+                painter.setPen(QColor("white"))
+                painter.drawRect(cell)
+                painter.drawText(cell.adjusted(6, 0, 0, 0), int(Qt.AlignLeft | Qt.AlignVCenter), text)
+                x += widths[column]
+
+    def export(self) -> List[str]:
+        """
+        Writing Hotkeys.svg and Hotkeys.png. A file is only written, if it was exported from other .json files
+        (the hash is stored inside the file). Returns the written files.
+        """
+        from PyQt5.QtSvg import QSvgGenerator
+        self.refresh()
+        size = self.export_size()
+        written = []
+        for path in self.EXPORT_PATHS:
+            if self._exported_config(path) == self.config:
+                continue
+            if path.endswith(".svg"):
+                device = QSvgGenerator()
+                device.setFileName(path)
+                device.setSize(size)
+                device.setViewBox(QRect(QPoint(0, 0), size))
+                device.setResolution(self.logicalDpiX())
+                device.setDescription(f"config:{self.config}")
+            else:
+                device = QImage(size, QImage.Format_RGB32)
+                device.fill(QColor("white"))
+                device.setText("config", self.config)
+            painter = QPainter(device)
+            self.paint(painter)
+            painter.end()
+            if path.endswith(".png"):
+                device.save(path)
+            written.append(path)
+        return written
+
+    @staticmethod
+    def _exported_config(path: str) -> Optional[str]:
+        """
+        Helper to read the hash of the .json files an exported file was made from.
+        """
+        if not os.path.exists(path):
+            return None
+        if path.endswith(".png"):
+            return QImageReader(path).text("config") or None
+        with open(path, "r", encoding="utf-8", errors="ignore") as file:
+            content = file.read()
+        start = content.find("config:")
+        return content[start + 7:start + 47] if start >= 0 else None
+
+
+class HotkeyTableModel(QAbstractTableModel):
+    """
+    Model of the hotkey overview, one row per hotkey (see HOTKEY_COLUMNS).
+    """
 
-    def load_and_plot(self):
-        """
-        The whole process from loading until plotting the hotkeys.
-        """
+    def __init__(self, overview: HotkeyOverview):
+        super().__init__(overview)
+        self.overview = overview
+        self.hotkeys = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.hotkeys)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HOTKEY_COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        hotkey = self.hotkeys[index.row()]
+        if role == Qt.DisplayRole:
+            return hotkey[index.column()]
+        elif role == Qt.BackgroundRole:
+            return self.overview.color(hotkey)
+        elif role == Qt.ForegroundRole:
+            return QColor("white")
+        return None
 
-        labels = self._load_files("label_shortcuts.json")
-        settings = self._load_files("settings.json")
-        label_shortcuts = self._load_files("commands_mpv.json")
-        df = pd.concat([labels, settings], axis=0)
-        df = pd.concat([df, label_shortcuts], axis=0).reset_index(drop=True)
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return HOTKEY_COLUMNS[section] if orientation == Qt.Horizontal else str(section + 1)
 
-        df["Duplicates"] = df.duplicated(subset="Hotkey", keep=False)
-        df["Value"] = df["Value"].where(~df["Duplicates"], "Duplicated key")
-        self._plot_hotkeys(df)
+    def set_hotkeys(self, hotkeys: List[Hotkey]):
+        self.beginResetModel()
+        self.hotkeys = list(hotkeys)
+        self.endResetModel()
 
 
 def start_app():
+    """
+    Starting the app. With "--profile-startup" the timings of the start are printed.
+    """
+    startup_profile.enabled = "--profile-startup" in sys.argv
     locale.setlocale(locale.LC_NUMERIC, 'C')
+    startup_profile.start()
     app = QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     win = Labeler(app)
     win.show()
     sys.exit(app.exec_())
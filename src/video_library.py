@@ -0,0 +1,321 @@
+"""
+Index of the videos within the folder "videos" (also within sub-folders) for the playlist of video_labeler.py.
+Duration, fps, resolution and the number of labels of every video are cached inside a SQLite file, keyed by
+path, size and mtime. So only new or changed videos are probed (with ffprobe). The same file holds the global
+label index (every label of every label file within "data"), to step through a label across all videos. No Qt in
+here.
+"""
+import os
+import json
+import shutil
+import sqlite3
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from label_store import label_file_name, read_npz, read_labels
+
+# For Documentation
+from typing import Dict, Iterator, List, Optional, Tuple
+
+VIDEO_COLUMNS = ["Video", "Duration", "FPS", "Resolution", "Labels"]  # Header of the playlist
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".wmv", ".webm", ".flv", ".m4v", ".mpg", ".mpeg", ".ts",
+                    ".mts", ".m2ts", ".3gp", ".ogv")
+
+WARM_HEAD = 32 * 1024 * 1024  # Bytes of the start of a video read ahead (first seconds of the video)
+WARM_TAIL = 4 * 1024 * 1024  # Bytes of the end read ahead (the index of .mp4/.mov is often at the end)
+
+# name is the path relative to the folder "videos" (always with "/"), like it is passed to the mpv-player
+VideoInfo = namedtuple("VideoInfo", ["name", "size", "mtime", "duration", "fps", "width", "height", "labels"])
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    Duration as H:MM:SS for the playlist, empty if unknown.
+    """
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def video_texts(info: VideoInfo) -> List[str]:
+    """
+    Texts of a video within the playlist, see VIDEO_COLUMNS.
+    """
+    return [info.name,
+            format_duration(info.duration),
+            "" if info.fps is None else f"{info.fps:.2f}",
+            "" if info.width is None else f"{info.width}x{info.height}",
+            "" if info.labels is None else str(info.labels)]
+
+
+def probe_video(path: str) -> Tuple[Optional[float], Optional[float], Optional[int], Optional[int]]:
+    """
+    Duration, fps, width and height of a video, read by ffprobe (only the container and stream headers, nothing
+    is decoded). Everything is None, if ffprobe is not installed or can't read the file.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None, None, None, None
+    try:
+        output = subprocess.run([ffprobe, "-v", "error", "-select_streams", "v:0",
+                                 "-show_entries", "stream=width,height,avg_frame_rate:format=duration",
+                                 "-of", "json", path],
+                                capture_output=True, check=True, timeout=60).stdout
+        probe = json.loads(output)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None, None, None, None
+    stream = (probe.get("streams") or [{}])[0]
+    duration = probe.get("format", {}).get("duration")
+    fps = None
+    numerator, _, denominator = stream.get("avg_frame_rate", "0/0").partition("/")
+    try:
+        if float(denominator or 1) != 0:
+            fps = float(numerator) / float(denominator or 1)
+    except ValueError:
+        pass
+    return (float(duration) if duration is not None else None, fps or None,
+            stream.get("width"), stream.get("height"))
+
+
+def count_labels(path: str) -> int:
+    """
+    Number of labels inside a label file (.csv or .npz). The csv is not parsed, only the lines are counted.
+    The columns of a .npz are memory-mapped, so only the headers are read.
+    """
+    if path.endswith(".npz"):
+        return len(read_npz(path))
+    with open(path, "rb") as file:
+        content = file.read()
+    lines = content.count(b"\n") + (0 if content.endswith(b"\n") or not content else 1)
+    return max(lines - 1, 0)  # Without header
+
+
+def warm_file(path: str, head: int = WARM_HEAD, tail: int = WARM_TAIL):
+    """
+    Reading the start and the end of a file into the page cache of the OS, so a player opening it next does not
+    wait for the disk. With posix_fadvise the kernel reads ahead on its own, otherwise the bytes are read and
+    dropped.
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as file:
+            ranges = [(0, min(head, size)), (max(size - tail, head), size)]
+            for start, end in ranges:
+                if end <= start:
+                    continue
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(file.fileno(), start, end - start, os.POSIX_FADV_WILLNEED)
+                    continue
+                file.seek(start)
+                while file.tell() < end and file.read(min(1024 * 1024, end - file.tell())):
+                    pass
+    except OSError:
+        pass
+
+
+class VideoLibrary:
+    """
+    Walking "videos" recursively and caching the metadata of every video inside a SQLite file. A connection is
+    opened for every call, so the library can be used from any thread.
+    """
+
+    def __init__(self, video_folder: str = "videos", data_folder: str = "data",
+                 cache_path: str = os.path.join("data", "video_library.sqlite")):
+        self.video_folder = video_folder
+        self.data_folder = data_folder
+        self.cache_path = cache_path
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS videos (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+                               "duration REAL, fps REAL, width INTEGER, height INTEGER)")
+            connection.execute("CREATE TABLE IF NOT EXISTS labels (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+                               "count INTEGER)")
+            # Global label index: every label of every label file, searched by label (next occurrence)
+            connection.execute("CREATE TABLE IF NOT EXISTS label_files (path TEXT PRIMARY KEY, size INTEGER, "
+                               "mtime REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS label_rows (path TEXT, label TEXT, type TEXT, vid TEXT, "
+                               "stime REAL, etime REAL, sframe INTEGER, eframe INTEGER)")
+            connection.execute("CREATE INDEX IF NOT EXISTS label_rows_label ON label_rows (label, vid, stime)")
+            connection.execute("CREATE INDEX IF NOT EXISTS label_rows_path ON label_rows (path)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.cache_path, timeout=30)
+
+    def cached(self) -> List[VideoInfo]:
+        """
+        All the videos of the cache, sorted by name. Nothing is probed or checked, so this is fast, also with many
+        videos. The label counts are from the last scan.
+        """
+        with self._connect() as connection:
+            videos = connection.execute("SELECT path, size, mtime, duration, fps, width, height FROM videos "
+                                        "ORDER BY path").fetchall()
+            labels = dict(connection.execute("SELECT path, count FROM labels").fetchall())
+        return [VideoInfo(*video, labels.get(self._label_path(video[0]))) for video in videos]
+
+    def walk(self, folder: str = "") -> Tuple[List[str], List[str]]:
+        """
+        All videos (names) and directories (paths, for watching) within a folder of "videos" (recursive).
+        """
+        names, directories = [], []
+        for root, dirs, files in os.walk(os.path.join(self.video_folder, folder)):
+            dirs.sort()
+            directories.append(root)
+            relative = os.path.relpath(root, self.video_folder)
+            for file_name in sorted(files):
+                if file_name.lower().endswith(VIDEO_EXTENSIONS):
+                    name = file_name if relative == "." else os.path.join(relative, file_name)
+                    names.append(name.replace(os.sep, "/"))
+        return names, directories
+
+    def scan(self, names: List[str], workers: int = 4, batch: int = 100) -> Iterator[List[VideoInfo]]:
+        """
+        Indexing the videos (names from walk()) and yielding them in batches. Unchanged videos (same size and
+        mtime) are taken from the cache, new or changed videos are probed in parallel.
+        """
+        with self._connect() as connection:
+            cache = {row[0]: row for row in connection.execute(
+                "SELECT path, size, mtime, duration, fps, width, height FROM videos")}
+            label_cache = self._label_cache(connection)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-probe") as probes:
+            for start in range(0, len(names), batch):
+                results = [result for result in probes.map(lambda name: self._info(name, cache, label_cache),
+                                                            names[start:start + batch]) if result is not None]
+                infos = [info for info, _label_entry in results]
+                with self._connect() as connection:
+                    connection.executemany("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                           [info[:7] for info in infos])
+                    connection.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)",
+                                           [label_entry for _info, label_entry in results if label_entry])
+                yield infos
+
+    def label_count(self, name: str) -> Optional[int]:
+        """
+        Number of saved labels of a video (cached by size and mtime of the label file), None without label file.
+        """
+        with self._connect() as connection:
+            label_entry = self._label_entry(name, self._label_cache(connection))
+            if label_entry is not None:
+                connection.execute("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", label_entry)
+        return label_entry[3] if label_entry is not None else None
+
+    def remove(self, names: List[str]):
+        """
+        Removing videos (deleted from "videos") from the cache.
+        """
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM videos WHERE path = ?", [(name,) for name in names])
+
+    def index_labels(self) -> int:
+        """
+        Updating the global label index with all label files within "data". Only new or changed label files (size
+        and mtime) are read, the labels of removed files are dropped. Returns the number of files read.
+        """
+        files = {}  # Path without extension -> newest label file (.csv or .npz)
+        for entry in (os.scandir(self.data_folder) if os.path.isdir(self.data_folder) else ()):
+            base_path, extension = os.path.splitext(entry.path)
+            if extension in (".csv", ".npz") and entry.is_file():
+                if base_path not in files or entry.stat().st_mtime > os.stat(files[base_path]).st_mtime:
+                    files[base_path] = entry.path
+        paths = set(files.values())
+        with self._connect() as connection:
+            indexed = {row[0]: row for row in connection.execute("SELECT path, size, mtime FROM label_files")}
+            removed = [(path,) for path in indexed if path not in paths]
+            connection.executemany("DELETE FROM label_rows WHERE path = ?", removed)
+            connection.executemany("DELETE FROM label_files WHERE path = ?", removed)
+        read = 0
+        for path in files.values():
+            stat = os.stat(path)
+            cached = indexed.get(path)
+            if cached is None or cached[1] != stat.st_size or cached[2] != stat.st_mtime:
+                self.index_label_file(path)
+                read += 1
+        return read
+
+    def index_label_file(self, path: str):
+        """
+        (Re)indexing the labels of one label file (for example after saving it). A label file of the other format
+        (converted while saving) is dropped from the index.
+        """
+        base_path = os.path.splitext(path)[0]
+        try:
+            stat = os.stat(path)
+            store = read_labels(path)
+        except (OSError, ValueError, KeyError):
+            return
+        types = np.array(store.types.values, dtype=object)[store.type_codes]
+        labels = np.array(store.labels.values, dtype=object)[store.label_codes]
+        vids = np.array(store.vids.values, dtype=object)[store.vid_codes]
+        rows = zip([path] * len(store), labels.tolist(), types.tolist(), vids.tolist(), store.stime.tolist(),
+                   [None if end != end else end for end in store.etime.tolist()],  # Open time_windows (NaN)
+                   store.sframe.tolist(), store.eframe.tolist())
+        with self._connect() as connection:
+            for old_path in (base_path + ".csv", base_path + ".npz"):
+                connection.execute("DELETE FROM label_rows WHERE path = ?", (old_path,))
+                connection.execute("DELETE FROM label_files WHERE path = ?", (old_path,))
+            connection.executemany("INSERT INTO label_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.execute("INSERT INTO label_files VALUES (?, ?, ?)", (path, stat.st_size, stat.st_mtime))
+
+    def next_label(self, label: str, video: str, backwards: bool = False) -> Optional[Tuple[str, float, int]]:
+        """
+        (video, start, start frame) of the first label with this name within the next video (by name) after video,
+        that has such a label. Behind the last video it starts again with the first one (wraps around), video itself
+        is skipped (its labels are within the data-table). Backwards the last label of the previous video. None if
+        no other video has such a label. O(log n), the index is (label, vid, stime).
+        """
+        order = "vid DESC, stime DESC" if backwards else "vid, stime"
+        with self._connect() as connection:
+            for compare in (("<", ">") if backwards else (">", "<")):
+                found = connection.execute(f"SELECT vid, stime, sframe FROM label_rows WHERE label = ? AND "
+                                           f"vid {compare} ? ORDER BY {order} LIMIT 1", (label, video)).fetchone()
+                if found is not None:
+                    return tuple(found)
+        return None
+
+    def _label_path(self, name: str) -> str:
+        return os.path.join(self.data_folder, label_file_name(name))
+
+    @staticmethod
+    def _label_cache(connection: sqlite3.Connection) -> Dict[str, tuple]:
+        return {row[0]: row for row in connection.execute("SELECT path, size, mtime, count FROM labels")}
+
+    def _info(self, name: str, cache: Dict[str, tuple],
+              label_cache: Dict[str, tuple]) -> Optional[Tuple[VideoInfo, Optional[tuple]]]:
+        """
+        Helper to get the metadata of a video (from the cache, if the video did not change) and the entry of its
+        label file for the cache. None if the video was removed meanwhile.
+        """
+        try:
+            stat = os.stat(os.path.join(self.video_folder, name))
+        except OSError:
+            return None
+        cached = cache.get(name)
+        if cached is not None and cached[1] == stat.st_size and cached[2] == stat.st_mtime:
+            video = cached
+        else:
+            video = (name, stat.st_size, stat.st_mtime) + probe_video(os.path.join(self.video_folder, name))
+        label_entry = self._label_entry(name, label_cache)
+        return VideoInfo(*video, label_entry[3] if label_entry is not None else None), label_entry
+
+    def _label_entry(self, name: str, label_cache: Dict[str, tuple]) -> Optional[tuple]:
+        """
+        Helper returning (path, size, mtime, count) of the label file of a video for the cache, None if there is
+        no label file. The labels are only counted, if the label file changed.
+        """
+        base_path = self._label_path(name)
+        for extension in (".csv", ".npz"):
+            try:
+                stat = os.stat(base_path + extension)
+            except OSError:
+                continue
+            cached = label_cache.get(base_path)
+            if cached is not None and cached[1] == stat.st_size and cached[2] == stat.st_mtime:
+                return cached
+            try:
+                return base_path, stat.st_size, stat.st_mtime, count_labels(base_path + extension)
+            except (OSError, ValueError, KeyError):
+                return None
+        return None